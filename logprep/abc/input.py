@@ -4,20 +4,30 @@ New input endpoint types are created by implementing it.
 
 import base64
 import hashlib
+import sys
+import time
 import zlib
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from hmac import HMAC
-from typing import Tuple, Optional
+from logging import Logger
+from typing import Callable, List, Optional, Tuple
 
-import arrow
 from attrs import define, field, validators
 
 from logprep.abc import Connector
+from logprep.metrics.metric import calculate_new_average
 from logprep.util.helper import add_field_to, get_dotted_field_value
 from logprep.util.time_measurement import TimeMeasurement
+from logprep.util.timestamp import CachedIsoClock, parse_timestamp
 from logprep.util.validators import dict_structure_validator
 
+if sys.version_info.minor < 8:  # pragma: no cover
+    from backports.cached_property import cached_property  # pylint: disable=import-error
+else:
+    from functools import cached_property
+
 
 class InputError(BaseException):
     """Base class for Input related exceptions."""
@@ -68,6 +78,16 @@ class HmacConfig:
     containing the calculated hmac, and :code:`compressed_base64`, containing the original message
     that was used to calculate the hmac in compressed and base64 encoded. In case the output
     field exists already in the original message an error is raised."""
+    compression_level: int = field(
+        validator=[validators.instance_of(int), validators.in_(range(-1, 10))], default=-1
+    )
+    """The zlib compression level of the message from :code:`0` (no compression) to :code:`9`
+    (best compression). The default :code:`-1` corresponds to level 6."""
+    workers: int = field(validator=[validators.instance_of(int), validators.ge(0)], default=0)
+    """Number of threads that compress messages while their hmac is calculated (default is 0,
+    which calculates both one after the other). Since hashlib and zlib release the GIL, large
+    messages are hashed and compressed in parallel. Only messages with at least 16 KiB are handed
+    over to a thread."""
 
 
 @define(kw_only=True)
@@ -85,6 +105,25 @@ class TimeDeltaConfig:
 class Input(Connector):
     """Connect to a source for log data."""
 
+    @define(kw_only=True)
+    class InputMetrics(Connector.ConnectorMetrics):
+        """Tracks statistics about input connectors"""
+
+        mean_hmac_processing_time_per_event: float = 0.0
+        """Mean time in seconds that was spent to calculate and add the hmac of an event"""
+        _mean_hmac_processing_time_sample_counter: int = 0
+        """Helper to calculate mean hmac processing time"""
+
+        def update_mean_hmac_processing_time_per_event(self, new_sample):
+            """Updates the mean hmac processing time per event"""
+            new_avg, new_sample_counter = calculate_new_average(
+                self.mean_hmac_processing_time_per_event,
+                new_sample,
+                self._mean_hmac_processing_time_sample_counter,
+            )
+            self.mean_hmac_processing_time_per_event = new_avg
+            self._mean_hmac_processing_time_sample_counter = new_sample_counter
+
     @define(kw_only=True, slots=False)
     class Config(Connector.Config):
         """Input Configurations"""
@@ -156,6 +195,10 @@ class Input(Connector):
               containing the original message that was used to calculate the hmac in compressed and
               base64 encoded. In case the output field exists already in the original message an
               error is raised.
+            - `compression_level` - The zlib compression level of the message from :code:`0` to
+              :code:`9` (default is :code:`-1`, which corresponds to level 6).
+            - `workers` - Number of threads that compress messages with at least 16 KiB while
+              their hmac is calculated (default is 0, which calculates both one after the other).
         """
 
         _version_information: dict = field(
@@ -166,7 +209,47 @@ class Input(Connector):
             },
         )
 
-    __slots__ = []
+    current_raw_event: Optional[bytes]
+
+    _clock: CachedIsoClock
+
+    _hmac_required_options = ("target", "key", "output_field")
+
+    _hmac_parallel_min_size: int = 16384
+
+    __slots__ = ["current_raw_event", "_clock"]
+
+    def __init__(self, name: str, configuration: "Input.Config", logger: Logger):
+        super().__init__(name, configuration, logger)
+        self.metrics = self.InputMetrics(labels=self.metric_labels)
+        self.current_raw_event = None
+        self._clock = CachedIsoClock()
+
+    def setup(self):
+        """Resolves the enabled preprocessing steps once."""
+        super().setup()
+        self._preprocessing_steps = self._compile_preprocessing_steps()
+
+    @cached_property
+    def _preprocessing_steps(self) -> List[Callable[[dict, bytes], Optional[str]]]:
+        """The enabled preprocessing steps. They are resolved on first use if the connector was
+        not set up."""
+        return self._compile_preprocessing_steps()
+
+    def _compile_preprocessing_steps(self) -> List[Callable[[dict, bytes], Optional[str]]]:
+        """Returns the enabled preprocessing steps in the order in which they are applied. Every
+        step takes the event and the raw event and returns a non critical error message or None.
+        """
+        steps = []
+        if self._add_hmac:
+            steps.append(self._add_hmac_to_event)
+        if self._add_version_info:
+            steps.append(self._add_version_information_to_event)
+        if self._add_log_arrival_time_information:
+            steps.append(self._add_arrival_time_information_to_event)
+        if self._add_log_arrival_timedelta_information:
+            steps.append(self._add_arrival_timedelta_information_to_event)
+        return steps
 
     @property
     def _add_hmac(self):
@@ -174,7 +257,25 @@ class Input(Connector):
         hmac_options = self._config.preprocessing.get("hmac")
         if not hmac_options:
             return False
-        return all(bool(hmac_options[option_key]) for option_key in hmac_options)
+        return all(bool(hmac_options.get(option)) for option in self._hmac_required_options)
+
+    @cached_property
+    def _hmac_config(self) -> HmacConfig:
+        """The hmac options with the defaults of the optional ones"""
+        return HmacConfig(**self._config.preprocessing.get("hmac"))
+
+    @cached_property
+    def _hmac_key(self) -> bytes:
+        return self._hmac_config.key.encode()
+
+    @cached_property
+    def _hmac_executor(self) -> Optional[ThreadPoolExecutor]:
+        """The threads that compress large messages while their hmac is calculated"""
+        if not self._hmac_config.workers:
+            return None
+        return ThreadPoolExecutor(
+            max_workers=self._hmac_config.workers, thread_name_prefix=f"{self.name}-hmac"
+        )
 
     @property
     def _add_version_info(self):
@@ -236,7 +337,8 @@ class Input(Connector):
         Returns
         -------
         input : dict
-            Input log data.
+            Input log data. The serialized document it was parsed from, if the input has one, is
+            kept in :code:`current_raw_event`.
 
         Raises
         ------
@@ -244,29 +346,30 @@ class Input(Connector):
             After timeout (usually a fraction of seconds) if no input data was available by then.
         """
         event, raw_event = self._get_event(timeout)
+        self.current_raw_event = raw_event
         non_critical_error_msg = None
         if event is not None and not isinstance(event, dict):
             raise CriticalInputError("not a dict", event)
-        if event and self._add_hmac:
-            event, non_critical_error_msg = self._add_hmac_to(event, raw_event)
-        if event and self._add_version_info:
-            self._add_version_information_to_event(event)
-        if event and self._add_log_arrival_time_information:
-            self._add_arrival_time_information_to_event(event)
-        if event and self._add_log_arrival_timedelta_information:
-            self._add_arrival_timedelta_information_to_event(event)
+        if event:
+            for step in self._preprocessing_steps:
+                non_critical_error_msg = step(event, raw_event) or non_critical_error_msg
         self.metrics.number_of_processed_events += 1
         return event, non_critical_error_msg
 
     def batch_finished_callback(self):
         """Can be called by output connectors after processing a batch of one or more records."""
 
-    def _add_arrival_time_information_to_event(self, event: dict):
-        now = arrow.now()
+    def shut_down(self):
+        """Stop the hmac threads if they were started."""
+        if self.__dict__.get("_hmac_executor") is not None:
+            self._hmac_executor.shutdown()
+        super().shut_down()
+
+    def _add_arrival_time_information_to_event(self, event: dict, *_):
         target_field = self._config.preprocessing.get("log_arrival_time_target_field")
-        add_field_to(event, target_field, now.isoformat())
+        add_field_to(event, target_field, self._clock.now())
 
-    def _add_arrival_timedelta_information_to_event(self, event: dict):
+    def _add_arrival_timedelta_information_to_event(self, event: dict, *_):
         log_arrival_timedelta_config = self._config.preprocessing.get("log_arrival_timedelta")
         log_arrival_time_target_field = self._config.preprocessing.get(
             "log_arrival_time_target_field"
@@ -277,17 +380,24 @@ class Input(Connector):
         log_arrival_time = get_dotted_field_value(event, log_arrival_time_target_field)
         if time_reference:
             delta_time_sec = (
-                arrow.get(log_arrival_time) - arrow.get(time_reference)
+                parse_timestamp(log_arrival_time) - parse_timestamp(time_reference)
             ).total_seconds()
             add_field_to(event, target_field, delta_time_sec)
 
-    def _add_version_information_to_event(self, event: dict):
+    def _add_version_information_to_event(self, event: dict, *_):
         """Add the version information to the event"""
         target_field = self._config.preprocessing.get("version_info_target_field")
         # pylint: disable=protected-access
         add_field_to(event, target_field, self._config._version_information)
         # pylint: enable=protected-access
 
+    def _add_hmac_to_event(self, event: dict, raw_event: bytes) -> Optional[str]:
+        """Adds the hmac to the event and returns the non critical error message if any."""
+        start_time = time.perf_counter()
+        _, non_critical_error_msg = self._add_hmac_to(event, raw_event)
+        self.metrics.update_mean_hmac_processing_time_per_event(time.perf_counter() - start_time)
+        return non_critical_error_msg
+
     def _add_hmac_to(self, event_dict, raw_event) -> Tuple[dict, str]:
         """
         Calculates an HMAC (Hash-based message authentication code) based on a given target field
@@ -309,9 +419,10 @@ class Input(Connector):
             The original event extended with a field that has the hmac and the corresponding target
             field, which was used to calculate the hmac.
         """
-        hmac_options = self._config.preprocessing.get("hmac", {})
-        hmac_target_field_name = hmac_options.get("target")
+        hmac_config = self._hmac_config
+        hmac_target_field_name = hmac_config.target
         non_critical_error_msg = None
+        compressed = None
 
         if hmac_target_field_name == "<RAW_MSG>":
             received_orig_message = raw_event
@@ -329,22 +440,32 @@ class Input(Connector):
         else:
             if isinstance(received_orig_message, str):
                 received_orig_message = received_orig_message.encode("utf-8")
+            if (
+                self._hmac_executor is not None
+                and len(received_orig_message) >= self._hmac_parallel_min_size
+            ):
+                compressed = self._hmac_executor.submit(
+                    zlib.compress, received_orig_message, hmac_config.compression_level
+                )
             hmac = HMAC(
-                key=hmac_options.get("key").encode(),
+                key=self._hmac_key,
                 msg=received_orig_message,
                 digestmod=hashlib.sha256,
             ).hexdigest()
-        compressed = zlib.compress(received_orig_message, level=-1)
+        if compressed is None:
+            compressed = zlib.compress(received_orig_message, hmac_config.compression_level)
+        else:
+            compressed = compressed.result()
         hmac_output = {"hmac": hmac, "compressed_base64": base64.b64encode(compressed).decode()}
         add_was_successful = add_field_to(
             event_dict,
-            hmac_options.get("output_field"),
+            hmac_config.output_field,
             hmac_output,
         )
         if not add_was_successful:
             non_critical_error_msg = (
                 f"Couldn't add the hmac to the input event as the desired "
-                f"output field '{hmac_options.get('output_field')}' already "
+                f"output field '{hmac_config.output_field}' already "
                 f"exist."
             )
         return event_dict, non_critical_error_msg
@@ -57,3 +57,15 @@ class Output(Connector):
     @abstractmethod
     def store_failed(self, error_message: str, document_received: dict, document_processed: dict):
         """Store an event when an error occurred during the processing."""
+
+    @property
+    def fill_level(self) -> float:
+        """Fraction of the capacity of the output from 0.0 to 1.0 that is taken by documents which
+        were not delivered yet. The pipeline stops reading from the input if it exceeds the
+        configured :code:`output_high_water_mark`. This is optional and 0.0 by default."""
+        return 0.0
+
+    def flush(self):
+        """Write documents that are held back by the output, e.g. in a backlog, to the output
+        destination. This is optional and called if the input has to commit its offsets early,
+        e.g. on a rebalance of a kafka consumer group."""
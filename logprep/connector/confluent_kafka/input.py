@@ -25,19 +25,39 @@ Example
         auto_commit: on
         session_timeout: 6000
         offset_reset_policy: smallest
+        prefilter:
+          contains:
+            - '"channel":"Microsoft-Windows-PowerShell/Operational"'
+          regex:
+            - '"event_id": ?(4103|4104)[,}]'
+          target: prefiltered
+
+Prefilter
+^^^^^^^^^
+
+Messages can be dropped before they are parsed by configuring :code:`prefilter`. A message is
+dropped if its raw value contains one of the byte strings in :code:`contains` or matches one of
+the regular expressions in :code:`regex`. The checks are done on the serialized message, thus the
+conditions have to match the json as it is written by the producer, including its whitespace.
+A condition like :code:`"channel":"Security"` matches the key :code:`channel` in any nested
+object. If :code:`target` is set, the dropped messages are parsed and stored by the output in
+this target, e.g. a kafka topic, without being processed. The number of dropped messages is
+exported as metric :code:`number_of_prefiltered_events`.
 """
+
 import json
+import re
 import sys
 from functools import partial
 from logging import Logger
 from socket import getfqdn
-from typing import Any, List, Tuple, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 from attrs import define, field, validators
-from confluent_kafka import Consumer
+from confluent_kafka import Consumer, KafkaException, TopicPartition
 
 from logprep.abc.input import CriticalInputError, Input
-from logprep.util.validators import dict_with_keys_validator
+from logprep.util.validators import dict_structure_validator, dict_with_keys_validator
 
 if sys.version_info.minor < 8:  # pragma: no cover
     from backports.cached_property import cached_property  # pylint: disable=import-error
@@ -123,15 +143,57 @@ class ConfluentKafkaInput(Input):
         consumer to read all log messages from a partition, which can lead to a duplication of log
         messages. Currently, the deprecated value smallest is used, which should be later changed
         to earliest. The default value of librdkafka is largest."""
+        prefilter: dict = field(
+            validator=[
+                validators.instance_of(dict),
+                partial(
+                    dict_structure_validator,
+                    reference_dict={
+                        "contains": Optional[list],
+                        "regex": Optional[list],
+                        "target": Optional[str],
+                    },
+                ),
+                lambda _, __, value: [re.compile(regex) for regex in value.get("regex", [])],
+            ],
+            default={},
+        )
+        """Drops messages before they are parsed if their raw value matches a condition
+        (optional).
+
+        - `contains` - A list of strings. A message is dropped if it contains one of them.
+        - `regex` - A list of regular expressions. A message is dropped if one of them matches.
+        - `target` - If set, dropped messages are stored by the output in this target (e.g. a
+          kafka topic) instead of being discarded.
+        """
+
+    @define(kw_only=True)
+    class ConfluentKafkaInputMetrics(Input.InputMetrics):
+        """Tracks statistics about the kafka input"""
+
+        number_of_prefiltered_events: int = 0
+        """Number of messages that were dropped by the prefilter before they were parsed"""
 
     current_offset: int
 
+    current_partition: int
+
+    acknowledge_records: bool
+
+    flush_callback: Optional[Callable]
+
+    prefilter_callback: Optional[Callable]
+
     _record: Any
 
     _last_valid_records: dict
 
     __slots__ = [
         "current_offset",
+        "current_partition",
+        "acknowledge_records",
+        "flush_callback",
+        "prefilter_callback",
         "_record",
         "_last_valid_records",
     ]
@@ -140,6 +202,11 @@ class ConfluentKafkaInput(Input):
         super().__init__(name, configuration, logger)
         self._last_valid_records = {}
         self._record = None
+        self.current_partition = 0
+        self.acknowledge_records = False
+        self.flush_callback = None
+        self.prefilter_callback = None
+        self.metrics = self.ConfluentKafkaInputMetrics(labels=self.metric_labels)
 
     @cached_property
     def _client_id(self):
@@ -150,9 +217,73 @@ class ConfluentKafkaInput(Input):
     def _consumer(self):
         """Create and return a new confluent kafka consumer"""
         consumer = Consumer(self._confluent_settings)
-        consumer.subscribe([self._config.topic])
+        consumer.subscribe(
+            [self._config.topic], on_assign=self._assign_callback, on_revoke=self._revoke_callback
+        )
         return consumer
 
+    def _assign_callback(self, _, partitions: List[TopicPartition]):
+        """Log the partitions that were assigned on a rebalance"""
+        self._logger.info(
+            f"{self.describe()} was assigned to partitions "
+            f"{[topic_partition.partition for topic_partition in partitions]}"
+        )
+
+    def _revoke_callback(self, consumer: Consumer, partitions: List[TopicPartition]):
+        """Flush the output and commit the offsets of the revoked partitions on a rebalance, so
+        that the consumer that takes over the partitions does not process their documents again.
+        """
+        if self.flush_callback is not None:
+            self.flush_callback()
+        offsets = []
+        for topic_partition in partitions:
+            record = self._last_valid_records.pop(topic_partition.partition, None)
+            if record is not None:
+                offsets.append(
+                    TopicPartition(topic_partition.topic, record.partition(), record.offset() + 1)
+                )
+        if offsets:
+            try:
+                consumer.commit(offsets=offsets, asynchronous=False)
+            except KafkaException as error:
+                self._logger.warning(
+                    f"Could not commit offsets of revoked partitions for {self.describe()}: {error}"
+                )
+
+    @cached_property
+    def _prefilter(self) -> Optional[Tuple[Tuple[bytes, ...], Tuple[re.Pattern, ...]]]:
+        """The byte strings and the compiled regular expressions of the prefilter"""
+        contains = self._config.prefilter.get("contains", [])
+        regex = self._config.prefilter.get("regex", [])
+        if not contains and not regex:
+            return None
+        return (
+            tuple(substring.encode("utf-8") for substring in contains),
+            tuple(re.compile(pattern.encode("utf-8")) for pattern in regex),
+        )
+
+    def _is_prefiltered(self, raw_event: bytes) -> bool:
+        substrings, patterns = self._prefilter
+        for substring in substrings:
+            if substring in raw_event:
+                return True
+        for pattern in patterns:
+            if pattern.search(raw_event) is not None:
+                return True
+        return False
+
+    @property
+    def current_record(self) -> Any:
+        """The record that was polled last"""
+        return self._record
+
+    def acknowledge(self, record: Any):
+        """Marks a record as processed, so that its offset is stored by
+        :code:`batch_finished_callback`. The pipeline calls this if :code:`acknowledge_records` is
+        set, because records are processed by partition workers after they were polled.
+        """
+        self._last_valid_records[record.partition()] = record
+
     def describe(self) -> str:
         """Get name of Kafka endpoint and the first bootstrap server.
 
@@ -185,7 +316,9 @@ class ConfluentKafkaInput(Input):
         self._record = self._consumer.poll(timeout=timeout)
         if self._record is None:
             return None
-        self._last_valid_records[self._record.partition()] = self._record
+        self.current_partition = self._record.partition()
+        if not self.acknowledge_records:
+            self._last_valid_records[self.current_partition] = self._record
         self.current_offset = self._record.offset()
         record_error = self._record.error()
         if record_error:
@@ -217,6 +350,16 @@ class ConfluentKafkaInput(Input):
         raw_event = self._get_raw_event(timeout)
         if raw_event is None:
             return None, None
+        if self._prefilter is not None and self._is_prefiltered(raw_event):
+            self.metrics.number_of_prefiltered_events += 1
+            target = self._config.prefilter.get("target")
+            if target and self.prefilter_callback is not None:
+                self.prefilter_callback(([self._parse(raw_event)], target))
+            return None, None
+        return self._parse(raw_event), raw_event
+
+    @staticmethod
+    def _parse(raw_event: bytes) -> dict:
         try:
             event_dict = json.loads(raw_event.decode("utf-8"))
         except ValueError as error:
@@ -225,7 +368,7 @@ class ConfluentKafkaInput(Input):
             ) from error
         if not isinstance(event_dict, dict):
             raise CriticalInputError("Input record value could not be parsed as dict", event_dict)
-        return event_dict, raw_event
+        return event_dict
 
     @cached_property
     def _confluent_settings(self) -> dict:
@@ -272,3 +415,4 @@ class ConfluentKafkaInput(Input):
         """Close consumer, which also commits kafka offsets."""
         if self._consumer is not None:
             self._consumer.close()
+        super().shut_down()
@@ -212,6 +212,16 @@ class ConfluentKafkaOutput(Output):
             # block program until buffer is empty
             self._producer.flush(timeout=self._config.flush_timeout)
 
+    @property
+    def fill_level(self) -> float:
+        """Fraction of :code:`maximum_backlog` that is taken by messages waiting for delivery"""
+        self._producer.poll(0)
+        return len(self._producer) / self._config.maximum_backlog
+
+    def flush(self):
+        """Waits until all produced messages were delivered."""
+        self._producer.flush(self._config.flush_timeout)
+
     def shut_down(self) -> None:
         """ensures that all messages are flushed"""
         if self._producer is not None:
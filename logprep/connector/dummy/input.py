@@ -18,10 +18,17 @@ Example
         type: dummy_input
         documents: [{"document":"one"}, "Exception", {"document":"two"}]
 """
+
+import sys
 from typing import List, Union
 from attrs import define
 from logprep.abc.input import Input, SourceDisconnectedError
 
+if sys.version_info.minor < 8:  # pragma: no cover
+    from backports.cached_property import cached_property  # pylint: disable=import-error
+else:
+    from functools import cached_property
+
 
 class DummyInput(Input):
     """DummyInput Connector"""
@@ -37,12 +44,18 @@ class DummyInput(Input):
     def _documents(self):
         return self._config.documents
 
+    @cached_property
+    def _pending_documents(self) -> list:
+        """The documents in reversed order, so that the next one can be popped from the end."""
+        self._documents.reverse()
+        return self._documents
+
     def _get_event(self, timeout: float) -> tuple:
         """Retriev next document from configuration and raise error if found"""
-        if not self._documents:
+        if not self._pending_documents:
             raise SourceDisconnectedError
 
-        document = self._documents.pop(0)
+        document = self._pending_documents.pop()
 
         if (document.__class__ == type) and issubclass(document, BaseException):
             raise document
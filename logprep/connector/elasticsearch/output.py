@@ -10,6 +10,30 @@ The documents desired index is the field :code:`_index` in the document. It is d
 If you want to send documents to datastreams, you have to set the field :code:`_op_type: create` in
 the document.
 
+The message backlog can be sent by multiple bulk workers in parallel by setting
+:code:`thread_count` to a value greater than one. The backlog is then split into
+:code:`thread_count` consecutive chunks which are sent concurrently over a shared connection pool.
+The order of documents is only guaranteed within one chunk. Documents of the same index that are
+located in different chunks may be indexed in any order. If the order of documents per index
+matters (i.e. for updates of documents with the same :code:`_id`), :code:`thread_count` has to be
+kept at :code:`1`.
+
+Documents that are rejected with code 429 can be moved into a retry queue by setting
+:code:`retry_queue_size`. They are retried in the background with an exponential backoff, while new
+documents are still being sent. The pipeline is only blocked if the retry queue is full.
+Offsets are committed to the input once a backlog has been sent, thus documents that are still in
+the retry queue on a crash are lost.
+
+Documents can be serialized into the bulk request format when they are stored by setting
+:code:`message_backlog_bytes`. The backlog is then sent as soon as it exceeds the given size in
+bytes and :code:`message_backlog_size` is ignored. This avoids serializing documents a second time
+when the bulk request is sent and makes the size of bulk requests predictable.
+
+The size of bulk requests can adapt to the load of Elasticsearch by setting
+:code:`min_bulk_bytes` lower than :code:`max_bulk_bytes`. The bulk size is halved if a bulk request
+takes longer than :code:`target_bulk_request_time` or if documents are rejected, otherwise it is
+increased slowly up to :code:`max_bulk_bytes`.
+
 Example
 ^^^^^^^
 ..  code-block:: yaml
@@ -23,27 +47,41 @@ Example
         default_index: default_index
         error_index: error_index
         message_backlog_size: 10000
+        message_backlog_bytes: 10485760
         timeout: 10000
         max_retries:
+        thread_count: 4
+        connection_pool_size: 4
+        retry_queue_size: 100000
+        min_bulk_bytes: 1048576
+        max_bulk_bytes: 104857600
+        target_bulk_request_time: 1.0
         user:
         secret:
         cert: /path/to/cert.crt
 """
 
 import json
+import math
 import re
 import ssl
 import sys
+import threading
+import time
+from collections import deque
 from logging import Logger
-from typing import List, Optional
+from multiprocessing.pool import ThreadPool
+from typing import List, Optional, Tuple
 
 import arrow
 import elasticsearch
-from attr import define, field
+from attr import Factory, define, field
 from attrs import validators
 from elasticsearch import helpers
 
+from logprep.abc.connector import Connector
 from logprep.abc.output import FatalOutputError, Output
+from logprep.metrics.metric import Metric, calculate_new_average
 
 if sys.version_info.minor < 8:  # pragma: no cover
     from backports.cached_property import cached_property  # pylint: disable=import-error
@@ -76,6 +114,12 @@ class ElasticsearchOutput(Output):
         """Index to write documents to that could not be processed."""
         message_backlog_size: int = field(validator=validators.instance_of(int))
         """Amount of documents to store before sending them to Elasticsearch."""
+        message_backlog_bytes: int = field(
+            validator=[validators.instance_of(int), validators.ge(0)], default=0
+        )
+        """Size in bytes of serialized documents to store before sending them to Elasticsearch
+        (default is 0). If it is set, documents are serialized into the bulk request format when
+        they are stored and :code:`message_backlog_size` is ignored."""
         timeout: int = field(validator=validators.instance_of(int), default=500)
         """Timeout for Elasticsearch connection (default is 500ms)"""
         max_retries: int = field(validator=validators.instance_of(int), default=0)
@@ -87,8 +131,102 @@ class ElasticsearchOutput(Output):
         """The secret used for authentication (optional)."""
         ca_cert: Optional[str] = field(validator=validators.instance_of(str), default="")
         """The path to a SSL ca certificate to verify the ssl context (optional)"""
-
-    __slots__ = ["_message_backlog", "_processed_cnt", "_index_cache"]
+        thread_count: int = field(
+            validator=[validators.instance_of(int), validators.gt(0)], default=1
+        )
+        """Number of bulk workers that send the message backlog in parallel (default is 1).
+        The backlog is split into :code:`thread_count` chunks of equal size. The order of
+        documents is only preserved within a chunk."""
+        connection_pool_size: int = field(
+            validator=[validators.instance_of(int), validators.gt(0)], default=10
+        )
+        """Maximum number of connections per host that are kept open (default is 10).
+        It should not be smaller than :code:`thread_count`, since bulk workers would otherwise
+        have to wait for a free connection."""
+        retry_queue_size: int = field(
+            validator=[validators.instance_of(int), validators.ge(0)], default=0
+        )
+        """Maximum number of documents rejected with code 429 that are kept in memory to be
+        retried in the background (default is 0). If it is 0, rejected documents are retried
+        inline with :code:`max_retries`, which blocks the pipeline. Otherwise, rejected documents
+        are retried until they are accepted and :code:`max_retries` is ignored. The backoff time
+        starts with 2 seconds and is doubled per try, but never exceeds 600 seconds."""
+        max_bulk_bytes: int = field(
+            validator=[validators.instance_of(int), validators.gt(0)], default=100 * 1024 * 1024
+        )
+        """Maximum size of one bulk request in bytes (default is 100 MiB)."""
+        min_bulk_bytes: int = field(
+            validator=[validators.instance_of(int), validators.gt(0)],
+            default=Factory(lambda self: self.max_bulk_bytes, takes_self=True),
+        )
+        """Minimum size of one bulk request in bytes (default is :code:`max_bulk_bytes`).
+        If it is lower than :code:`max_bulk_bytes`, the bulk size adapts between both values
+        depending on the request time and the rejected documents."""
+        target_bulk_request_time: float = field(
+            validator=[validators.instance_of(float), validators.gt(0)],
+            converter=float,
+            default=1.0,
+        )
+        """Request time in seconds that should not be exceeded by adaptive bulk requests
+        (default is 1.0)."""
+
+    @define(kw_only=True)
+    class BulkWorkerMetrics(Metric):
+        """Tracks statistics about one bulk worker"""
+
+        _prefix: str = "logprep_connector_bulk_worker_"
+
+        number_of_bulk_requests: int = 0
+        """Number of bulk requests that were sent by the worker"""
+        mean_bulk_request_time: float = 0.0
+        """Mean time in seconds a bulk request of the worker took"""
+        _mean_bulk_request_time_sample_counter: int = 0
+
+        def update_mean_bulk_request_time(self, new_sample):
+            """Updates the mean bulk request time"""
+            new_avg, new_sample_counter = calculate_new_average(
+                self.mean_bulk_request_time,
+                new_sample,
+                self._mean_bulk_request_time_sample_counter,
+            )
+            self.mean_bulk_request_time = new_avg
+            self._mean_bulk_request_time_sample_counter = new_sample_counter
+
+    @define(kw_only=True)
+    class SearchOutputMetrics(Connector.ConnectorMetrics):
+        """Tracks statistics about the Elasticsearch and Opensearch outputs"""
+
+        number_of_rejected_documents: int = 0
+        """Number of documents that were rejected with code 429 after all retries"""
+        number_of_retried_documents: int = 0
+        """Number of rejected documents that were retried from the retry queue"""
+        bulk_workers: List["ElasticsearchOutput.BulkWorkerMetrics"] = Factory(list)
+        """Metrics of all bulk workers"""
+
+    __slots__ = [
+        "_message_backlog",
+        "_processed_cnt",
+        "_index_cache",
+        "_serialized_backlog",
+        "_serialized_backlog_bytes",
+        "_bulk_bytes",
+        "_retry_queue",
+        "_retry_queue_condition",
+        "_retry_thread",
+        "_stop_retrying",
+    ]
+
+    _bulk_index_error = helpers.BulkIndexError
+
+    _serialization_error = elasticsearch.SerializationError
+
+    _expand_action = staticmethod(helpers.expand_action)
+
+    _bulk_errors = (
+        elasticsearch.SerializationError,
+        elasticsearch.ConnectionError,
+        helpers.BulkIndexError,
+    )
 
     _message_backlog: List
 
@@ -96,6 +234,26 @@ class ElasticsearchOutput(Output):
 
     _index_cache: dict
 
+    _serialized_backlog: List[bytes]
+
+    _serialized_backlog_bytes: int
+
+    _bulk_bytes: int
+
+    _retry_queue: deque
+
+    _retry_queue_condition: threading.Condition
+
+    _retry_thread: Optional[threading.Thread]
+
+    _stop_retrying: threading.Event
+
+    _initial_retry_backoff: float = 2
+
+    _max_cached_indices: int = 10000
+
+    _max_retry_backoff: float = 600
+
     def __init__(self, name: str, configuration: "ElasticsearchOutput.Config", logger: Logger):
         super().__init__(name, configuration, logger)
         self._message_backlog = [
@@ -103,6 +261,20 @@ class ElasticsearchOutput(Output):
         ] * self._config.message_backlog_size
         self._processed_cnt = 0
         self._index_cache = {}
+        self._serialized_backlog = []
+        self._serialized_backlog_bytes = 0
+        self._bulk_bytes = self._config.min_bulk_bytes
+        self._retry_queue = deque()
+        self._retry_queue_condition = threading.Condition()
+        self._retry_thread = None
+        self._stop_retrying = threading.Event()
+        self.metrics = self.SearchOutputMetrics(
+            labels=self.metric_labels,
+            bulk_workers=[
+                self.BulkWorkerMetrics(labels={**self.metric_labels, "worker": str(index)})
+                for index in range(self._config.thread_count)
+            ],
+        )
 
     @cached_property
     def ssl_context(self) -> ssl.SSLContext:
@@ -160,8 +332,13 @@ class ElasticsearchOutput(Output):
             http_auth=self.http_auth,
             ssl_context=self.ssl_context,
             timeout=self._config.timeout,
+            maxsize=self._config.connection_pool_size,
         )
 
+    @cached_property
+    def _thread_pool(self) -> ThreadPool:
+        return ThreadPool(processes=self._config.thread_count)
+
     @cached_property
     def _replace_pattern(self):
         return re.compile(r"%{\S+?}")
@@ -196,33 +373,213 @@ class ElasticsearchOutput(Output):
         Returns True to inform the pipeline to call the batch_finished_callback method in the
         configured input
         """
+        if self._config.message_backlog_bytes:
+            self._write_serialized_to_search_context(document)
+            return
         self._message_backlog[self._processed_cnt] = document
         currently_processed_cnt = self._processed_cnt + 1
         if currently_processed_cnt == self._config.message_backlog_size:
-            try:
-                helpers.bulk(
-                    self._search_context,
-                    self._message_backlog,
-                    max_retries=self._config.max_retries,
-                    chunk_size=self._config.message_backlog_size,
-                )
-            except elasticsearch.SerializationError as error:
-                self._handle_serialization_error(error)
-            except elasticsearch.ConnectionError as error:
-                self._handle_connection_error(error)
-            except helpers.BulkIndexError as error:
-                self._handle_bulk_index_error(error)
+            self._write_backlog(self._message_backlog)
             self._processed_cnt = 0
             if self.input_connector:
                 self.input_connector.batch_finished_callback()
         else:
             self._processed_cnt = currently_processed_cnt
 
+    def _write_serialized_to_search_context(self, document: dict):
+        """Serializes a document into the bulk request format and appends it to the serialized
+        backlog, which is sent if its size exceeds :code:`message_backlog_bytes`.
+
+        Documents that can't be serialized are replaced by a failed index document.
+
+        Parameters
+        ----------
+        document : dict
+           Document to store.
+        """
+        try:
+            serialized_document = self._serialize_bulk_action(document)
+        except self._serialization_error as error:
+            failed_document = self._build_failed_index_document(document, str(error))
+            self._add_dates(failed_document)
+            serialized_document = self._serialize_bulk_action(failed_document)
+        self._serialized_backlog.append(serialized_document)
+        self._serialized_backlog_bytes += len(serialized_document)
+        if self._serialized_backlog_bytes >= self._config.message_backlog_bytes:
+            self._write_backlog(self._serialized_backlog)
+            self._serialized_backlog = []
+            self._serialized_backlog_bytes = 0
+            if self.input_connector:
+                self.input_connector.batch_finished_callback()
+
+    @property
+    def fill_level(self) -> float:
+        """Fraction of :code:`retry_queue_size` that is taken by rejected documents"""
+        if not self._config.retry_queue_size:
+            return 0.0
+        return len(self._retry_queue) / self._config.retry_queue_size
+
+    def flush(self):
+        """Sends the documents of the message backlog even if it is not full yet and informs the
+        input about the finished batch."""
+        if self._config.message_backlog_bytes:
+            backlog = self._serialized_backlog
+            self._serialized_backlog = []
+            self._serialized_backlog_bytes = 0
+        else:
+            backlog = self._message_backlog[: self._processed_cnt]
+            self._processed_cnt = 0
+        if backlog:
+            self._write_backlog(backlog)
+        if self.input_connector:
+            self.input_connector.batch_finished_callback()
+
+    def _serialize_bulk_action(self, document: dict) -> bytes:
+        """Serializes a document into the action and source lines of a bulk request in the same
+        way the bulk helpers do it."""
+        serializer = self._search_context.transport.serializer
+        action, source = self._expand_action(document)
+        lines = [serializer.dumps(action)]
+        if source is not None:
+            lines.append(serializer.dumps(source))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _write_backlog(self, backlog: list):
+        """Sends the message backlog in bulks and handles the errors of all bulk workers.
+
+        If more than one bulk worker is configured, the backlog is split into one chunk per worker
+        and the chunks are sent in parallel. Errors are handled after all workers have finished,
+        so that a failing chunk does not interrupt the other workers.
+
+        Parameters
+        ----------
+        backlog : list
+           Documents or serialized documents to send.
+        """
+        if self._config.thread_count > 1:
+            chunks = self._split_backlog(backlog, self._config.thread_count)
+            errors_per_worker = self._thread_pool.starmap(self._bulk, enumerate(chunks))
+        else:
+            errors_per_worker = [self._bulk(0, backlog)]
+        for errors in errors_per_worker:
+            for error in errors:
+                self._handle_bulk_error(error)
+        if self._config.retry_queue_size:
+            self._wait_for_free_retry_queue()
+
+    @staticmethod
+    def _split_backlog(backlog: list, number_of_chunks: int) -> List[list]:
+        chunk_size = -(-len(backlog) // number_of_chunks)
+        return [backlog[i : i + chunk_size] for i in range(0, len(backlog), chunk_size)]
+
+    def _bulk(self, worker_index: int, documents: list) -> List[BaseException]:
+        """Sends documents in bulk requests of the current bulk size and tracks the worker
+        metrics.
+
+        Errors are returned instead of raised, since this method is executed by the thread pool
+        and the errors have to be handled by the calling thread.
+
+        Parameters
+        ----------
+        worker_index : int
+           Index of the bulk worker that sends the documents.
+        documents : list
+           Documents or serialized documents to send.
+
+        Returns
+        -------
+        errors : list
+            The errors that occurred while sending the bulk requests.
+        """
+        worker_metrics = self.metrics.bulk_workers[worker_index]
+        if self._config.message_backlog_bytes:
+            send_bulk = self._send_serialized_bulk
+        else:
+            send_bulk = self._send_bulk
+        errors = []
+        for bulk in self._split_by_bulk_size(documents):
+            begin = time.perf_counter()
+            try:
+                send_bulk(bulk)
+            except self._bulk_errors as error:
+                errors.append(error)
+            finally:
+                request_time = time.perf_counter() - begin
+                worker_metrics.number_of_bulk_requests += 1
+                worker_metrics.update_mean_bulk_request_time(request_time)
+                if request_time > self._config.target_bulk_request_time:
+                    self._decrease_bulk_size()
+                else:
+                    self._increase_bulk_size()
+        return errors
+
+    def _split_by_bulk_size(self, documents: list) -> List[list]:
+        """Splits documents into bulks that do not exceed the current bulk size.
+
+        The size of the documents is estimated by serializing the first document only.
+        """
+        if self._config.min_bulk_bytes == self._config.max_bulk_bytes:
+            return [documents]
+        if isinstance(documents[0], bytes):
+            document_size = len(documents[0])
+        else:
+            document_size = len(json.dumps(documents[0], default=str)) + 1
+        documents_per_bulk = max(1, self._bulk_bytes // document_size)
+        return self._split_backlog(documents, -(-len(documents) // documents_per_bulk))
+
+    def _decrease_bulk_size(self):
+        self._bulk_bytes = max(self._config.min_bulk_bytes, self._bulk_bytes // 2)
+
+    def _increase_bulk_size(self):
+        self._bulk_bytes = min(self._config.max_bulk_bytes, int(self._bulk_bytes * 1.25))
+
+    @property
+    def _bulk_options(self) -> dict:
+        max_retries = 0 if self._config.retry_queue_size else self._config.max_retries
+        return {"max_retries": max_retries, "max_chunk_bytes": self._config.max_bulk_bytes}
+
+    def _send_bulk(self, documents: list):
+        helpers.bulk(
+            self._search_context, documents, chunk_size=len(documents), **self._bulk_options
+        )
+
+    def _send_serialized_bulk(self, serialized_documents: List[bytes]):
+        """Sends serialized documents as raw body of a bulk request.
+
+        Raises
+        ------
+        BulkIndexError
+            If documents could not be indexed, with the same errors the bulk helpers would raise.
+        """
+        response = self._search_context.bulk(body=b"".join(serialized_documents))
+        if not response.get("errors"):
+            return
+        errors = []
+        for serialized_document, item in zip(serialized_documents, response["items"]):
+            op_type, error_info = next(iter(item.items()))
+            if 200 <= error_info.get("status", 500) < 300:
+                continue
+            _, _, source = serialized_document.partition(b"\n")
+            if source:
+                error_info["data"] = json.loads(source)
+            errors.append({op_type: error_info})
+        raise self._bulk_index_error(f"{len(errors)} document(s) failed to index.", errors)
+
+    def _handle_bulk_error(self, error: BaseException):
+        if isinstance(error, elasticsearch.SerializationError):
+            self._handle_serialization_error(error)
+        elif isinstance(error, elasticsearch.ConnectionError):
+            self._handle_connection_error(error)
+        elif isinstance(error, helpers.BulkIndexError):
+            self._handle_bulk_index_error(error)
+
     def _handle_bulk_index_error(self, error: helpers.BulkIndexError):
         """Handle bulk indexing error for elasticsearch bulk indexing.
 
         Documents that could not be sent to elastiscsearch due to index errors are collected and
         sent into an error index that should always accept all documents.
+        Documents that were rejected with code 429 are put into the retry queue instead if it is
+        enabled.
         This can lead to a rebuild of the pipeline if this causes another exception.
 
         Parameters
@@ -232,8 +589,14 @@ class ElasticsearchOutput(Output):
 
         """
         error_documents = []
+        rejected_documents = []
         for bulk_error in error.errors:
-            _, error_info = bulk_error.popitem()
+            op_type, error_info = bulk_error.popitem()
+            if error_info.get("status") == 429:
+                self.metrics.number_of_rejected_documents += 1
+                if self._config.retry_queue_size:
+                    rejected_documents.append(self._build_rejected_document(op_type, error_info))
+                    continue
             data = error_info.get("data") if "data" in error_info else None
             error_type = error_info.get("error").get("type")
             error_reason = error_info.get("error").get("reason")
@@ -241,7 +604,77 @@ class ElasticsearchOutput(Output):
             error_document = self._build_failed_index_document(data, reason)
             self._add_dates(error_document)
             error_documents.append(error_document)
-        helpers.bulk(self._search_context, error_documents)
+        if rejected_documents:
+            self._decrease_bulk_size()
+            self._add_to_retry_queue(rejected_documents)
+        if error_documents:
+            self._send_bulk(error_documents)
+
+    @staticmethod
+    def _build_rejected_document(op_type: str, error_info: dict) -> dict:
+        document = dict(error_info.get("data", {}))
+        document["_index"] = error_info.get("_index")
+        if op_type != "index":
+            document["_op_type"] = op_type
+        return document
+
+    def _add_to_retry_queue(self, documents: list):
+        with self._retry_queue_condition:
+            self._retry_queue.extend(documents)
+        if self._retry_thread is None:
+            self._retry_thread = threading.Thread(
+                target=self._retry_rejected_documents, name="retry-rejected-documents", daemon=True
+            )
+            self._retry_thread.start()
+
+    def _wait_for_free_retry_queue(self):
+        """Blocks until the retry queue has space for new rejected documents."""
+        with self._retry_queue_condition:
+            self._retry_queue_condition.wait_for(
+                lambda: len(self._retry_queue) < self._config.retry_queue_size
+                or self._stop_retrying.is_set()
+            )
+
+    def _retry_rejected_documents(self):
+        """Retries the documents of the retry queue until the output is shut down.
+
+        The backoff is doubled for every retry that is rejected again and is reset as soon as
+        all documents were accepted.
+        """
+        backoff = self._initial_retry_backoff
+        while not self._stop_retrying.wait(backoff):
+            if self._retry_pending_documents():
+                backoff = self._initial_retry_backoff
+            else:
+                backoff = min(self._max_retry_backoff, backoff * 2)
+
+    def _retry_pending_documents(self) -> bool:
+        """Sends all documents of the retry queue once.
+
+        Returns
+        -------
+        bool
+            True if no document had to be put back into the retry queue.
+        """
+        with self._retry_queue_condition:
+            documents = list(self._retry_queue)
+            self._retry_queue.clear()
+        if not documents:
+            return True
+        self.metrics.number_of_retried_documents += len(documents)
+        try:
+            self._send_bulk(documents)
+        except self._bulk_index_error as error:
+            try:
+                self._handle_bulk_index_error(error)
+            except self._bulk_errors as handling_error:
+                self._logger.warning(f"Could not send failed documents: {handling_error}")
+        except self._bulk_errors:
+            with self._retry_queue_condition:
+                self._retry_queue.extendleft(reversed(documents))
+        with self._retry_queue_condition:
+            self._retry_queue_condition.notify_all()
+            return not self._retry_queue
 
     def _handle_connection_error(self, error: elasticsearch.ConnectionError):
         """Handle connection error for elasticsearch bulk indexing.
@@ -359,9 +792,71 @@ class ElasticsearchOutput(Output):
         self._write_to_search_context(error_document)
 
     def _add_dates(self, document):
-        date_format_matches = self._replace_pattern.findall(document["_index"])
-        if date_format_matches:
-            now = arrow.now()
-            for date_format_match in date_format_matches:
-                formatted_date = now.format(date_format_match[2:-1])
-                document["_index"] = re.sub(date_format_match, formatted_date, document["_index"])
+        """Replaces the date patterns in the index of the document with the current date.
+
+        Rendered index names are cached per index template until the smallest time unit of its
+        date patterns has passed, i.e. until the next day for :code:`%{YYYY-MM-DD}`.
+        """
+        index_template = document["_index"]
+        index, expires_at = self._index_cache.get(index_template, (None, 0.0))
+        if time.time() >= expires_at:
+            index, expires_at = self._render_index(index_template)
+            if len(self._index_cache) >= self._max_cached_indices:
+                self._index_cache.clear()
+            self._index_cache[index_template] = (index, expires_at)
+        document["_index"] = index
+
+    def _render_index(self, index_template: str) -> Tuple[str, float]:
+        """Renders the date patterns of an index template.
+
+        Parameters
+        ----------
+        index_template : str
+           Index name that can contain date patterns like :code:`%{YYYY-MM-DD}`.
+
+        Returns
+        -------
+        index : str
+            The index name with the current dates.
+        expires_at : float
+            Timestamp until the index name is valid.
+        """
+        date_formats = [match[2:-1] for match in self._replace_pattern.findall(index_template)]
+        if not date_formats:
+            return index_template, math.inf
+        now = arrow.now()
+        index = self._replace_pattern.sub(
+            lambda match: now.format(match.group()[2:-1]), index_template
+        )
+        time_unit = self._smallest_time_unit(date_formats)
+        if time_unit is None:
+            return index, 0.0
+        return index, now.floor(time_unit).shift(**{f"{time_unit}s": 1}).timestamp()
+
+    @staticmethod
+    def _smallest_time_unit(date_formats: List[str]) -> Optional[str]:
+        """Returns the smallest time unit of the date formats or None if it is below seconds."""
+        tokens = "".join(re.sub(r"\[.*?\]", "", date_format) for date_format in date_formats)
+        if "S" in tokens or "x" in tokens:
+            return None
+        for time_unit, unit_tokens in (("second", "sX"), ("minute", "m"), ("hour", "HhAa")):
+            if any(token in tokens for token in unit_tokens):
+                return time_unit
+        return "day"
+
+    def shut_down(self):
+        """Stops the bulk workers and sends the documents of the retry queue a last time."""
+        if self._config.thread_count > 1 and "_thread_pool" in self.__dict__:
+            self._thread_pool.close()
+            self._thread_pool.join()
+        if self._retry_thread is not None:
+            self._stop_retrying.set()
+            with self._retry_queue_condition:
+                self._retry_queue_condition.notify_all()
+            self._retry_thread.join()
+            self._retry_pending_documents()
+            if self._retry_queue:
+                self._logger.warning(
+                    f"{len(self._retry_queue)} rejected documents could not be sent to "
+                    f"{self.describe()} before shutting down"
+                )
@@ -0,0 +1,324 @@
+"""
+FileInput
+==========
+
+A file input that tails one or more files with json lines, e.g. log files written on an edge host.
+
+The files are given as paths or glob patterns. Patterns are resolved again every
+:code:`discover_interval` seconds to pick up new files. Every file is read in blocks of
+:code:`read_block_size` bytes which are split into lines at once. An incomplete last line is kept
+until the rest of the line was written.
+
+A file is reopened if its path points to a new file (rotation) and it is read again from the
+beginning if it got smaller than the read offset (truncation).
+
+If :code:`checkpoint_path` is set, the offsets of the documents that were stored by the output are
+written into this file when the output calls :code:`batch_finished_callback`. After a restart, the
+files are read from these offsets. Since the offsets are only advanced after a document was
+stored, documents are delivered at least once.
+
+Example
+^^^^^^^
+..  code-block:: yaml
+    :linenos:
+
+    input:
+      myfileinput:
+        type: file_input
+        paths: [/var/log/app/*.jsonl]
+        checkpoint_path: /var/lib/logprep/file_input_checkpoints.json
+        start: beginning
+        read_block_size: 1048576
+        discover_interval: 1.0
+        checkpoint_interval: 1.0
+"""
+
+import glob
+import json
+import os
+import time
+from collections import deque
+from logging import Logger
+from typing import List, Optional, Tuple, Union
+
+from attrs import define, field, validators
+
+from logprep.abc.input import CriticalInputError, Input
+
+
+class TailedFile:
+    """A file that is read block by block and split into lines with their end offsets."""
+
+    __slots__ = ["path", "inode", "offset", "_file", "_remainder"]
+
+    def __init__(self, path: str, offset: int = 0):
+        self.path = path
+        self._file = open(path, "rb", buffering=0)  # pylint: disable=consider-using-with
+        stat = os.fstat(self._file.fileno())
+        self.inode = stat.st_ino
+        self.offset = offset if offset <= stat.st_size else 0
+        self._file.seek(self.offset)
+        self._remainder = b""
+
+    def read_lines(self, block_size: int) -> List[Tuple[bytes, int]]:
+        """Reads blocks until they contain complete lines and returns these lines with the offset
+        behind them. An empty list is returned if the end of the file is reached."""
+        while True:
+            block = self._file.read(block_size)
+            if not block:
+                return []
+            lines = (self._remainder + block).split(b"\n")
+            self._remainder = lines.pop()
+            lines_with_offsets = self._with_offsets(lines)
+            if lines_with_offsets:
+                return lines_with_offsets
+
+    def read_remainder(self) -> List[Tuple[bytes, int]]:
+        """Returns the incomplete last line, e.g. if the file was rotated."""
+        line, self._remainder = self._remainder, b""
+        self.offset += len(line)
+        return [(line, self.offset)] if line.strip() else []
+
+    def _with_offsets(self, lines: List[bytes]) -> List[Tuple[bytes, int]]:
+        lines_with_offsets = []
+        offset = self.offset
+        for line in lines:
+            offset += len(line) + 1
+            if line.strip():
+                lines_with_offsets.append((line, offset))
+        self.offset = offset
+        return lines_with_offsets
+
+    def is_rotated(self) -> bool:
+        """Checks if the path points to another file than the opened one."""
+        try:
+            return os.stat(self.path).st_ino != self.inode
+        except FileNotFoundError:
+            return False
+
+    def is_truncated(self) -> bool:
+        """Checks if the file is smaller than the read offset."""
+        return os.fstat(self._file.fileno()).st_size < self.offset + len(self._remainder)
+
+    def rewind(self):
+        """Reads the file again from the beginning."""
+        self._file.seek(0)
+        self.offset = 0
+        self._remainder = b""
+
+    def close(self):
+        """Closes the file."""
+        self._file.close()
+
+
+class FileInput(Input):
+    """FileInput Connector"""
+
+    @define(kw_only=True)
+    class Config(Input.Config):
+        """FileInput connector specific configuration"""
+
+        paths: List[str] = field(
+            validator=validators.deep_iterable(
+                member_validator=validators.instance_of(str),
+                iterable_validator=validators.instance_of(list),
+            )
+        )
+        """A list of paths or glob patterns of the files that should be read."""
+        checkpoint_path: str = field(validator=validators.instance_of(str), default="")
+        """Path to a json file in which the offsets of the stored documents are kept
+        (default is no checkpointing)."""
+        start: str = field(validator=validators.in_(["beginning", "end"]), default="beginning")
+        """Position at which files without a checkpoint are read if they are found on start up.
+        It can be :code:`beginning` or :code:`end` (default is :code:`beginning`). Files that
+        are found later are always read from the beginning."""
+        read_block_size: int = field(
+            validator=[validators.instance_of(int), validators.gt(0)], default=1048576
+        )
+        """Number of bytes that are read at once from a file (default is 1 MiB)."""
+        discover_interval: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=1.0,
+        )
+        """Time in seconds after which the paths are resolved again to find new files
+        (default is 1.0)."""
+        checkpoint_interval: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=1.0,
+        )
+        """Minimum time in seconds between two writes of the checkpoint file (default is 1.0).
+        Delayed writes can only cause documents to be read again after a crash. The checkpoint
+        file is always written on shut down."""
+
+    current_offset: int
+
+    _files: dict
+
+    _lines: deque
+
+    _read_offsets: dict
+
+    _checkpoints: dict
+
+    _rotated_offsets: dict
+
+    _discovered_at: float
+
+    _checkpointed_at: float
+
+    __slots__ = [
+        "current_offset",
+        "_files",
+        "_lines",
+        "_read_offsets",
+        "_checkpoints",
+        "_rotated_offsets",
+        "_discovered_at",
+        "_checkpointed_at",
+    ]
+
+    def __init__(self, name: str, configuration: "Input.Config", logger: Logger):
+        super().__init__(name, configuration, logger)
+        self.current_offset = 0
+        self._files = {}
+        self._lines = deque()
+        self._read_offsets = {}
+        self._checkpoints = {}
+        self._rotated_offsets = {}
+        self._discovered_at = 0.0
+        self._checkpointed_at = 0.0
+
+    def describe(self) -> str:
+        base_description = super().describe()
+        return f"{base_description} - File Input: {', '.join(self._config.paths)}"
+
+    def setup(self):
+        super().setup()
+        if self._config.checkpoint_path and os.path.exists(self._config.checkpoint_path):
+            with open(self._config.checkpoint_path, "r", encoding="utf8") as checkpoint_file:
+                self._checkpoints = json.load(checkpoint_file)
+        self._discover_files(at_start=True)
+
+    def _discover_files(self, at_start: bool = False):
+        for pattern in self._config.paths:
+            for path in sorted(glob.glob(pattern)):
+                if path in self._files or not os.path.isfile(path):
+                    continue
+                inode = os.stat(path).st_ino
+                if any(tailed_file.inode == inode for tailed_file in self._files.values()):
+                    continue  # a rotated file that is still read under its former path
+                self._files[path] = TailedFile(path, self._start_offset(path, at_start))
+        self._discovered_at = time.time()
+
+    def _start_offset(self, path: str, at_start: bool) -> int:
+        """Returns the checkpointed offset of the file, which is looked up by its inode to find
+        rotated files under their new path."""
+        inode = os.stat(path).st_ino
+        if inode in self._rotated_offsets:
+            return self._rotated_offsets.pop(inode)
+        for checkpoint in self._checkpoints.values():
+            if checkpoint["inode"] == inode:
+                return checkpoint["offset"]
+        if at_start and self._config.start == "end":
+            return os.stat(path).st_size
+        return 0
+
+    def _read_blocks(self):
+        if time.time() - self._discovered_at >= self._config.discover_interval:
+            self._discover_files()
+        for path, tailed_file in list(self._files.items()):
+            lines = tailed_file.read_lines(self._config.read_block_size)
+            if not lines and tailed_file.is_rotated():
+                self._lines.extend((tailed_file, *line) for line in tailed_file.read_remainder())
+                tailed_file.close()
+                self._rotated_offsets[tailed_file.inode] = tailed_file.offset
+                tailed_file = self._files[path] = TailedFile(path)
+                lines = tailed_file.read_lines(self._config.read_block_size)
+            elif not lines and tailed_file.is_truncated():
+                tailed_file.rewind()
+                lines = tailed_file.read_lines(self._config.read_block_size)
+            self._lines.extend((tailed_file, *line) for line in lines)
+
+    def _get_raw_event(self, timeout: float) -> Optional[bytes]:
+        """Get the next line from the files and wait for the timeout if there is none.
+
+        Parameters
+        ----------
+        timeout : float
+           Time to wait if no new lines were written.
+
+        Returns
+        -------
+        line : bytes
+            The next line, which was read from one of the files.
+        """
+        if not self._lines:
+            self._read_blocks()
+        if not self._lines:
+            time.sleep(timeout)
+            return None
+        tailed_file, line, offset = self._lines.popleft()
+        self._read_offsets[tailed_file.path] = (tailed_file.inode, offset)
+        self.current_offset = offset
+        return line
+
+    def _get_event(self, timeout: float) -> Union[Tuple[None, None], Tuple[dict, bytes]]:
+        """Parse the next line from the files into a json.
+
+        Parameters
+        ----------
+        timeout : float
+           Time to wait if no new lines were written.
+
+        Returns
+        -------
+        event_dict : dict
+            A parsed document obtained from the files.
+        raw_event : bytes
+            The line of the document.
+
+        Raises
+        ------
+        CriticalInputError
+            Raises if a line is not a valid json.
+        """
+        raw_event = self._get_raw_event(timeout)
+        if raw_event is None:
+            return None, None
+        try:
+            event_dict = json.loads(raw_event)
+        except ValueError as error:
+            raise CriticalInputError("Input line is not a valid json string", raw_event) from error
+        if not isinstance(event_dict, dict):
+            raise CriticalInputError("Input line could not be parsed as dict", event_dict)
+        return event_dict, raw_event
+
+    def batch_finished_callback(self):
+        """Advance the checkpoints to the offsets of the documents that were returned so far.
+        Should be called by output connectors if they are finished processing a batch of records.
+        """
+        for path, (inode, offset) in self._read_offsets.items():
+            self._checkpoints[path] = {"inode": inode, "offset": offset}
+        self._read_offsets.clear()
+        if time.time() - self._checkpointed_at >= self._config.checkpoint_interval:
+            self._write_checkpoints()
+
+    def _write_checkpoints(self):
+        if not self._config.checkpoint_path:
+            return
+        temporary_path = f"{self._config.checkpoint_path}.tmp"
+        with open(temporary_path, "w", encoding="utf8") as checkpoint_file:
+            json.dump(self._checkpoints, checkpoint_file)
+        os.replace(temporary_path, self._config.checkpoint_path)
+        self._checkpointed_at = time.time()
+
+    def shut_down(self):
+        """Write the checkpoints and close all files."""
+        self._write_checkpoints()
+        for tailed_file in self._files.values():
+            tailed_file.close()
+        self._files.clear()
+        self._lines.clear()
+        super().shut_down()
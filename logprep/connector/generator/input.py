@@ -0,0 +1,293 @@
+"""
+GeneratorInput
+==============
+
+An input that generates synthetic documents from templates, e.g. for load tests without a kafka
+cluster or prepared files.
+
+The templates are read from json lines files, which contain one template document per line.
+Strings in the templates can contain placeholders like :code:`${source_ip}`, which are replaced
+by values that are drawn randomly for every document. If a string consists of a placeholder only,
+it is replaced by the value with its type, otherwise the value is inserted as string.
+
+The placeholders are configured in :code:`placeholders` by their name and :code:`type`:
+
+- :code:`ip`: A random address of the :code:`network` (default is :code:`10.0.0.0/8`).
+- :code:`hostname`: :code:`prefix` followed by a random number below :code:`count` and an
+  optional :code:`domain` (defaults are :code:`host-` and 100).
+- :code:`choice`: One of the :code:`values`, which are drawn with the optional :code:`weights`,
+  e.g. event ids with their relative frequencies.
+- :code:`integer`: A random integer between :code:`min` and :code:`max` (both inclusive).
+- :code:`timestamp`: The time at which the document is returned as iso timestamp.
+
+To keep the generation cheap, :code:`pool_size` documents are rendered and serialized on setup and
+returned in turn. Only the timestamps are inserted when a document is returned. The documents are
+rendered with a random generator that is initialized with :code:`seed`, thus the same
+configuration always generates the same documents apart from their timestamps.
+
+Documents are generated as fast as possible or at a :code:`rate` in documents per second. If
+:code:`count` is set, the input is disconnected after this number of documents.
+
+Example
+^^^^^^^
+..  code-block:: yaml
+    :linenos:
+
+    input:
+      mygeneratorinput:
+        type: generator_input
+        templates: [/path/to/templates.jsonl]
+        placeholders:
+          source_ip:
+            type: ip
+            network: 192.168.0.0/16
+          host:
+            type: hostname
+            prefix: ws-
+            count: 500
+            domain: example.com
+          event_id:
+            type: choice
+            values: [4624, 4625, 4688]
+            weights: [70, 5, 25]
+          timestamp:
+            type: timestamp
+        rate: 10000
+        count: 0
+        pool_size: 1000
+        seed: 42
+
+with a template like
+
+..  code-block:: json
+
+    {"@timestamp": "${timestamp}", "host": {"name": "${host}"},
+     "winlog": {"event_id": "${event_id}", "event_data": {"IpAddress": "${source_ip}"}}}
+"""
+
+import ipaddress
+import json
+import random
+import re
+import sys
+import time
+from logging import Logger
+from string import Template
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from attrs import define, field, validators
+
+from logprep.abc.input import Input, SourceDisconnectedError
+from logprep.factory_error import InvalidConfigurationError
+from logprep.util.validators import dict_structure_validator, list_of_files_validator
+
+if sys.version_info.minor < 8:  # pragma: no cover
+    from backports.cached_property import cached_property  # pylint: disable=import-error
+else:
+    from functools import cached_property
+
+
+PLACEHOLDER_OPTIONS = {
+    "ip": {"type": str, "network": Optional[str]},
+    "hostname": {
+        "type": str,
+        "prefix": Optional[str],
+        "count": Optional[int],
+        "domain": Optional[str],
+    },
+    "choice": {"type": str, "values": list, "weights": Optional[list]},
+    "integer": {"type": str, "min": int, "max": int},
+    "timestamp": {"type": str},
+}
+
+SINGLE_PLACEHOLDER_PATTERN = re.compile(r"\$\{(\w+)\}")
+
+
+def _placeholders_validator(_, attribute, value):
+    """validate the options of the placeholders by their type"""
+    for name, options in value.items():
+        if not isinstance(options, dict) or options.get("type") not in PLACEHOLDER_OPTIONS:
+            raise InvalidConfigurationError(
+                f"{attribute.name} '{name}' needs a type of {list(PLACEHOLDER_OPTIONS)}"
+            )
+        dict_structure_validator(_, attribute, options, PLACEHOLDER_OPTIONS[options["type"]])
+        if options["type"] == "timestamp":
+            continue
+        try:
+            _value_generator(options)(random.Random())
+        except (ValueError, IndexError, TypeError) as error:
+            raise InvalidConfigurationError(f"{attribute.name} '{name}': {error}") from error
+
+
+def _value_generator(options: dict) -> Callable[[random.Random], Any]:
+    """Returns a function that draws a value of the placeholder from a random generator."""
+    placeholder_type = options["type"]
+    if placeholder_type == "ip":
+        network = ipaddress.ip_network(options.get("network", "10.0.0.0/8"))
+        first_address, size = network.network_address, network.num_addresses
+        return lambda rng: str(first_address + rng.randrange(size))
+    if placeholder_type == "hostname":
+        prefix, count = options.get("prefix", "host-"), options.get("count", 100)
+        suffix = f".{options['domain']}" if options.get("domain") else ""
+        return lambda rng: f"{prefix}{rng.randrange(count)}{suffix}"
+    if placeholder_type == "choice":
+        values, weights = options["values"], options.get("weights")
+        if not values or (weights is not None and len(weights) != len(values)):
+            raise ValueError("values must not be empty and weights must have the same length")
+        return lambda rng: rng.choices(values, weights)[0]
+    if placeholder_type == "integer":
+        minimum, maximum = options["min"], options["max"]
+        return lambda rng: rng.randint(minimum, maximum)
+    raise ValueError(f"no value generator for type '{placeholder_type}'")
+
+
+class GeneratorInput(Input):
+    """GeneratorInput Connector"""
+
+    @define(kw_only=True)
+    class Config(Input.Config):
+        """GeneratorInput connector specific configuration"""
+
+        templates: List[str] = field(validator=list_of_files_validator)
+        """A list of json lines files with one template document per line."""
+        placeholders: dict = field(
+            validator=[
+                validators.instance_of(dict),
+                _placeholders_validator,
+            ],
+            factory=dict,
+        )
+        """The placeholders by name with their :code:`type` and options as described above."""
+        rate: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=0.0,
+        )
+        """Number of documents that are generated per second (default is 0, which generates
+        documents as fast as possible)."""
+        count: int = field(validator=[validators.instance_of(int), validators.ge(0)], default=0)
+        """Number of documents after which the input is disconnected (default is 0, which
+        generates documents infinitely)."""
+        pool_size: int = field(
+            validator=[validators.instance_of(int), validators.gt(0)], default=1000
+        )
+        """Number of documents that are rendered on setup and returned in turn
+        (default is 1000)."""
+        seed: int = field(validator=validators.instance_of(int), default=0)
+        """Seed of the random generator that renders the documents (default is 0)."""
+
+    _generated: int
+
+    _started_at: Optional[float]
+
+    __slots__ = ["_generated", "_started_at"]
+
+    def __init__(self, name: str, configuration: "Input.Config", logger: Logger):
+        super().__init__(name, configuration, logger)
+        self._generated = 0
+        self._started_at = None
+
+    def describe(self) -> str:
+        base_description = super().describe()
+        return f"{base_description} - Generator Input: {', '.join(self._config.templates)}"
+
+    def setup(self):
+        super().setup()
+        _ = self._pool
+
+    @cached_property
+    def _templates(self) -> List[dict]:
+        templates = []
+        for path in self._config.templates:
+            with open(path, "r", encoding="utf8") as template_file:
+                templates.extend(json.loads(line) for line in template_file if line.strip())
+        if not templates:
+            raise InvalidConfigurationError(f"{self.describe()}: templates contain no documents")
+        return templates
+
+    @cached_property
+    def _timestamp_placeholders(self) -> Tuple[bytes, ...]:
+        return tuple(
+            f"${{{name}}}".encode("utf8")
+            for name, options in self._config.placeholders.items()
+            if options["type"] == "timestamp"
+        )
+
+    @cached_property
+    def _pool(self) -> List[bytes]:
+        """The serialized documents, which are rendered once."""
+        rng = random.Random(self._config.seed)
+        value_generators = {
+            name: _value_generator(options)
+            for name, options in self._config.placeholders.items()
+            if options["type"] != "timestamp"
+        }
+        pool = []
+        for _ in range(self._config.pool_size):
+            template = rng.choice(self._templates)
+            values = {name: generate(rng) for name, generate in value_generators.items()}
+            document = self._render(template, values)
+            pool.append(json.dumps(document, separators=(",", ":")).encode("utf8"))
+        return pool
+
+    def _render(self, template: Any, values: dict) -> Any:
+        """Replaces the placeholders in all strings of the template. Timestamp placeholders have
+        no value yet and are kept for the time the document is returned."""
+        if isinstance(template, dict):
+            return {key: self._render(value, values) for key, value in template.items()}
+        if isinstance(template, list):
+            return [self._render(value, values) for value in template]
+        if isinstance(template, str):
+            match = SINGLE_PLACEHOLDER_PATTERN.fullmatch(template)
+            if match and match.group(1) in values:
+                return values[match.group(1)]
+            return Template(template).safe_substitute(values)
+        return template
+
+    def _wait_for_rate(self, timeout: float) -> bool:
+        """Waits until the next document is due and returns False if it is not due within the
+        timeout."""
+        now = time.time()
+        if self._started_at is None:
+            self._started_at = now
+        if not self._config.rate:
+            return True
+        delay = self._started_at + self._generated / self._config.rate - now
+        if delay > timeout:
+            time.sleep(timeout)
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def _get_event(self, timeout: float) -> Union[Tuple[None, None], Tuple[dict, bytes]]:
+        """Returns the next document of the pool with the current time in its timestamps.
+
+        Parameters
+        ----------
+        timeout : float
+           Maximum time to wait for the next document if a rate is configured.
+
+        Returns
+        -------
+        event_dict : dict
+            The generated document.
+        raw_event : bytes
+            The serialized document.
+
+        Raises
+        ------
+        SourceDisconnectedError
+            Raises if :code:`count` documents were generated.
+        """
+        if self._config.count and self._generated >= self._config.count:
+            raise SourceDisconnectedError
+        if not self._wait_for_rate(timeout):
+            return None, None
+        raw_event = self._pool[self._generated % len(self._pool)]
+        self._generated += 1
+        if self._timestamp_placeholders:
+            timestamp = self._clock.now().encode("utf8")
+            for placeholder in self._timestamp_placeholders:
+                raw_event = raw_event.replace(placeholder, timestamp)
+        return json.loads(raw_event), raw_event
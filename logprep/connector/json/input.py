@@ -4,6 +4,11 @@ JsonInput
 
 A json input that returns the documents it was initialized with.
 
+The file is read lazily in chunks and every document of the list is parsed when it is requested,
+so that large files can be read with constant memory. Files compressed with gzip or zstd are
+decompressed while reading. The byte offset behind the last returned document in the
+(decompressed) file is available as :code:`current_offset`.
+
 If a "document" is derived from BaseException, that exception will be thrown instead of
 returning a document. The exception will be removed and subsequent calls may return documents or
 throw other exceptions in the given order.
@@ -20,11 +25,12 @@ Example
 """
 
 import sys
+from logging import Logger
 
 from attrs import define
-from logprep.abc.input import Input
+from logprep.abc.input import Input, SourceDisconnectedError
 from logprep.connector.dummy.input import DummyInput
-from logprep.util.json_handling import parse_json
+from logprep.util.json_handling import iterate_json
 
 if sys.version_info.minor < 8:  # pragma: no cover
     from backports.cached_property import cached_property  # pylint: disable=import-error
@@ -43,6 +49,27 @@ class JsonInput(DummyInput):
         """A path to a file in json format, with can also include multiple jsons
         dicts wrapped in a list."""
 
+    current_offset: int
+
+    __slots__ = ["current_offset"]
+
+    def __init__(self, name: str, configuration: "Input.Config", logger: Logger):
+        super().__init__(name, configuration, logger)
+        self.current_offset = 0
+
     @cached_property
     def _documents(self):
-        return parse_json(self._config.documents_path)
+        return iterate_json(self._config.documents_path)
+
+    def _get_event(self, timeout: float) -> tuple:
+        """Parse the next document from the file and remember its offset"""
+        try:
+            self.current_offset, document = next(self._documents)
+        except StopIteration as error:
+            raise SourceDisconnectedError from error
+        return document, None
+
+    def shut_down(self):
+        if "_documents" in self.__dict__:
+            self._documents.close()
+        super().shut_down()
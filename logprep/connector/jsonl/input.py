@@ -8,6 +8,10 @@ If a "document" is derived from BaseException, that exception will be thrown ins
 returning a document. The exception will be removed and subsequent calls may return documents or
 throw other exceptions in the given order.
 
+The file is read lazily line by line, so that large files can be read with constant memory.
+Files compressed with gzip or zstd are decompressed while reading. The byte offset behind the last
+returned document in the (decompressed) file is available as :code:`current_offset`.
+
 Example
 ^^^^^^^
 ..  code-block:: yaml
@@ -19,9 +23,10 @@ Example
         documents_path: path/to/a/document.jsonl
 
 """
+
 import sys
 from logprep.connector.json.input import JsonInput
-from logprep.util.json_handling import parse_jsonl
+from logprep.util.json_handling import iterate_jsonl
 
 if sys.version_info.minor < 8:  # pragma: no cover
     from backports.cached_property import cached_property  # pylint: disable=import-error
@@ -34,4 +39,4 @@ class JsonlInput(JsonInput):
 
     @cached_property
     def _documents(self):
-        return parse_jsonl(self._config.documents_path)
+        return iterate_jsonl(self._config.documents_path)
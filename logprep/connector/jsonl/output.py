@@ -5,6 +5,20 @@ JsonlOutput
 The JsonlOutput Connector can be used to write processed documents to .jsonl
 files.
 
+The output files are opened once and kept open until the connector is shut down. Lines are
+written into a buffer of :code:`write_buffer_size` bytes, which is flushed if it is full or if
+:code:`flush_interval` seconds have passed since the last flush. The flush interval is checked
+whenever a document is written.
+
+The files can be compressed while they are written with :code:`gzip` or :code:`zstd`. The
+compression :code:`zstd` requires the python package :code:`zstandard` to be installed.
+
+If :code:`rotate_bytes` or :code:`rotate_interval` is set, a file is rotated if the uncompressed
+size of the lines written to it exceeds :code:`rotate_bytes` or if it was opened more than
+:code:`rotate_interval` seconds ago. The rotated file is renamed by appending the time of the
+rotation to its path, e.g. :code:`path/to/output.file.20221019120000000000`, and a new file is
+opened under the configured path.
+
 Example
 ^^^^^^^
 ..  code-block:: yaml
@@ -16,14 +30,98 @@ Example
         output_file = path/to/output.file
         output_file_custom = ""
         output_file_error = ""
+        write_buffer_size: 65536
+        flush_interval: 1.0
+        compression: gzip
+        rotate_bytes: 1073741824
+        rotate_interval: 3600
+        store_events_in_memory: false
 """
 
+import gzip
+import io
 import json
+import os
+import time
+from datetime import datetime
 from logging import Logger
 
 from attrs import define, field, validators
 
-from logprep.abc.output import Output
+from logprep.abc.output import FatalOutputError, Output
+
+try:
+    import zstandard
+except ModuleNotFoundError:  # pragma: no cover
+    zstandard = None
+
+
+class JsonlFile:
+    """An open jsonl file that counts the bytes written to it and can be rotated."""
+
+    __slots__ = [
+        "path",
+        "_config",
+        "_file",
+        "_stream",
+        "_written_bytes",
+        "_opened_at",
+        "_flushed_at",
+    ]
+
+    def __init__(self, path: str, config: "JsonlOutput.Config"):
+        self.path = path
+        self._config = config
+        self._open()
+
+    def _open(self):
+        self._file = open(  # pylint: disable=consider-using-with
+            self.path, "ab", buffering=self._config.write_buffer_size
+        )
+        if self._config.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._file, mode="ab")
+        elif self._config.compression == "zstd":
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._file)
+        else:
+            self._stream = self._file
+        self._written_bytes = 0
+        self._opened_at = time.time()
+        self._flushed_at = self._opened_at
+
+    def write(self, line: bytes):
+        """Writes a line and flushes or rotates the file if necessary."""
+        if self._needs_rotation():
+            self.rotate()
+        self._stream.write(line)
+        self._written_bytes += len(line)
+        if time.time() - self._flushed_at >= self._config.flush_interval:
+            self.flush()
+
+    def _needs_rotation(self) -> bool:
+        rotate_bytes = self._config.rotate_bytes
+        if rotate_bytes and self._written_bytes >= rotate_bytes:
+            return True
+        rotate_interval = self._config.rotate_interval
+        return bool(rotate_interval) and time.time() - self._opened_at >= rotate_interval
+
+    def rotate(self):
+        """Closes the file, renames it with the current time as suffix and opens a new one."""
+        self.close()
+        os.rename(self.path, f"{self.path}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}")
+        self._open()
+
+    def flush(self):
+        """Flushes the compression stream and the write buffer to the file."""
+        self._stream.flush()
+        if self._stream is not self._file:
+            self._file.flush()
+        self._flushed_at = time.time()
+
+    def close(self):
+        """Closes the compression stream and the file."""
+        self._stream.close()
+        if not self._file.closed:
+            self._file.close()
 
 
 class JsonlOutput(Output):
@@ -46,6 +144,40 @@ class JsonlOutput(Output):
         output_file = field(validator=validators.instance_of(str))
         output_file_custom = field(validator=validators.instance_of(str), default="")
         output_file_error = field(validator=validators.instance_of(str), default="")
+        write_buffer_size: int = field(
+            validator=[validators.instance_of(int), validators.ge(0)],
+            default=io.DEFAULT_BUFFER_SIZE,
+        )
+        """Size of the write buffer of each file in bytes (default is 8192). If it is 0, every
+        line is written to the file immediately."""
+        flush_interval: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=1.0,
+        )
+        """Maximum time in seconds between two flushes of the write buffer (default is 1.0).
+        It is checked whenever a document is written. If it is 0, the buffer is flushed after
+        every line."""
+        compression: str = field(
+            validator=validators.in_(["", "gzip", "zstd"]),
+            default="",
+        )
+        """Compresses the files while writing them with :code:`gzip` or :code:`zstd`
+        (default is no compression)."""
+        rotate_bytes: int = field(
+            validator=[validators.instance_of(int), validators.ge(0)], default=0
+        )
+        """Rotates a file after this number of uncompressed bytes has been written to it
+        (default is 0, which disables the rotation by size)."""
+        rotate_interval: int = field(
+            validator=[validators.instance_of(int), validators.ge(0)], default=0
+        )
+        """Rotates a file after it has been open for this number of seconds (default is 0,
+        which disables the rotation by time)."""
+        store_events_in_memory: bool = field(validator=validators.instance_of(bool), default=True)
+        """Keeps all stored documents in the lists :code:`events` and :code:`failed_events`
+        (default is true). It should be disabled for large amounts of documents, since the lists
+        are never cleared."""
 
     last_timeout: float
     events: list
@@ -55,46 +187,67 @@ class JsonlOutput(Output):
         "ast_timeout",
         "events",
         "failed_events",
+        "_files",
     ]
 
     def __init__(self, name: str, configuration: "Output.Config", logger: Logger):
         super().__init__(name, configuration, logger)
         self.events = []
         self.failed_events = []
+        self._files = {}
 
     def setup(self):
         super().setup()
-        open(self._config.output_file, "a+", encoding="utf8").close()
+        if self._config.compression == "zstd" and zstandard is None:
+            raise FatalOutputError("compression 'zstd' requires the package 'zstandard'")
+        self._get_file(self._config.output_file)
         if self._config.output_file_custom:
-            open(self._config.output_file_custom, "a+", encoding="utf8").close()
+            self._get_file(self._config.output_file_custom)
         if self._config.output_file_error:
-            open(self._config.output_file_error, "a+", encoding="utf8").close()
+            self._get_file(self._config.output_file_error)
+
+    def flush(self):
+        for jsonl_file in self._files.values():
+            jsonl_file.flush()
+
+    def shut_down(self):
+        for jsonl_file in self._files.values():
+            jsonl_file.close()
+        self._files.clear()
+        super().shut_down()
+
+    def _get_file(self, filepath: str) -> JsonlFile:
+        jsonl_file = self._files.get(filepath)
+        if jsonl_file is None:
+            jsonl_file = self._files[filepath] = JsonlFile(filepath, self._config)
+        return jsonl_file
 
-    @staticmethod
-    def _write_json(filepath: str, line: dict):
+    def _write_json(self, filepath: str, line: dict):
         """writes processed document to configured file"""
-        with open(filepath, "a+", encoding="utf8") as file:
-            file.write(f"{json.dumps(line)}\n")
+        self._get_file(filepath).write(f"{json.dumps(line)}\n".encode("utf8"))
 
     def store(self, document: dict):
-        self.events.append(document)
-        JsonlOutput._write_json(self._config.output_file, document)
+        if self._config.store_events_in_memory:
+            self.events.append(document)
+        self._write_json(self._config.output_file, document)
         self.metrics.number_of_processed_events += 1
         if self.input_connector:
             self.input_connector.batch_finished_callback()
 
     def store_custom(self, document: dict, target: str):
         document = {target: document}
-        self.events.append(document)
+        if self._config.store_events_in_memory:
+            self.events.append(document)
 
         if self._config.output_file_custom:
-            JsonlOutput._write_json(self._config.output_file_custom, document)
+            self._write_json(self._config.output_file_custom, document)
 
     def store_failed(self, error_message: str, document_received: dict, document_processed: dict):
-        self.failed_events.append((error_message, document_received, document_processed))
+        if self._config.store_events_in_memory:
+            self.failed_events.append((error_message, document_received, document_processed))
 
         if self._config.output_file_error:
-            JsonlOutput._write_json(
+            self._write_json(
                 self._config.output_file_error,
                 {
                     "error_message": error_message,
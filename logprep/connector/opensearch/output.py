@@ -23,8 +23,15 @@ Example
         default_index: default_index
         error_index: error_index
         message_backlog_size: 10000
+        message_backlog_bytes: 10485760
         timeout: 10000
         max_retries:
+        thread_count: 4
+        connection_pool_size: 4
+        retry_queue_size: 100000
+        min_bulk_bytes: 1048576
+        max_bulk_bytes: 104857600
+        target_bulk_request_time: 1.0
         user:
         secret:
         cert: /path/to/cert.crt
@@ -57,6 +64,7 @@ class OpensearchOutput(ElasticsearchOutput):
             http_auth=self.http_auth,
             ssl_context=self.ssl_context,
             timeout=self._config.timeout,
+            maxsize=self._config.connection_pool_size,
         )
 
     def describe(self) -> str:
@@ -71,67 +79,30 @@ class OpensearchOutput(ElasticsearchOutput):
         base_description = Output.describe(self)
         return f"{base_description} - Opensearch Output: {self._config.hosts}"
 
-    def _write_to_search_context(self, document):
-        """Writes documents from a buffer into OpenSearch indices.
+    _bulk_index_error = opensearch.helpers.BulkIndexError
 
-        Writes documents in a bulk if the document buffer limit has been reached.
-        This reduces connections to OpenSearch.
-        The target index is determined per document by the value of the meta field '_index'.
-        A configured default index is used if '_index' hasn't been set.
+    _serialization_error = opensearch.SerializationError
 
-        Parameters
-        ----------
-        document : dict
-           Document to store.
+    _expand_action = staticmethod(opensearch.helpers.expand_action)
 
-        """
-        self._message_backlog[self._processed_cnt] = document
-        currently_processed_cnt = self._processed_cnt + 1
-        if currently_processed_cnt == self._config.message_backlog_size:
-            try:
-                opensearch.helpers.bulk(
-                    self._search_context,
-                    self._message_backlog,
-                    max_retries=self._config.max_retries,
-                    chunk_size=self._config.message_backlog_size,
-                )
-            except opensearch.SerializationError as error:
-                self._handle_serialization_error(error)
-            except opensearch.ConnectionError as error:
-                self._handle_connection_error(error)
-            except opensearch.helpers.BulkIndexError as error:
-                self._handle_bulk_index_error(error)
-            self._processed_cnt = 0
-            if self.input_connector:
-                self.input_connector.batch_finished_callback()
-        else:
-            self._processed_cnt = currently_processed_cnt
-
-    def _handle_bulk_index_error(self, error: opensearch.helpers.BulkIndexError):
-        """Handle bulk indexing error for OpenSearch bulk indexing.
-
-        Documents that could not be sent to OpenSearch due to index errors are collected and
-        sent into an error index that should always accept all documents.
-        This can lead to a rebuild of the pipeline if this causes another exception.
+    _bulk_errors = (
+        opensearch.SerializationError,
+        opensearch.ConnectionError,
+        opensearch.helpers.BulkIndexError,
+    )
 
-        Parameters
-        ----------
-        error : BulkIndexError
-           BulkIndexError to collect IndexErrors from.
+    def _send_bulk(self, documents: list):
+        opensearch.helpers.bulk(
+            self._search_context, documents, chunk_size=len(documents), **self._bulk_options
+        )
 
-        """
-        error_documents = []
-        for bulk_error in error.errors:
-            _, error_info = bulk_error.popitem()
-            data = error_info.get("data") if "data" in error_info else None
-            error_type = error_info.get("error").get("type")
-            error_reason = error_info.get("error").get("reason")
-            reason = f"{error_type}: {error_reason}"
-            error_document = self._build_failed_index_document(data, reason)
-            self._add_dates(error_document)
-            error_documents.append(error_document)
-
-        opensearch.helpers.bulk(self._search_context, error_documents)
+    def _handle_bulk_error(self, error: BaseException):
+        if isinstance(error, opensearch.SerializationError):
+            self._handle_serialization_error(error)
+        elif isinstance(error, opensearch.ConnectionError):
+            self._handle_connection_error(error)
+        elif isinstance(error, opensearch.helpers.BulkIndexError):
+            self._handle_bulk_index_error(error)
 
     def _handle_serialization_error(self, error: opensearch.SerializationError):
         """Handle serialization error for OpenSearch bulk indexing.
@@ -3,14 +3,32 @@
 Pipelines contain a list of processors that can be executed in order to process input log data.
 They can be multi-processed.
 
+If :code:`partition_workers` is configured, a pipeline dispatches the events of an input with
+partitions (e.g. kafka) to that many worker threads, which process and store the events. All events
+of a partition are processed by the same worker in the order they were received. Offsets are only
+stored for events that were processed by a worker. This allows processors that wait for I/O to
+overlap their waiting without starting more processes with own copies of all rules, but the
+processors must be thread-safe.
+
+If :code:`output_high_water_mark` is configured, a pipeline stops reading from the input while the
+fill level of the output is at least this high, e.g. because kafka is slow to acknowledge messages or
+rejected documents pile up in the retry queue of a search output. It continues reading once the fill
+level dropped to :code:`output_low_water_mark`. This keeps the memory bounded and avoids that the
+output blocks for a long time on full buffers.
+
 """
+
 # pylint: disable=logging-fstring-interpolation
 import json
+from contextlib import nullcontext
 from ctypes import c_bool, c_double, c_ulonglong
 from logging import DEBUG, INFO, NOTSET, Handler, Logger
 from multiprocessing import Lock, Process, Value, current_process
-from time import time
-from typing import List, TYPE_CHECKING
+from queue import Queue
+from threading import Lock as ThreadLock
+from threading import Thread
+from time import sleep, time
+from typing import Any, List, Optional, TYPE_CHECKING
 
 import attrs
 import numpy as np
@@ -58,6 +76,8 @@ class Pipeline:
     # pylint: disable=logging-not-lazy
     # Would require too much change in the tests.
 
+    _partition_queue_size = 1000
+
     @attrs.define(kw_only=True)
     class PipelineMetrics(Metric):
         """Tracks statistics about a pipeline"""
@@ -75,6 +95,8 @@ class Pipeline:
         mean_processing_time_per_event: float = 0.0
         """Mean processing time for one event"""
         _mean_processing_time_sample_counter: int = 0
+        throttled_time: float = 0.0
+        """Time in seconds in which no events were read, because the output was saturated"""
 
         # pylint: disable=not-an-iterable
         @property
@@ -127,6 +149,16 @@ class Pipeline:
 
         self._processing_counter = counter
 
+        self._partition_queues = []
+        self._partition_workers = []
+        self._output_lock = nullcontext()
+        self._worker_error = None
+
+        self._output_high_water_mark = self._logprep_config.get("output_high_water_mark")
+        self._output_low_water_mark = self._logprep_config.get(
+            "output_low_water_mark", (self._output_high_water_mark or 0) / 2
+        )
+
         self.metrics = None
         self._metrics_exposer = MetricExposer(
             self._logprep_config.get("metrics", {}), metric_targets, shared_dict, lock
@@ -144,6 +176,33 @@ class Pipeline:
         self._create_connectors()
         self._create_metrics()
         self._build_pipeline()
+        self._start_partition_workers()
+
+    def _start_partition_workers(self):
+        worker_count = self._logprep_config.get("partition_workers", 1)
+        if worker_count < 2:
+            return
+        self._output_lock = ThreadLock()
+        if hasattr(self._input, "acknowledge_records"):
+            self._input.acknowledge_records = True
+        for index in range(worker_count):
+            partition_queue = Queue(maxsize=self._partition_queue_size)
+            worker = Thread(
+                target=self._work_on_partition_queue,
+                args=(partition_queue,),
+                name=f"partition-worker-{index}",
+                daemon=True,
+            )
+            worker.start()
+            self._partition_queues.append(partition_queue)
+            self._partition_workers.append(worker)
+
+    def _stop_partition_workers(self):
+        for partition_queue in self._partition_queues:
+            partition_queue.put(None)
+        while self._partition_workers:
+            self._partition_workers.pop().join()
+        self._partition_queues.clear()
 
     def _create_metrics(self):
         self.metrics = self.PipelineMetrics(
@@ -179,6 +238,10 @@ class Pipeline:
         output_connector_config[connector_name]["metric_labels"] = self._metric_labels
         self._output = Factory.create(output_connector_config, self._logger)
         self._output.input_connector = self._input
+        if hasattr(self._input, "flush_callback"):
+            self._input.flush_callback = self._flush_output
+        if hasattr(self._input, "prefilter_callback"):
+            self._input.prefilter_callback = self._store_extra_data
         if self._logger.isEnabledFor(DEBUG):  # pragma: no cover
             self._logger.debug(
                 f"Created input connector '{self._input.describe()}' " f"({current_process().name})"
@@ -233,7 +296,11 @@ class Pipeline:
     def _retrieve_and_process_data(self):
         event = {}
         try:
+            if self._worker_error is not None:
+                raise self._worker_error
             self._metrics_exposer.expose(self.metrics)
+            if self._output_high_water_mark:
+                self._wait_for_saturated_output()
             event, non_critical_error_msg = self._input.get_next(
                 self._logprep_config.get("timeout")
             )
@@ -245,8 +312,10 @@ class Pipeline:
             except AttributeError:
                 pass
 
-            if event:
-                self._process_event(event)
+            if event and self._partition_queues:
+                self._dispatch_event(event)
+            elif event:
+                self._process_event(event, self._input.current_raw_event)
                 self._processing_counter.increment()
                 self._processing_counter.print_if_ready()
                 if event:
@@ -274,9 +343,76 @@ class Pipeline:
                 self._output.store_failed(msg, error.raw_input, {})
             self._output.metrics.number_of_errors += 1
 
+    def _wait_for_saturated_output(self):
+        """Stops reading from the input while the fill level of the output is above the high
+        water mark until it dropped to the low water mark"""
+        if self._output.fill_level < self._output_high_water_mark:
+            return
+        start_time = time()
+        while self._iterate() and self._output.fill_level > self._output_low_water_mark:
+            sleep(self._logprep_config.get("timeout"))
+        self.metrics.throttled_time += time() - start_time
+
+    def _dispatch_event(self, event: dict):
+        """Hands the event over to the worker of its partition"""
+        partition = getattr(self._input, "current_partition", 0)
+        record = getattr(self._input, "current_record", None)
+        raw_event = self._input.current_raw_event
+        self._partition_queues[partition % len(self._partition_queues)].put(
+            (event, record, raw_event)
+        )
+
+    def _work_on_partition_queue(self, partition_queue: Queue):
+        """Processes and stores the events of the partitions that are assigned to a worker"""
+        while True:
+            item = partition_queue.get()
+            try:
+                if item is None:
+                    return
+                if self._worker_error is None:
+                    self._process_and_store_event(*item)
+            finally:
+                partition_queue.task_done()
+
+    def _process_and_store_event(self, event: dict, record: Any, raw_event: Optional[bytes]):
+        try:
+            self._process_event(event, raw_event)
+            self._processing_counter.increment()
+            self._processing_counter.print_if_ready()
+            with self._output_lock:
+                if record is not None:
+                    self._input.acknowledge(record)
+                if event:
+                    self._output.store(event)
+        except WarningOutputError as error:
+            self._logger.warning(f"An error occurred for output {self._output.describe()}: {error}")
+            self._output.metrics.number_of_warnings += 1
+        except CriticalOutputError as error:
+            msg = f"A critical error occurred for output {self._output.describe()}: {error}"
+            self._logger.error(msg)
+            if error.raw_input:
+                with self._output_lock:
+                    self._output.store_failed(msg, error.raw_input, {})
+            self._output.metrics.number_of_errors += 1
+        except FatalOutputError as error:
+            self._worker_error = error
+
+    def _flush_output(self):
+        """Waits until the partition workers have processed their events and flushes the output,
+        e.g. before the input gives up partitions"""
+        for partition_queue in self._partition_queues:
+            partition_queue.join()
+        with self._output_lock:
+            self._output.flush()
+
     @TimeMeasurement.measure_time("pipeline")
-    def _process_event(self, event: dict):
-        event_received = json.dumps(event, separators=(",", ":"))
+    def _process_event(self, event: dict, raw_event: Optional[bytes] = None):
+        """Processes the event with all processors. The raw event of the input is kept as the
+        received document for errors, so that the event has only to be serialized if the input
+        has no raw event."""
+        event_received = raw_event
+        if event_received is None:
+            event_received = json.dumps(event, separators=(",", ":"))
         try:
             for processor in self._pipeline:
                 try:
@@ -318,7 +454,8 @@ class Pipeline:
                 f"processing an event, processing was aborted: ({original_error_msg})"
             )
             self._logger.error(msg)
-            self._output.store_failed(msg, json.loads(event_received), event)
+            with self._output_lock:
+                self._output.store_failed(msg, json.loads(event_received), event)
             event.clear()  # 'delete' the event, i.e. no regular output
 
             processor.metrics.number_of_errors += 1
@@ -329,10 +466,12 @@ class Pipeline:
             self._logger.debug("Storing extra data")
         documents = extra_data[0]
         target = extra_data[1]
-        for document in documents:
-            self._output.store_custom(document, target)
+        with self._output_lock:
+            for document in documents:
+                self._output.store_custom(document, target)
 
     def _shut_down(self):
+        self._stop_partition_workers()
         self._input.shut_down()
         self._output.shut_down()
 
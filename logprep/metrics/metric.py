@@ -1,7 +1,10 @@
 """This module tracks, calculates, exposes and resets logprep metrics"""
+
+from bisect import bisect_left
 from collections import namedtuple
+from itertools import accumulate
 
-from attr import define, asdict
+from attr import define, asdict, field
 
 MetricTargets = namedtuple("MetricTargets", "file_target prometheus_target")
 
@@ -73,6 +76,43 @@ class Metric:
         return self
 
 
+@define(kw_only=True)
+class HistogramMetric(Metric):
+    """Counts samples, e.g. latencies in seconds, in cumulative buckets like a prometheus
+    histogram. The buckets are exposed with their upper bound as label :code:`le`."""
+
+    _buckets: tuple = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+    _bucket_counts: list = field(factory=list)
+
+    count: int = 0
+    """Number of observed samples"""
+    sum: float = 0.0
+    """Sum of all observed samples"""
+
+    def __attrs_post_init__(self):
+        self._bucket_counts = [0] * (len(self._buckets) + 1)
+
+    def observe(self, sample: float):
+        """Adds a sample to the first bucket whose upper bound it does not exceed."""
+        self._bucket_counts[bisect_left(self._buckets, sample)] += 1
+        self.count += 1
+        self.sum += sample
+
+    def expose(self):
+        exp = super().expose()
+        labels = ",".join(":".join(item) for item in self._labels.items())
+        bounds = [*map(str, self._buckets), "+Inf"]
+        for bound, cumulative_count in zip(bounds, accumulate(self._bucket_counts)):
+            exp[f"{self._prefix}bucket;{labels},le:{bound}"] = float(cumulative_count)
+        return exp
+
+    def reset_statistics(self):
+        self._bucket_counts = [0] * (len(self._buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        return self
+
+
 def calculate_new_average(current_average, next_sample, sample_counter):
     """Calculate a new average by combining a new sample with a sample counter"""
     average_multiple = current_average * sample_counter
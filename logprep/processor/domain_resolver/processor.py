@@ -19,27 +19,36 @@ Example
         hyperscan_db_path: tmp/path/scan.db
         tld_list: tmp/path/tld.dat
         timeout: 0.5
+        max_concurrent_lookups: 10
         max_cached_domains: 20000
         max_caching_days: 1
+        negative_caching_seconds: 60
+        stale_caching_seconds: 300
         hash_salt: secure_salt
         cache_enabled: true
+        cache_snapshot_path: /var/lib/logprep/domains.snapshot
+        cache_snapshot_interval: 3600
         debug_cache: false
 """
+
 import datetime
+import os
 import sys
 import socket
+import time
+from concurrent import futures
+from concurrent.futures import Future, ThreadPoolExecutor
 from logging import Logger
-from multiprocessing import context
-from multiprocessing.pool import ThreadPool
-from typing import Optional
+from typing import Dict, List, Optional
 from attr import define, field, validators
 
 from tldextract import TLDExtract
 
 from logprep.abc import Processor
+from logprep.metrics.metric import HistogramMetric
 from logprep.processor.base.exceptions import ProcessingWarning
 from logprep.processor.domain_resolver.rule import DomainResolverRule
-from logprep.util.cache import Cache
+from logprep.util.cache import CacheMetrics, ResolutionCache
 from logprep.util.hasher import SHA256Hasher
 from logprep.util.helper import add_field_to, get_dotted_field_value
 from logprep.util.validators import list_of_urls_validator
@@ -66,10 +75,16 @@ class DomainResolver(Processor):
             default=0.5, validator=validators.optional(validators.instance_of(float))
         )
         """Timeout for resolving of domains."""
+        max_concurrent_lookups: int = field(
+            default=10, validator=[validators.instance_of(int), validators.gt(0)]
+        )
+        """Number of threads that resolve domains concurrently (default is 10). Lookups that
+        exceed the timeout keep only their own thread busy. If the cache is enabled, the domains
+        of several events can be resolved at once with :code:`prefetch`."""
         max_cached_domains: int = field(validator=validators.instance_of(int))
-        """The maximum number of cached domains. One cache entry requires ~250 Byte, thus 10
-        million elements would require about 2.3 GB RAM. The cache is not persisted. Restarting
-        Logprep does therefore clear the cache."""
+        """The maximum number of cached domains. One cache entry requires 50 Byte including the
+        resolved address, thus 10 million elements would require about 500 MB RAM. The cache is not persisted. Restarting
+        Logprep does therefore clear the cache, unless :code:`cache_snapshot_path` is set."""
         max_caching_days: int = field(validator=validators.instance_of(int))
         """Number of days a domains is cached after the last time it appeared.
         This caching reduces the CPU load of Logprep (no demanding encryption must be performed
@@ -78,6 +93,21 @@ class DomainResolver(Processor):
         exceeded (see `domain_resolver.max_cached_domains`),the oldest cached pseudonyms will
         be discarded first.Thus, it is possible that a domain is re-added to the cache before
         max_caching_days has elapsed if it was discarded due to the size limit."""
+        negative_caching_seconds: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=60.0,
+        )
+        """Number of seconds a domain that could not be resolved within the timeout is cached
+        without address (default is 60). A lookup that finishes after the timeout replaces it."""
+        stale_caching_seconds: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=0.0,
+        )
+        """Number of seconds an expired address is still added to events while its domain is
+        resolved again in the background (default is 0, which resolves expired domains before
+        the event is processed further)."""
         hash_salt: str = field(validator=validators.instance_of(str))
         """A salt that is used for hashing."""
         cache_enabled: bool = field(
@@ -85,6 +115,20 @@ class DomainResolver(Processor):
         )
         """If enabled activates a cache such that already seen domains do not need to be resolved
         again."""
+        cache_snapshot_path: Optional[str] = field(
+            default=None, validator=validators.optional(validators.instance_of(str))
+        )
+        """Optional path to a file to which the cache with the resolved addresses is saved on
+        shut down and from which they are loaded on start up without the expired domains. All
+        pipeline processes write to the same file, thus it contains the cache of the process that
+        saved it last."""
+        cache_snapshot_interval: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=0.0,
+        )
+        """Number of seconds after which the cache is saved to :code:`cache_snapshot_path` while
+        events are processed (default is 0, which saves it only on shut down)."""
         debug_cache: bool = field(
             default=False, validator=validators.optional(validator=validators.instance_of(bool))
         )
@@ -103,10 +147,16 @@ class DomainResolver(Processor):
         """Number of urls that were resolved from cache"""
         timeouts: int = 0
         """Number of timeouts that occurred while resolving a url"""
+        cache: Optional[CacheMetrics] = None
+        """Hits, misses and evictions of the domain cache"""
+        lookup_latency: Optional[HistogramMetric] = None
+        """Histogram of the time in seconds that the lookups of domains took"""
+
+    __slots__ = ["_cache_saved_at", "_pending_lookups"]
 
-    __slots__ = ["_domain_ip_map"]
+    _cache_saved_at: float
 
-    _domain_ip_map: dict
+    _pending_lookups: Dict[str, Future]
 
     rule_class = DomainResolverRule
 
@@ -121,21 +171,61 @@ class DomainResolver(Processor):
             labels=self.metric_labels,
             generic_rule_tree=self._generic_tree.metrics,
             specific_rule_tree=self._specific_tree.metrics,
+            cache=self._cache.metrics,
+            lookup_latency=HistogramMetric(
+                labels=self.metric_labels, prefix="logprep_domain_resolver_lookup_seconds_"
+            ),
         )
-        self._domain_ip_map = {}
+        self._cache_saved_at = time.time()
+        self._pending_lookups = {}
 
     @cached_property
-    def _cache(self):
-        cache_max_timedelta = datetime.timedelta(days=self._config.max_caching_days)
-        return Cache(max_items=self._config.max_cached_domains, max_timedelta=cache_max_timedelta)
+    def _cache(self) -> ResolutionCache:
+        return ResolutionCache(
+            max_items=self._config.max_cached_domains,
+            max_timedelta=datetime.timedelta(days=self._config.max_caching_days),
+            max_negative_timedelta=datetime.timedelta(
+                seconds=self._config.negative_caching_seconds
+            ),
+            max_stale_timedelta=datetime.timedelta(seconds=self._config.stale_caching_seconds),
+            metric_labels=self.metric_labels,
+        )
+
+    def setup(self):
+        super().setup()
+        path = self._config.cache_snapshot_path
+        if self._config.cache_enabled and path and os.path.exists(path):
+            try:
+                self._cache.load(path)
+            except (OSError, ValueError) as error:
+                self._logger.warning(f"{self.describe()}: Could not load cache snapshot: {error}")
+        self._cache_saved_at = time.time()
+
+    def shut_down(self):
+        self._save_cache_snapshot()
+        self._thread_pool.shutdown(wait=False)
+        super().shut_down()
+
+    def _save_cache_snapshot(self):
+        if self._config.cache_enabled and self._config.cache_snapshot_path:
+            self._cache.save(self._config.cache_snapshot_path)
+        self._cache_saved_at = time.time()
+
+    def process(self, event: dict):
+        super().process(event)
+        snapshot_interval = self._config.cache_snapshot_interval
+        if snapshot_interval and time.time() - self._cache_saved_at >= snapshot_interval:
+            self._save_cache_snapshot()
 
     @cached_property
     def _hasher(self):
         return SHA256Hasher()
 
     @cached_property
-    def _thread_pool(self):
-        return ThreadPool(processes=1)
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self._config.max_concurrent_lookups, thread_name_prefix=f"{self.name}-dns"
+        )
 
     @cached_property
     def _tld_extractor(self):
@@ -143,25 +233,51 @@ class DomainResolver(Processor):
             return TLDExtract(suffix_list_urls=self._config.tld_lists)
         return TLDExtract()
 
+    def prefetch(self, events: List[dict]):
+        """Starts the lookups of all domains of the events that are not cached, so that they are
+        resolved concurrently before the events are processed one by one. The results are kept
+        in the cache, thus nothing is prefetched if the cache is disabled.
+
+        Parameters
+        ----------
+        events : list
+           The events that will be processed next.
+
+        """
+        if not self._config.cache_enabled:
+            return
+        for event in events:
+            for tree in (self._specific_tree, self._generic_tree):
+                for rule in tree.get_matching_rules(event):
+                    domain = self._get_domain(event, rule)
+                    if not domain:
+                        continue
+                    hash_string = self._hasher.hash_str(domain, salt=self._config.hash_salt)
+                    if hash_string not in self._cache:
+                        self._submit_lookup(domain, hash_string)
+
+    def _get_domain(self, event: dict, rule: DomainResolverRule) -> Optional[str]:
+        domain_or_url_str = get_dotted_field_value(event, rule.source_url_or_domain)
+        if not domain_or_url_str:
+            return None
+        return self._tld_extractor(domain_or_url_str).fqdn or None
+
     def _apply_rules(self, event, rule):
-        domain_or_url = rule.source_url_or_domain
         output_field = rule.output_field
-        domain_or_url_str = get_dotted_field_value(event, domain_or_url)
-        if not domain_or_url_str:
-            return
-        domain = self._tld_extractor(domain_or_url_str).fqdn
+        domain = self._get_domain(event, rule)
         if not domain:
             return
         self.metrics.total_urls += 1
         if self._config.cache_enabled:
             hash_string = self._hasher.hash_str(domain, salt=self._config.hash_salt)
-            requires_storing = self._cache.requires_storing(hash_string)
+            state, resolved_ip = self._cache.lookup(hash_string)
+            requires_storing = state == ResolutionCache.MISS
             if requires_storing:
                 resolved_ip = self._resolve_ip(domain, hash_string)
-                self._domain_ip_map.update({hash_string: resolved_ip})
                 self.metrics.resolved_new += 1
             else:
-                resolved_ip = self._domain_ip_map.get(hash_string)
+                if state == ResolutionCache.STALE:
+                    self._submit_lookup(domain, hash_string)
                 self.metrics.resolved_cached += 1
             self._add_resolve_infos_to_event(event, output_field, resolved_ip)
             if self._config.debug_cache:
@@ -183,15 +299,38 @@ class DomainResolver(Processor):
                 )
                 raise ProcessingWarning(message=message)
 
+    def _submit_lookup(self, domain: str, hash_string: Optional[str] = None) -> Future:
+        """Returns the pending lookup of the domain or starts a new one, which stores its result
+        in the cache if a hash string is given."""
+        lookup = self._pending_lookups.get(domain)
+        if lookup is None:
+            lookup = self._thread_pool.submit(self._lookup, domain, hash_string)
+            self._pending_lookups[domain] = lookup
+            lookup.add_done_callback(lambda _: self._pending_lookups.pop(domain, None))
+        return lookup
+
+    def _lookup(self, domain: str, hash_string: Optional[str]) -> str:
+        started_at = time.perf_counter()
+        resolved_ip = None
+        try:
+            resolved_ip = socket.gethostbyname(domain)
+        finally:
+            self.metrics.lookup_latency.observe(time.perf_counter() - started_at)
+            if hash_string is not None:
+                self._cache.store(hash_string, resolved_ip)
+        return resolved_ip
+
     def _resolve_ip(self, domain, hash_string=None):
+        lookup = self._submit_lookup(domain, hash_string)
         try:
-            result = self._thread_pool.apply_async(socket.gethostbyname, (domain,))
-            resolved_ip = result.get(timeout=self._config.timeout)
-            return resolved_ip
-        except (context.TimeoutError, OSError):
-            if hash_string:
-                self._domain_ip_map[hash_string] = None
+            return lookup.result(timeout=self._config.timeout)
+        except futures.TimeoutError:
+            if hash_string and not lookup.done():
+                self._cache.store(hash_string, None)
+            self.metrics.timeouts += 1
+        except OSError:
             self.metrics.timeouts += 1
+        return None
 
     def _store_debug_infos(self, event, requires_storing):
         event["resolved_ip_debug"] = {}
@@ -200,4 +339,4 @@ class DomainResolver(Processor):
             event_dbg["obtained_from_cache"] = False
         else:
             event_dbg["obtained_from_cache"] = True
-        event_dbg["cache_size"] = len(self._domain_ip_map.keys())
+        event_dbg["cache_size"] = len(self._cache)
@@ -1,7 +1,10 @@
 """Module for encryption of strings into Base64-encoded ciphertexts."""
 
 import base64
+import time
 from abc import ABC, abstractmethod
+from itertools import count
+from typing import Iterator, NamedTuple, Optional, Tuple
 
 from Crypto.Cipher import AES, PKCS1_OAEP
 from Crypto.PublicKey import RSA
@@ -16,12 +19,32 @@ class Encrypter(ABC):
         """Encrypt a string into a Base64-encoded ciphertext."""
 
 
+class SessionKey(NamedTuple):
+    """An AES session key with its RSA encryption and a counter for the nonces of its
+    ciphertexts."""
+
+    key: bytes
+    encrypted_key: bytes
+    nonces: Iterator[int]
+    created_at: float
+
+
 class DualPKCS1HybridEncrypter(Encrypter):
-    """Hybrid encryption that encrypts a string with AES and dual PKCS#1"""
+    """Hybrid encryption that encrypts a string with AES and dual PKCS#1
 
-    def __init__(self):
+    The AES session key can be reused for a number of values and seconds. Every ciphertext of a
+    session key gets its own nonce and contains the encrypted session key, thus it has the same
+    format and can be decrypted independently of the other ciphertexts.
+    """
+
+    def __init__(self, max_session_key_values: int = 1, max_session_key_age: float = 0.0):
         self._pubkey_analyst = None
         self._pubkey_depseudo = None
+        self._cipher_rsa_analyst = None
+        self._cipher_rsa_depseudo = None
+        self._max_session_key_values = max_session_key_values
+        self._max_session_key_age = max_session_key_age
+        self._session_key: Optional[SessionKey] = None
 
     def load_public_keys(self, keyfile_analyst: str, keyfile_depseudo: str):
         """Load the two required RSA public keys from files.
@@ -37,6 +60,32 @@ class DualPKCS1HybridEncrypter(Encrypter):
             self._pubkey_analyst = RSA.import_key(file.read())
         with open(keyfile_depseudo, "r", encoding="utf8") as file:
             self._pubkey_depseudo = RSA.import_key(file.read())
+        self._cipher_rsa_analyst = PKCS1_OAEP.new(self._pubkey_analyst)
+        self._cipher_rsa_depseudo = PKCS1_OAEP.new(self._pubkey_depseudo)
+        self._session_key = None
+
+    def _new_session_key(self) -> SessionKey:
+        session_key = get_random_bytes(16)
+        enc_session_key = self._cipher_rsa_analyst.encrypt(session_key)
+        enc_session_key = self._cipher_rsa_depseudo.encrypt(enc_session_key)
+        return SessionKey(session_key, enc_session_key, count(), time.time())
+
+    def _get_session_key(self) -> Tuple[SessionKey, int]:
+        """Returns the current session key with an unused nonce and creates a new session key
+        if the current one has been used for the maximum number of values or seconds.
+
+        The counter is advanced atomically, thus no nonce is used twice even if multiple
+        threads encrypt values concurrently."""
+        session_key = self._session_key
+        if session_key is not None:
+            nonce = next(session_key.nonces)
+            max_age = self._max_session_key_age
+            if nonce < self._max_session_key_values and (
+                not max_age or time.time() - session_key.created_at < max_age
+            ):
+                return session_key, nonce
+        session_key = self._session_key = self._new_session_key()
+        return session_key, next(session_key.nonces)
 
     def encrypt(
         self,
@@ -58,16 +107,10 @@ class DualPKCS1HybridEncrypter(Encrypter):
         if not self._pubkey_analyst or not self._pubkey_depseudo:
             raise ValueError("Cannot encrypt because public keys are not loaded")
 
-        session_key = get_random_bytes(16)
-
-        cipher_rsa_analyst = PKCS1_OAEP.new(self._pubkey_analyst)
-        enc_session_key = cipher_rsa_analyst.encrypt(session_key)
-
-        cipher_rsa_depseudo = PKCS1_OAEP.new(self._pubkey_depseudo)
-        enc_session_key = cipher_rsa_depseudo.encrypt(enc_session_key)
+        session_key, nonce = self._get_session_key()
 
-        cipher_aes = AES.new(session_key, AES.MODE_CTR)
+        cipher_aes = AES.new(session_key.key, AES.MODE_CTR, nonce=nonce.to_bytes(8, "big"))
         ciphertext = cipher_aes.encrypt(input_str.encode("utf-8"))
 
-        output_bytes = enc_session_key + cipher_aes.nonce + ciphertext
+        output_bytes = session_key.encrypted_key + cipher_aes.nonce + ciphertext
         return base64.b64encode(output_bytes).decode("ascii")
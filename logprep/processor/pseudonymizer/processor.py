@@ -24,14 +24,24 @@ Example
         regex_mapping: /path/to/regex_mapping.json
         max_cached_pseudonyms: 1000000
         max_caching_days: 1
+        cache_snapshot_path: /var/lib/logprep/pseudonyms.snapshot
+        cache_snapshot_interval: 3600
+        max_session_key_values: 1000
+        max_session_key_age: 60
+        max_memoized_values: 100000
+        max_memoized_urls: 10000
         tld_lists:
             -/path/to/tld_list.dat
 """
+
 import datetime
+import os
 import re
 import sys
+import time
+from functools import lru_cache
 from logging import Logger
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Callable, List, Optional, Pattern, Tuple, Union
 from urllib.parse import parse_qs
 
 from attr import define, field, validators
@@ -42,7 +52,7 @@ from urlextract import URLExtract
 from logprep.abc import Processor
 from logprep.processor.pseudonymizer.encrypter import DualPKCS1HybridEncrypter
 from logprep.processor.pseudonymizer.rule import PseudonymizerRule
-from logprep.util.cache import Cache
+from logprep.util.cache import CacheMetrics, CompactCache, SharedMemoryCache
 from logprep.util.hasher import SHA256Hasher
 from logprep.util.validators import file_validator, list_of_urls_validator
 
@@ -51,6 +61,12 @@ if sys.version_info.minor < 8:  # pragma: no cover
 else:
     from functools import cached_property
 
+SCHEME_PATTERN = re.compile(r"^([a-z0-9]+)\:\/\/")
+AUTH_PATTERN = re.compile(r"(?:.*\/\/|^)(.*:.*)@.*")
+QUERY_PATTERN = re.compile(r".*(\?\w+=[a-zA-Z0-9](?:&\w+=[a-zA-Z0-9]+)*).*")
+FRAGMENT_PATTERN = re.compile(r".*#(.*)")
+SCHEME_SEPARATOR_PATTERN = re.compile("(://)")
+
 yaml = YAML(typ="safe", pure=True)
 
 
@@ -88,9 +104,9 @@ class Pseudonymizer(Processor):
         """
         max_cached_pseudonyms: int = field(validator=validators.instance_of(int))
         """
-        The maximum number of cached pseudonyms. One cache entry requires ~250 Byte, thus 10
-        million elements would require about 2.3 GB RAM. The cache is not persisted. Restarting
-        Logprep does therefore clear the cache.
+        The maximum number of cached pseudonyms. One cache entry requires 34 Byte, thus 10
+        million elements would require about 340 MB RAM. The cache is not persisted. Restarting
+        Logprep does therefore clear the cache, unless :code:`shared_cache_path` is set.
         """
         max_caching_days: int = field(validator=validators.instance_of(int))
         """
@@ -102,6 +118,68 @@ class Pseudonymizer(Processor):
         Thus, it is possible that a pseudonym is re-added to the cache before max_caching_days has
         elapsed if it was discarded due to the size limit.
         """
+        shared_cache_path: Optional[str] = field(
+            default=None, validator=validators.optional(validators.instance_of(str))
+        )
+        """
+        Optional path to a file in which the cache is shared by all pipeline processes, e.g.
+        :code:`/dev/shm/logprep_pseudonyms.cache`. Without it, every process has its own cache
+        and the same value is encrypted and stored in the pseudonyms topic by every process.
+        The shared cache requires 24 Byte per element, is kept in a hash table of a fixed size
+        and replaces the oldest element of a small bucket if it is full. It outlives restarts of
+        Logprep as long as the file exists.
+        """
+        cache_snapshot_path: Optional[str] = field(
+            default=None, validator=validators.optional(validators.instance_of(str))
+        )
+        """
+        Optional path to a file to which the cache is saved on shut down and from which it is
+        loaded on start up without the expired pseudonyms. It is not used with
+        :code:`shared_cache_path`. All pipeline processes write to the same file, thus it
+        contains the cache of the process that saved it last.
+        """
+        cache_snapshot_interval: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=0.0,
+        )
+        """
+        Number of seconds after which the cache is saved to :code:`cache_snapshot_path` while
+        events are processed (default is 0, which saves it only on shut down).
+        """
+        max_session_key_values: int = field(
+            validator=[validators.instance_of(int), validators.gt(0)], default=1
+        )
+        """
+        Number of values that are encrypted with the same AES session key (default is 1, which
+        creates a new session key for every value). Every new session key requires two RSA
+        encryptions, which dominate the encryption of values that are not cached. Every value
+        still gets its own nonce and the ciphertexts keep their format.
+        """
+        max_session_key_age: float = field(
+            validator=[validators.instance_of(float), validators.ge(0)],
+            converter=float,
+            default=60.0,
+        )
+        """
+        Number of seconds after which a new session key is created even if it was not used for
+        :code:`max_session_key_values` values yet (default is 60). It is not limited if set to 0.
+        """
+        max_memoized_values: int = field(
+            validator=[validators.instance_of(int), validators.ge(0)], default=100000
+        )
+        """
+        Number of recently pseudonymized values whose salted hashes are kept in memory, so that
+        frequent values are not hashed again (default is 100000). It is disabled if set to 0.
+        """
+        max_memoized_urls: int = field(
+            validator=[validators.instance_of(int), validators.ge(0)], default=10000
+        )
+        """
+        Number of recently pseudonymized url fields whose urls and url parts, which are found by
+        regular expressions and the top-level domain list, are kept in memory (default is 10000).
+        It is disabled if set to 0.
+        """
         tld_lists: Optional[list] = field(default=None, validator=[list_of_urls_validator])
         """Optional list of path to files with top-level domain lists
         (like https://publicsuffix.org/list/public_suffix_list.dat). If no path is given,
@@ -114,6 +192,8 @@ class Pseudonymizer(Processor):
 
         pseudonymized_urls: int = 0
         """Number urls that were pseudonymized"""
+        cache: Optional[CacheMetrics] = None
+        """Hits, misses and evictions of the pseudonym cache"""
 
     __slots__ = [
         "_regex_mapping",
@@ -121,10 +201,18 @@ class Pseudonymizer(Processor):
         "pseudonyms",
         "pseudonymized_fields",
         "_tld_extractor",
+        "_cache_saved_at",
+        "_memoized_hash",
+        "_memoized_url_parts",
+        "_memoized_urls",
     ]
 
     _regex_mapping: dict
-    _cache: Cache
+    _cache: Union[CompactCache, SharedMemoryCache]
+    _cache_saved_at: float
+    _memoized_hash: Callable[[str], str]
+    _memoized_url_parts: Callable[[str], dict]
+    _memoized_urls: Callable[[str], Tuple[str, ...]]
     _tld_lists: List[str]
 
     pseudonyms: list
@@ -163,16 +251,59 @@ class Pseudonymizer(Processor):
 
     @cached_property
     def _encrypter(self):
-        return DualPKCS1HybridEncrypter()
+        return DualPKCS1HybridEncrypter(
+            max_session_key_values=self._config.max_session_key_values,
+            max_session_key_age=self._config.max_session_key_age,
+        )
 
     def setup(self):
         self._encrypter.load_public_keys(self._config.pubkey_analyst, self._config.pubkey_depseudo)
-        self._cache = Cache(
-            max_items=self._config.max_cached_pseudonyms, max_timedelta=self._cache_max_timedelta
-        )
+        if self._config.shared_cache_path:
+            self._cache = SharedMemoryCache(
+                self._config.shared_cache_path,
+                max_items=self._config.max_cached_pseudonyms,
+                max_timedelta=self._cache_max_timedelta,
+                metric_labels=self.metric_labels,
+            )
+        else:
+            self._cache = CompactCache(
+                max_items=self._config.max_cached_pseudonyms,
+                max_timedelta=self._cache_max_timedelta,
+                metric_labels=self.metric_labels,
+            )
+            self._load_cache_snapshot()
+        self.metrics.cache = self._cache.metrics
+        self._cache_saved_at = time.time()
         self._init_tld_extractor()
+        self._memoized_hash = lru_cache(maxsize=self._config.max_memoized_values)(self._hash_value)
+        self._memoized_url_parts = lru_cache(maxsize=self._config.max_memoized_urls)(
+            lambda url_str: self._parse_url_parts(self._tld_extractor, url_str)
+        )
+        self._memoized_urls = lru_cache(maxsize=self._config.max_memoized_urls)(
+            lambda field_: tuple(self._url_extractor.gen_urls(field_))
+        )
         self._load_regex_mapping(self._config.regex_mapping)
 
+    def shut_down(self):
+        self._save_cache_snapshot()
+        if isinstance(self._cache, SharedMemoryCache):
+            self._cache.close()
+        super().shut_down()
+
+    def _load_cache_snapshot(self):
+        path = self._config.cache_snapshot_path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            self._cache.load(path)
+        except (OSError, ValueError) as error:
+            self._logger.warning(f"{self.describe()}: Could not load cache snapshot: {error}")
+
+    def _save_cache_snapshot(self):
+        if self._config.cache_snapshot_path and isinstance(self._cache, CompactCache):
+            self._cache.save(self._config.cache_snapshot_path)
+        self._cache_saved_at = time.time()
+
     def _init_tld_extractor(self):
         if self._config.tld_lists is not None:
             self._tld_extractor = TLDExtract(suffix_list_urls=self._config.tld_lists)
@@ -187,6 +318,9 @@ class Pseudonymizer(Processor):
         self.pseudonymized_fields = set()
         self.pseudonyms = []
         super().process(event)
+        snapshot_interval = self._config.cache_snapshot_interval
+        if snapshot_interval and time.time() - self._cache_saved_at >= snapshot_interval:
+            self._save_cache_snapshot()
         return (self.pseudonyms, self._config.pseudonyms_topic) if self.pseudonyms != [] else None
 
     def _apply_rules(self, event: dict, rule: PseudonymizerRule):
@@ -221,8 +355,10 @@ class Pseudonymizer(Processor):
             event = event[keys[i]]
         return event, keys[-1]
 
-    def _pseudonymize_field(self, pattern: str, field_: str) -> Tuple[str, Optional[list], bool]:
-        matches = re.match(pattern, field_)
+    def _pseudonymize_field(
+        self, pattern: Pattern, field_: str
+    ) -> Tuple[str, Optional[list], bool]:
+        matches = pattern.match(field_)
 
         # No matches, no change
         if matches is None:
@@ -249,22 +385,19 @@ class Pseudonymizer(Processor):
 
     def _get_field_with_pseudonymized_urls(self, field_: str, pseudonyms: List[dict]) -> str:
         pseudonyms = pseudonyms if pseudonyms else []
-        for url_string in self._url_extractor.gen_urls(field_):
-            url_parts = self._parse_url_parts(self._tld_extractor, url_string)
+        for url_string in self._memoized_urls(field_):
+            url_parts = self._memoized_url_parts(url_string)
             pseudonym_map = self._get_pseudonym_map(pseudonyms, url_parts)
-            url_split = re.split("(://)", url_string)
+            url_split = SCHEME_SEPARATOR_PATTERN.split(url_string)
 
             replacements = self._get_parts_to_replace_in_correct_order(pseudonym_map)
 
-            do_not_replace_pattern = (
-                rf"(<pseudonym:[a-z0-9]*>|\?\w+=|&\w+=|"
-                rf"{url_parts['domain']}\.{url_parts['suffix']})"
-            )
+            do_not_replace_pattern = url_parts["do_not_replace_pattern"]
 
             for replacement in replacements:
-                parts_to_replace = re.split(do_not_replace_pattern, url_split[-1])
+                parts_to_replace = do_not_replace_pattern.split(url_split[-1])
                 for index, _ in enumerate(parts_to_replace):
-                    if not re.findall(do_not_replace_pattern, parts_to_replace[index]):
+                    if not do_not_replace_pattern.findall(parts_to_replace[index]):
                         parts_to_replace[index] = parts_to_replace[index].replace(
                             replacement, pseudonym_map[replacement]
                         )
@@ -281,23 +414,26 @@ class Pseudonymizer(Processor):
         url = tld_extractor(url_str)
 
         parts = {}
-        parts["scheme"] = self._find_first(r"^([a-z0-9]+)\:\/\/", url_str)
-        parts["auth"] = self._find_first(r"(?:.*\/\/|^)(.*:.*)@.*", url_str)
+        parts["scheme"] = self._find_first(SCHEME_PATTERN, url_str)
+        parts["auth"] = self._find_first(AUTH_PATTERN, url_str)
         parts["domain"] = url.domain
         parts["subdomain"] = url.subdomain
         parts["suffix"] = url.suffix
         url_list = ".".join(list(url))
         parts["path"] = self._find_first(
-            rf"(?:^[a-z0-9]+\:\/\/)?{url_list}(?:\:\d+)?([^#^\?]*).*", url_str
+            re.compile(rf"(?:^[a-z0-9]+\:\/\/)?{url_list}(?:\:\d+)?([^#^\?]*).*"), url_str
+        )
+        parts["query"] = self._find_first(QUERY_PATTERN, url_str)
+        parts["fragment"] = self._find_first(FRAGMENT_PATTERN, url_str)
+        parts["do_not_replace_pattern"] = re.compile(
+            rf"(<pseudonym:[a-z0-9]*>|\?\w+=|&\w+=|{url.domain}\.{url.suffix})"
         )
-        parts["query"] = self._find_first(r".*(\?\w+=[a-zA-Z0-9](?:&\w+=[a-zA-Z0-9]+)*).*", url_str)
-        parts["fragment"] = self._find_first(r".*#(.*)", url_str)
 
         return parts
 
     @staticmethod
-    def _find_first(pattern: str, string: str) -> Optional[str]:
-        match = re.findall(pattern, string)
+    def _find_first(pattern: Pattern, string: str) -> Optional[str]:
+        match = pattern.findall(string)
         if match:
             return match[0]
         return None
@@ -344,20 +480,24 @@ class Pseudonymizer(Processor):
         unprocessed = split_by_cap_group[-1]
         return processed_but_not_pseudonymized, unprocessed
 
+    def _hash_value(self, value: str) -> str:
+        return self._hasher.hash_str(value, salt=self._config.hash_salt)
+
     def _pseudonymize_value(self, value: str, pseudonyms: List[dict]) -> str:
-        hash_string = self._hasher.hash_str(value, salt=self._config.hash_salt)
+        hash_string = self._memoized_hash(value)
         if self._cache.requires_storing(hash_string):
             encrypted_origin = self._encrypter.encrypt(value)
             pseudonyms.append({"pseudonym": hash_string, "origin": encrypted_origin})
         return self._wrap_hash(hash_string)
 
     def _replace_regex_keywords_by_regex_expression(self):
-        for rule in self._specific_rules:
-            for dotted_field, regex_keyword in rule.pseudonyms.items():
-                rule.pseudonyms[dotted_field] = self._regex_mapping[regex_keyword]
-        for rule in self._generic_rules:
+        """Replaces the regex keywords of the rules by the compiled regular expressions of the
+        regex mapping. Rules that were replaced already are kept."""
+        for rule in [*self._specific_rules, *self._generic_rules]:
             for dotted_field, regex_keyword in rule.pseudonyms.items():
-                rule.pseudonyms[dotted_field] = self._regex_mapping[regex_keyword]
+                if isinstance(regex_keyword, str):
+                    regex = self._regex_mapping[regex_keyword]
+                    rule.pseudonyms[dotted_field] = re.compile(regex)
 
     def _wrap_hash(self, hash_string: str) -> str:
         return self.HASH_PREFIX + hash_string + self.HASH_SUFFIX
@@ -1,6 +1,6 @@
 """module for processor registry
-    it is used to check if a processor is known to the system.
-    you have to register new processors here by import them and add to `ProcessorRegistry.mapping`
+it is used to check if a processor is known to the system.
+you have to register new processors here by import them and add to `ProcessorRegistry.mapping`
 """
 
 from logprep.connector.confluent_kafka.input import ConfluentKafkaInput
@@ -9,6 +9,8 @@ from logprep.connector.console.output import ConsoleOutput
 from logprep.connector.dummy.input import DummyInput
 from logprep.connector.dummy.output import DummyOutput
 from logprep.connector.elasticsearch.output import ElasticsearchOutput
+from logprep.connector.file.input import FileInput
+from logprep.connector.generator.input import GeneratorInput
 from logprep.connector.json.input import JsonInput
 from logprep.connector.jsonl.input import JsonlInput
 from logprep.connector.jsonl.output import JsonlOutput
@@ -69,6 +71,8 @@ class Registry:
         "confluentkafka_output": ConfluentKafkaOutput,
         "console_output": ConsoleOutput,
         "eleasticsearch_output": ElasticsearchOutput,
+        "file_input": FileInput,
+        "generator_input": GeneratorInput,
         "jsonl_output": JsonlOutput,
         "opensearch_output": OpensearchOutput,
     }
@@ -1,9 +1,47 @@
 """Module for caching items and checking if they need to be stored (again)."""
 
-from typing import Union
+from typing import Optional, Tuple, Union
 
 import datetime
+import hashlib
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+from array import array
 from collections import OrderedDict
+from itertools import accumulate
+
+from attrs import define
+
+from logprep.metrics.metric import Metric
+
+
+@define(kw_only=True)
+class CacheMetrics(Metric):
+    """Tracks statistics about a cache"""
+
+    _prefix: str = "logprep_cache_"
+
+    hits: int = 0
+    """Number of items that were found in the cache and did not require storing"""
+    misses: int = 0
+    """Number of items that were not found in the cache or had expired"""
+    evictions: int = 0
+    """Number of items that were removed from the cache to make room for new items"""
+
+
+DIGEST_WORDS = struct.Struct("<QQ")
+
+
+def _digest_words(item: Union[int, str]) -> Tuple[int, int]:
+    """Returns a 16 byte digest of the item as two words. The first word is never 0, which marks
+    empty slots."""
+    digest = hashlib.blake2b(str(item).encode("utf8"), digest_size=16).digest()
+    high_word, low_word = DIGEST_WORDS.unpack(digest)
+    return high_word | 1, low_word
 
 
 class Cache(OrderedDict):
@@ -35,3 +73,539 @@ class Cache(OrderedDict):
                 self.popitem(last=False)
             return True
         return False
+
+    SNAPSHOT_MAGIC = b"LPCACHE1"
+    SNAPSHOT_HEADER = struct.Struct("<8sQQQ")
+
+    def save(self, path: str, values: Optional[dict] = None):
+        """Write a snapshot of the cache to a file, which is replaced atomically.
+
+        The snapshot is a binary file with a header, the timestamps in seconds and the lengths
+        of all items as arrays and the concatenated items. Items are stored as strings.
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file.
+        values : dict
+            Optional string values of the items that are stored with them, e.g. resolved
+            addresses. Items without a value get the value None.
+
+        """
+        items = [str(item) for item in self]
+        now = datetime.datetime.now()
+        now_seconds = int(now.timestamp())
+        second = datetime.timedelta(seconds=1)
+        timestamps = array(
+            "q", (now_seconds - (now - stored) // second for stored in self.values())
+        )
+        item_lengths = array("I", map(len, items))
+        item_blob = "".join(items).encode("utf8")
+        if values:
+            item_values = [values.get(item) for item in self]
+            value_lengths = array(
+                "i", (-1 if value is None else len(value) for value in item_values)
+            )
+            value_blob = "".join(value for value in item_values if value is not None).encode("utf8")
+        else:
+            value_lengths = array("i", [-1]) * len(items)
+            value_blob = b""
+        header = self.SNAPSHOT_HEADER.pack(
+            self.SNAPSHOT_MAGIC, len(items), len(item_blob), len(value_blob)
+        )
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as snapshot_file:
+            for part in (header, timestamps, item_lengths, value_lengths, item_blob, value_blob):
+                snapshot_file.write(part)
+        os.replace(temporary_path, path)
+
+    def load(self, path: str) -> dict:
+        """Load the items of a snapshot that are not expired yet into the cache. If the snapshot
+        contains more than :code:`max_items` items, the ones that were used longest ago are
+        skipped.
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file.
+
+        Returns
+        -------
+        values : dict
+            The values that were stored with the loaded items.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a cache snapshot.
+
+        """
+        with open(path, "rb") as snapshot_file:
+            snapshot = snapshot_file.read()
+        try:
+            magic, count, item_blob_size, value_blob_size = self.SNAPSHOT_HEADER.unpack_from(
+                snapshot
+            )
+        except struct.error as error:
+            raise ValueError(f"'{path}' is not a cache snapshot") from error
+        expected_size = self.SNAPSHOT_HEADER.size + 16 * count + item_blob_size + value_blob_size
+        if magic != self.SNAPSHOT_MAGIC or len(snapshot) != expected_size:
+            raise ValueError(f"'{path}' is not a cache snapshot")
+        offset = self.SNAPSHOT_HEADER.size
+        timestamps = array("q", snapshot[offset : offset + 8 * count])
+        offset += 8 * count
+        item_lengths = array("I", snapshot[offset : offset + 4 * count])
+        offset += 4 * count
+        value_lengths = array("i", snapshot[offset : offset + 4 * count])
+        offset += 4 * count
+        items_text = snapshot[offset : offset + item_blob_size].decode("utf8")
+        offset += item_blob_size
+        values_text = snapshot[offset : offset + value_blob_size].decode("utf8")
+
+        max_seconds = self._max_timedelta.total_seconds()
+        oldest = time.time() - max_seconds if max_seconds else float("-inf")
+        first = max(0, count - self._max_items)
+        loaded = [index for index in range(first, count) if timestamps[index] >= oldest]
+        item_ends = list(accumulate(item_lengths))
+        items = [
+            items_text[item_ends[index] - item_lengths[index] : item_ends[index]]
+            for index in loaded
+        ]
+        datetimes = {}  # items that were stored in the same second share a datetime object
+        for index in loaded:
+            if timestamps[index] not in datetimes:
+                datetimes[timestamps[index]] = datetime.datetime.fromtimestamp(timestamps[index])
+        self.update(zip(items, (datetimes[timestamps[index]] for index in loaded)))
+        while len(self) > self._max_items:
+            self.popitem(last=False)
+
+        values = {}
+        if value_blob_size or any(length == 0 for length in value_lengths):
+            value_ends = list(accumulate(max(length, 0) for length in value_lengths))
+            for item, index in zip(items, loaded):
+                if value_lengths[index] >= 0:
+                    start = value_ends[index] - value_lengths[index]
+                    values[item] = values_text[start : value_ends[index]]
+        return values
+
+
+class SharedMemoryCache:
+    """Caches digests of items along with the time they were last stored in a file that is mapped
+    into the memory of all processes that use the same path, e.g. in :code:`/dev/shm`.
+
+    The file is a hash table with a fixed number of buckets of :code:`BUCKET_SIZE` slots. Every
+    slot consists of a 16 byte digest of an item and the time in milliseconds when it was last
+    stored. If all slots of a bucket are used, the slot that was stored longest ago is replaced.
+    Thus, the memory is bounded by :code:`max_items` slots of 24 bytes.
+
+    The cache is accessed without locks. Since a digest is written before its time, a process
+    can only find an item that another process is about to store. Concurrent accesses can at most
+    cause an item to be stored by multiple processes, like with separate caches.
+    """
+
+    BUCKET_SIZE = 8
+    SLOT_WORDS = 3
+
+    def __init__(
+        self,
+        path: str,
+        max_items=1000000,
+        max_timedelta=datetime.timedelta(days=90.0),
+        metric_labels: Optional[dict] = None,
+    ):
+        self._path = path
+        self._buckets = max(1, -(-max_items // self.BUCKET_SIZE))
+        self._max_milliseconds = int(max_timedelta.total_seconds() * 1000)
+        size = self._buckets * self.BUCKET_SIZE * self.SLOT_WORDS * 8
+        file_descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(file_descriptor).st_size != size:
+                os.ftruncate(file_descriptor, size)
+            self._mmap = mmap.mmap(file_descriptor, size)
+        finally:
+            os.close(file_descriptor)
+        self._slots = memoryview(self._mmap).cast("Q")
+        self.metrics = CacheMetrics(labels=metric_labels or {"component": "cache"})
+
+    def __len__(self) -> int:
+        return sum(1 for index in range(0, len(self._slots), self.SLOT_WORDS) if self._slots[index])
+
+    def requires_storing(self, item: Union[int, str]) -> bool:
+        """Check if the item was stored within the last timedelta by any process.
+
+        Parameters
+        ----------
+        item : str
+            Name of item to check for in the cache.
+
+        """
+        high_word, low_word = _digest_words(item)
+        slots = self._slots
+        first_slot = (low_word % self._buckets) * self.BUCKET_SIZE * self.SLOT_WORDS
+        now = int(time.time() * 1000)
+        oldest_slot = first_slot
+        for slot in range(
+            first_slot, first_slot + self.BUCKET_SIZE * self.SLOT_WORDS, self.SLOT_WORDS
+        ):
+            if slots[slot] == high_word and slots[slot + 1] == low_word:
+                if self._max_milliseconds == 0 or now - slots[slot + 2] > self._max_milliseconds:
+                    slots[slot + 2] = now
+                    self.metrics.misses += 1
+                    return True
+                self.metrics.hits += 1
+                return False
+            if slots[slot + 2] < slots[oldest_slot + 2]:
+                oldest_slot = slot
+        if slots[oldest_slot]:
+            self.metrics.evictions += 1
+        self.metrics.misses += 1
+        slots[oldest_slot] = high_word
+        slots[oldest_slot + 1] = low_word
+        slots[oldest_slot + 2] = now
+        return True
+
+    def close(self):
+        """Unmaps the file, which is kept for other processes."""
+        self._slots.release()
+        self._mmap.close()
+
+
+class CompactCache:
+    """Caches 8 byte digests of items along with the time they were last stored in arrays.
+
+    The cache is an open addressing hash table with twice as many slots as :code:`max_items`.
+    An item is searched in a window of :code:`WINDOW_SIZE` slots beginning at the slot of its
+    digest. If the window is full, an item of the window is replaced with the CLOCK algorithm,
+    which replaces the first item that was not used since the algorithm passed it last. Every
+    slot consists of the digest, the time in milliseconds and a bit that marks used items. Thus,
+    the cache requires 34 bytes per item and no python objects.
+
+    The times are taken from a monotonic clock that starts at the current time when the cache is
+    created. Therefore, they are not affected by changes of the system time, but can be compared
+    with the times of a snapshot that was saved by a previous process.
+    """
+
+    WINDOW_SIZE = 16
+    TABLES = ("_digests", "_stored_at", "_used")
+    SNAPSHOT_MAGIC = b"LPCOMPC1"
+    SNAPSHOT_HEADER = struct.Struct("<8sQQQQQ")
+
+    def __init__(
+        self,
+        max_items=1000000,
+        max_timedelta=datetime.timedelta(days=90.0),
+        metric_labels: Optional[dict] = None,
+    ):
+        self._table_size = 2 * max(1, max_items)
+        self._max_milliseconds = int(max_timedelta.total_seconds() * 1000)
+        slots = self._table_size + self.WINDOW_SIZE
+        self._digests = array("Q", bytes(8 * slots))
+        self._stored_at = array("q", bytes(8 * slots))
+        self._used = bytearray(slots)
+        self._length = 0
+        self._clock_offset = time.time_ns() // 1_000_000 - time.monotonic_ns() // 1_000_000
+        self.metrics = CacheMetrics(labels=metric_labels or {"component": "cache"})
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, item: Union[int, str]) -> bool:
+        """Checks if the item is cached and not expired without marking it as used."""
+        slot = self._find(self._digest(item))
+        if slot is None:
+            return False
+        return self._now() - self._stored_at[slot] <= self._max_milliseconds
+
+    @staticmethod
+    def _digest(item: Union[int, str]) -> int:
+        digest = hashlib.blake2b(str(item).encode("utf8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") | 1
+
+    def _now(self) -> int:
+        return time.monotonic_ns() // 1_000_000 + self._clock_offset
+
+    def _find(self, digest: int) -> Optional[int]:
+        digests = self._digests
+        first_slot = (digest >> 1) % self._table_size
+        for slot in range(first_slot, first_slot + self.WINDOW_SIZE):
+            if digests[slot] == digest:
+                return slot
+            if not digests[slot]:
+                return None
+        return None
+
+    def requires_storing(self, item: Union[int, str]) -> bool:
+        """Check if the item was stored within the last timedelta.
+
+        Parameters
+        ----------
+        item : str
+            Name of item to check for in the cache.
+
+        """
+        digest = self._digest(item)
+        digests = self._digests
+        now = self._now()
+        first_slot = (digest >> 1) % self._table_size
+        for slot in range(first_slot, first_slot + self.WINDOW_SIZE):
+            if digests[slot] == digest:
+                self._used[slot] = 1
+                if now - self._stored_at[slot] <= self._max_milliseconds:
+                    self.metrics.hits += 1
+                    return False
+                self._stored_at[slot] = now
+                self.metrics.misses += 1
+                return True
+            if not digests[slot]:
+                self._length += 1
+                break
+        else:
+            slot = self._unused_slot(first_slot)
+            self.metrics.evictions += 1
+        digests[slot] = digest
+        self._stored_at[slot] = now
+        self._used[slot] = 0
+        self.metrics.misses += 1
+        return True
+
+    def _unused_slot(self, first_slot: int) -> int:
+        """Returns the first slot of the window that was not used since it was passed last and
+        clears the used bits of the slots before it."""
+        used = self._used
+        for slot in range(first_slot, first_slot + self.WINDOW_SIZE):
+            if not used[slot]:
+                return slot
+            used[slot] = 0
+        return first_slot
+
+    def save(self, path: str, values: Optional[dict] = None):
+        """Write a snapshot of the cache to a file, which is replaced atomically.
+
+        The snapshot consists of a header, the arrays of the slots and the concatenated items
+        and values of the given values, which are stored as strings.
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file.
+        values : dict
+            Optional string values of items, e.g. resolved addresses. Values of items that are
+            not cached and values that are None are not saved.
+
+        """
+        values = values if values is not None else {}
+        cached_values = [
+            (str(item), value)
+            for item, value in values.items()
+            if value is not None and item in self
+        ]
+        item_lengths = array("I", (len(item) for item, _ in cached_values))
+        value_lengths = array("I", (len(value) for _, value in cached_values))
+        item_blob = "".join(item for item, _ in cached_values).encode("utf8")
+        value_blob = "".join(value for _, value in cached_values).encode("utf8")
+        header = self.SNAPSHOT_HEADER.pack(
+            self.SNAPSHOT_MAGIC,
+            self._table_size,
+            self._length,
+            len(cached_values),
+            len(item_blob),
+            len(value_blob),
+        )
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as snapshot_file:
+            for part in (
+                header,
+                *(getattr(self, table) for table in self.TABLES),
+                item_lengths,
+                value_lengths,
+                item_blob,
+                value_blob,
+            ):
+                snapshot_file.write(part)
+        os.replace(temporary_path, path)
+
+    def load(self, path: str) -> dict:
+        """Replace the content of the cache with a snapshot. Items that expired since the snapshot
+        was saved are treated like items that were not found.
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file.
+
+        Returns
+        -------
+        values : dict
+            The values that were saved with the items that are not expired.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a snapshot of a cache with the same maximum number of items.
+
+        """
+        with open(path, "rb") as snapshot_file:
+            snapshot = snapshot_file.read()
+        try:
+            magic, table_size, length, value_count, item_blob_size, value_blob_size = (
+                self.SNAPSHOT_HEADER.unpack_from(snapshot)
+            )
+        except struct.error as error:
+            raise ValueError(f"'{path}' is not a cache snapshot") from error
+        slots = table_size + self.WINDOW_SIZE
+        slot_size = sum(memoryview(getattr(self, table)).itemsize for table in self.TABLES)
+        expected_size = (
+            self.SNAPSHOT_HEADER.size
+            + slot_size * slots
+            + 8 * value_count
+            + item_blob_size
+            + value_blob_size
+        )
+        if magic != self.SNAPSHOT_MAGIC or len(snapshot) != expected_size:
+            raise ValueError(f"'{path}' is not a cache snapshot")
+        if table_size != self._table_size:
+            raise ValueError(f"'{path}' is a snapshot of a cache with another size")
+        offset = self.SNAPSHOT_HEADER.size
+        for table in self.TABLES:
+            current_table = getattr(self, table)
+            table_bytes = memoryview(current_table).nbytes
+            if isinstance(current_table, array):
+                loaded_table = array(
+                    current_table.typecode, snapshot[offset : offset + table_bytes]
+                )
+            else:
+                loaded_table = bytearray(snapshot[offset : offset + table_bytes])
+            setattr(self, table, loaded_table)
+            offset += table_bytes
+        self._length = length
+        item_lengths = array("I", snapshot[offset : offset + 4 * value_count])
+        offset += 4 * value_count
+        value_lengths = array("I", snapshot[offset : offset + 4 * value_count])
+        offset += 4 * value_count
+        items_text = snapshot[offset : offset + item_blob_size].decode("utf8")
+        offset += item_blob_size
+        values_text = snapshot[offset : offset + value_blob_size].decode("utf8")
+        values = {}
+        for item_length, item_end, value_length, value_end in zip(
+            item_lengths, accumulate(item_lengths), value_lengths, accumulate(value_lengths)
+        ):
+            item = items_text[item_end - item_length : item_end]
+            if item in self:
+                values[item] = values_text[value_end - value_length : value_end]
+        return values
+
+
+class ResolutionCache(CompactCache):
+    """Caches IPv4 addresses of items, e.g. resolved domains, in the slots of a
+    :code:`CompactCache`.
+
+    Resolved addresses and failed resolutions, which have no address, expire after separate
+    times. Resolved addresses can still be used as stale addresses for :code:`max_stale_timedelta`
+    after they expired, while they are resolved again. The address of every slot requires 8
+    more bytes, thus 50 bytes per item. The cache can be used by multiple threads.
+    """
+
+    TABLES = (*CompactCache.TABLES, "_addresses")
+    SNAPSHOT_MAGIC = b"LPRESOL1"
+
+    MISS = 0
+    FRESH = 1
+    STALE = 2
+
+    _NO_ADDRESS = -1
+
+    def __init__(
+        self,
+        max_items=1000000,
+        max_timedelta=datetime.timedelta(days=90.0),
+        max_negative_timedelta=datetime.timedelta(minutes=1.0),
+        max_stale_timedelta=datetime.timedelta(0),
+        metric_labels: Optional[dict] = None,
+    ):
+        super().__init__(max_items, max_timedelta, metric_labels)
+        self._max_negative_milliseconds = int(max_negative_timedelta.total_seconds() * 1000)
+        self._max_stale_milliseconds = int(max_stale_timedelta.total_seconds() * 1000)
+        self._addresses = array("q", bytes(8 * len(self._digests)))
+        self._lock = threading.Lock()
+
+    def __contains__(self, item: Union[int, str]) -> bool:
+        """Checks if the item has a resolution that is not expired without marking it as used."""
+        slot = self._find(self._digest(item))
+        return slot is not None and self._state(slot) == self.FRESH
+
+    def _state(self, slot: int) -> int:
+        age = self._now() - self._stored_at[slot]
+        if self._addresses[slot] == self._NO_ADDRESS:
+            return self.FRESH if age <= self._max_negative_milliseconds else self.MISS
+        if age <= self._max_milliseconds:
+            return self.FRESH
+        if age <= self._max_milliseconds + self._max_stale_milliseconds:
+            return self.STALE
+        return self.MISS
+
+    def requires_storing(self, item: Union[int, str]) -> bool:
+        """Check if the item has no resolution that is not expired or stale."""
+        return self.lookup(item)[0] == self.MISS
+
+    def lookup(self, item: Union[int, str]) -> Tuple[int, Optional[str]]:
+        """Returns the state of the resolution of the item and its address.
+
+        Parameters
+        ----------
+        item : str
+            Name of item to look up in the cache.
+
+        Returns
+        -------
+        state : int
+            :code:`MISS` if the item has to be resolved, :code:`FRESH` if the resolution is not
+            expired or :code:`STALE` if the address can be used until the item was resolved again.
+        address : str
+            The cached address, which is None for misses and failed resolutions.
+
+        """
+        with self._lock:
+            slot = self._find(self._digest(item))
+            state = self.MISS if slot is None else self._state(slot)
+            if state == self.MISS:
+                self.metrics.misses += 1
+                return state, None
+            self._used[slot] = 1
+            self.metrics.hits += 1
+            address = self._addresses[slot]
+        if address == self._NO_ADDRESS:
+            return state, None
+        return state, socket.inet_ntoa(address.to_bytes(4, "big"))
+
+    def store(self, item: Union[int, str], address: Optional[str]):
+        """Stores the IPv4 address of the item or None if it could not be resolved.
+
+        Raises
+        ------
+        OSError
+            If the address is not a valid IPv4 address.
+
+        """
+        if address is None:
+            packed_address = self._NO_ADDRESS
+        else:
+            packed_address = int.from_bytes(socket.inet_aton(address), "big")
+        digest = self._digest(item)
+        first_slot = (digest >> 1) % self._table_size
+        with self._lock:
+            digests = self._digests
+            for slot in range(first_slot, first_slot + self.WINDOW_SIZE):
+                if digests[slot] == digest:
+                    break
+                if not digests[slot]:
+                    self._length += 1
+                    digests[slot] = digest
+                    self._used[slot] = 0
+                    break
+            else:
+                slot = self._unused_slot(first_slot)
+                self.metrics.evictions += 1
+                digests[slot] = digest
+                self._used[slot] = 0
+            self._stored_at[slot] = self._now()
+            self._addresses[slot] = packed_address
@@ -175,6 +175,30 @@ class Configuration(dict):
                     f'{self["process_count"]}'
                 )
             )
+        if "partition_workers" in self and self["partition_workers"] < 1:
+            errors.append(
+                InvalidConfigurationError(
+                    message=f"Partition workers must be an integer of one or larger, not: "
+                    f'{self["partition_workers"]}'
+                )
+            )
+        high_water_mark = self.get("output_high_water_mark", 1.0)
+        if not 0 < high_water_mark <= 1:
+            errors.append(
+                InvalidConfigurationError(
+                    message=f"Output high water mark must be a number larger than 0 and at most 1, "
+                    f"not: {high_water_mark}"
+                )
+            )
+        if "output_low_water_mark" in self and not (
+            0 <= self["output_low_water_mark"] <= high_water_mark
+        ):
+            errors.append(
+                InvalidConfigurationError(
+                    message=f"Output low water mark must be a number between 0 and the output high "
+                    f'water mark, not: {self["output_low_water_mark"]}'
+                )
+            )
         if "pipeline" in self and not self["pipeline"]:
             errors.append(
                 InvalidConfigurationError(message='"pipeline" must contain at least one item!')
@@ -1,10 +1,22 @@
-""" module for json handling helper methods"""
+"""module for json handling helper methods"""
+
+import codecs
+import gzip
+import io
 import json
 import os
-from typing import List
+from typing import BinaryIO, Iterator, List, Tuple
 
 from yaml import safe_dump
 
+try:
+    import zstandard
+except ModuleNotFoundError:  # pragma: no cover
+    zstandard = None
+
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+ZSTD_MAGIC_NUMBER = b"\x28\xb5\x2f\xfd"
+
 
 def list_json_files_in_directory(directory: str) -> List[str]:
     """
@@ -64,13 +76,118 @@ def parse_jsonl(jsonl_path):
     list[dict]
         A list of dictionaries where each dictionary represents one event
     """
-    parsed_events = []
-    with open(jsonl_path, "r", encoding="utf8") as jsonl_file:
-        for json_string in jsonl_file.readlines():
-            if json_string.strip() != "":
-                event = json.loads(json_string)
-                parsed_events.append(event)
-    return parsed_events
+    return [event for _, event in iterate_jsonl(jsonl_path)]
+
+
+def open_binary(path: str) -> BinaryIO:
+    """
+    Opens a file for buffered binary reading. Files compressed with gzip or zstd are detected by
+    their magic number and decompressed while reading.
+
+    Parameters
+    ----------
+    path: str
+        Path to the file.
+
+    Returns
+    -------
+    BinaryIO
+        A binary file object that can be iterated line by line.
+    """
+    with open(path, "rb") as file:
+        magic_number = file.read(len(ZSTD_MAGIC_NUMBER))
+    if magic_number.startswith(GZIP_MAGIC_NUMBER):
+        return gzip.open(path, "rb")
+    if magic_number == ZSTD_MAGIC_NUMBER:
+        if zstandard is None:
+            raise ModuleNotFoundError(f"reading '{path}' requires the package 'zstandard'")
+        return io.BufferedReader(zstandard.open(path, "rb"))
+    return open(path, "rb")  # pylint: disable=consider-using-with
+
+
+def iterate_jsonl(jsonl_path: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Lazily reads and parses the json events from a given jsonl file line by line.
+
+    Parameters
+    ----------
+    jsonl_path: str
+        Path to the jsonl file that contains the events. It may be compressed with gzip or zstd.
+
+    Yields
+    ------
+    tuple[int, dict]
+        The byte offset behind the event in the (decompressed) file and the parsed event.
+    """
+    with open_binary(jsonl_path) as jsonl_file:
+        offset = 0
+        for json_line in jsonl_file:
+            offset += len(json_line)
+            if json_line.strip():
+                yield offset, json.loads(json_line)
+
+
+def iterate_json(json_path: str, chunk_size: int = 65536) -> Iterator[Tuple[int, dict]]:
+    """
+    Lazily reads and parses a json file that contains either one json or a list of jsons.
+    The file is read in chunks of :code:`chunk_size` bytes and every json of the list is parsed
+    as soon as it was read completely.
+
+    Parameters
+    ----------
+    json_path: str
+        Path to the json file. It may be compressed with gzip or zstd.
+    chunk_size: int
+        Number of bytes that are read at once.
+
+    Yields
+    ------
+    tuple[int, dict]
+        The byte offset behind the json in the (decompressed) file and the parsed json.
+    """
+    json_decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf8")()
+    with open_binary(json_path) as json_file:
+        buffer, offset, end_of_file = "", 0, False
+
+        def skip_whitespace(position: int) -> int:
+            nonlocal buffer, end_of_file
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer) or end_of_file:
+                    return position
+                chunk = json_file.read(chunk_size)
+                end_of_file = not chunk
+                buffer += text_decoder.decode(chunk, final=end_of_file)
+
+        position = skip_whitespace(0)
+        if buffer[position : position + 1] != "[":
+            buffer += text_decoder.decode(json_file.read(), final=True)
+            parsed_json = json.loads(buffer)
+            yield len(buffer.encode("utf8")), parsed_json
+            return
+        position = skip_whitespace(position + 1)
+        while buffer[position : position + 1] != "]":
+            try:
+                parsed_json, end = json_decoder.raw_decode(buffer, position)
+                if end == len(buffer) and not end_of_file:
+                    raise json.JSONDecodeError("Incomplete json", buffer, end)
+            except json.JSONDecodeError:
+                if end_of_file:
+                    raise
+                chunk = json_file.read(chunk_size)
+                end_of_file = not chunk
+                buffer += text_decoder.decode(chunk, final=end_of_file)
+                continue
+            position = skip_whitespace(end)
+            if buffer[position : position + 1] == ",":
+                position = skip_whitespace(position + 1)
+            elif buffer[position : position + 1] != "]":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+            offset += len(buffer[:end].encode("utf8"))
+            buffer, position = buffer[end:], position - end
+            yield offset, parsed_json
 
 
 def parse_json(json_path):
@@ -0,0 +1,48 @@
+"""This module provides cheap clocks and timestamp parsing for the handling of every event."""
+
+from datetime import datetime, timezone
+from time import time_ns
+from typing import Union
+
+import arrow
+
+
+class CachedIsoClock:
+    """A clock that renders the current local time as iso timestamp at most once per millisecond.
+
+    All calls within the same millisecond return the same timestamp, which saves the creation and
+    formatting of a new datetime object for every event.
+    """
+
+    __slots__ = ["_rendered_at", "_timestamp"]
+
+    _rendered_at: int
+    _timestamp: str
+
+    def __init__(self):
+        self._rendered_at = -1
+        self._timestamp = ""
+
+    def now(self) -> str:
+        """Returns the current time as iso timestamp."""
+        now_ns = time_ns()
+        now_ms = now_ns // 1_000_000
+        if now_ms != self._rendered_at:
+            self._rendered_at = now_ms
+            now = datetime.fromtimestamp(now_ns / 1e9, timezone.utc).astimezone()
+            self._timestamp = now.isoformat()
+        return self._timestamp
+
+
+def parse_timestamp(timestamp: Union[str, int, float]) -> datetime:
+    """Parses an iso timestamp with :code:`datetime.fromisoformat` and falls back to arrow for
+    other formats. Timestamps without timezone are interpreted as UTC like arrow does."""
+    if isinstance(timestamp, str):
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return arrow.get(timestamp).datetime
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc)
+        return parsed
+    return arrow.get(timestamp).datetime
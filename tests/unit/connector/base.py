@@ -10,6 +10,7 @@ from typing import Iterable
 from unittest import mock
 
 import arrow
+import pytest
 
 from logprep.abc.connector import Connector
 from logprep.abc.input import Input
@@ -53,6 +54,12 @@ class BaseInputTestCase(BaseConnectorTestCase):
         event, _ = self.object.get_next(0.01)
         assert isinstance(event, dict)
 
+    def test_get_next_keeps_raw_event(self):
+        return_value = ({"message": "test message"}, b'{"message": "test message"}')
+        self.object._get_event = mock.MagicMock(return_value=return_value)
+        self.object.get_next(0.01)
+        assert self.object.current_raw_event == b'{"message": "test message"}'
+
     def test_add_hmac_returns_true_if_hmac_options(self):
         connector_config = deepcopy(self.CONFIG)
         connector_config.update(
@@ -257,6 +264,92 @@ class BaseInputTestCase(BaseConnectorTestCase):
             == "Couldn't add the hmac to the input event as the desired output field 'message' already exist."
         )
 
+    def test_get_next_with_hmac_uses_compression_level(self):
+        connector_config = deepcopy(self.CONFIG)
+        connector_config.update(
+            {
+                "preprocessing": {
+                    "hmac": {
+                        "target": "<RAW_MSG>",
+                        "key": "hmac-test-key",
+                        "output_field": "Hmac",
+                        "compression_level": 0,
+                    }
+                }
+            }
+        )
+        connector = Factory.create({"test connector": connector_config}, logger=self.logger)
+        raw_event = b'{"message":"with_content"}'
+        connector._get_event = mock.MagicMock(return_value=({"message": "with_content"}, raw_event))
+        event, _ = connector.get_next(1)
+        assert (
+            event["Hmac"]["hmac"]
+            == "dfe78753da634d7b76760488dbb2cf7bfe1b0e4e794930c36e98a984b6b6be63"
+        )
+        compressed = base64.b64decode(event["Hmac"]["compressed_base64"])
+        assert compressed == zlib.compress(raw_event, 0)
+
+    def test_get_next_with_hmac_compresses_large_messages_on_worker_threads(self):
+        connector_config = deepcopy(self.CONFIG)
+        connector_config.update(
+            {
+                "preprocessing": {
+                    "hmac": {
+                        "target": "<RAW_MSG>",
+                        "key": "hmac-test-key",
+                        "output_field": "Hmac",
+                        "workers": 2,
+                    }
+                }
+            }
+        )
+        connector = Factory.create({"test connector": connector_config}, logger=self.logger)
+        connector.setup()
+        large_raw_event = json.dumps({"message": "x" * 20000}).encode("utf8")
+        small_raw_event = b'{"message":"with_content"}'
+        with mock.patch.object(
+            connector._hmac_executor, "submit", wraps=connector._hmac_executor.submit
+        ) as mock_submit:
+            for raw_event in (large_raw_event, small_raw_event):
+                connector._get_event = mock.MagicMock(return_value=({"any": "content"}, raw_event))
+                event, _ = connector.get_next(1)
+                compressed = base64.b64decode(event["Hmac"]["compressed_base64"])
+                assert zlib.decompress(compressed) == raw_event
+        mock_submit.assert_called_once()
+        connector._hmac_executor.shutdown()
+
+    def test_get_next_with_hmac_updates_hmac_processing_time(self):
+        connector_config = deepcopy(self.CONFIG)
+        connector_config.update(
+            {
+                "preprocessing": {
+                    "hmac": {"target": "<RAW_MSG>", "key": "hmac-test-key", "output_field": "Hmac"}
+                }
+            }
+        )
+        connector = Factory.create({"test connector": connector_config}, logger=self.logger)
+        connector._get_event = mock.MagicMock(return_value=({"any": "content"}, b"raw"))
+        assert connector.metrics.mean_hmac_processing_time_per_event == 0
+        connector.get_next(1)
+        assert connector.metrics.mean_hmac_processing_time_per_event > 0
+
+    def test_invalid_hmac_compression_level_raises(self):
+        connector_config = deepcopy(self.CONFIG)
+        connector_config.update(
+            {
+                "preprocessing": {
+                    "hmac": {
+                        "target": "<RAW_MSG>",
+                        "key": "hmac-test-key",
+                        "output_field": "Hmac",
+                        "compression_level": 10,
+                    }
+                }
+            }
+        )
+        with pytest.raises(ValueError, match=r"compression_level"):
+            Factory.create({"test connector": connector_config}, logger=self.logger)
+
     def test_get_next_without_hmac(self):
         kafka_config = deepcopy(self.CONFIG)
         assert not kafka_config.get("preprocessing", {}).get("hmac")
@@ -434,6 +527,58 @@ class BaseInputTestCase(BaseConnectorTestCase):
         result, _ = connector.get_next(0.01)
         assert test_event == {"any": "content"}
 
+    def test_pipeline_preprocessing_calculates_timestamp_delta_from_existing_arrival_time(self):
+        preprocessing_config = {
+            "preprocessing": {
+                "log_arrival_time_target_field": "arrival_time",
+                "log_arrival_timedelta": {
+                    "target_field": "log_arrival_timedelta",
+                    "reference_field": "@timestamp",
+                },
+            }
+        }
+        connector_config = deepcopy(self.CONFIG)
+        connector_config.update(preprocessing_config)
+        connector = Factory.create({"test connector": connector_config}, logger=self.logger)
+        test_event = {
+            "arrival_time": "2022-10-19T12:00:10.500000+02:00",
+            "@timestamp": "2022-10-19T10:00:00Z",
+        }
+        connector._get_event = mock.MagicMock(return_value=(test_event, None))
+        result, _ = connector.get_next(0.01)
+        assert result["log_arrival_timedelta"] == 10.5
+
+    def test_setup_compiles_enabled_preprocessing_steps_in_order(self):
+        preprocessing_config = {
+            "preprocessing": {
+                "log_arrival_time_target_field": "arrival_time",
+                "version_info_target_field": "version_info",
+                "hmac": {"target": "<RAW_MSG>", "key": "hmac-test-key", "output_field": "Hmac"},
+            }
+        }
+        connector_config = deepcopy(self.CONFIG)
+        connector_config.update(preprocessing_config)
+        connector = Factory.create({"test connector": connector_config}, logger=self.logger)
+        connector.setup()
+        assert connector._preprocessing_steps == [
+            connector._add_hmac_to_event,
+            connector._add_version_information_to_event,
+            connector._add_arrival_time_information_to_event,
+        ]
+
+    def test_get_next_does_not_check_preprocessing_config_per_event(self):
+        connector_config = deepcopy(self.CONFIG)
+        connector_config.update({"preprocessing": {"version_info_target_field": "version_info"}})
+        connector = Factory.create({"test connector": connector_config}, logger=self.logger)
+        connector.setup()
+        connector._get_event = mock.MagicMock(return_value=({"any": "content"}, None))
+        with mock.patch.object(
+            type(connector), "_add_version_info", new_callable=mock.PropertyMock
+        ) as mock_add_version_info:
+            result, _ = connector.get_next(0.01)
+        mock_add_version_info.assert_not_called()
+        assert "version_info" in result
+
     def test_get_next_returns_event_with_active_time_measurement(self):
         TimeMeasurement.TIME_MEASUREMENT_ENABLED = True
         TimeMeasurement.APPEND_TO_EVENT = True
@@ -4,13 +4,17 @@
 # pylint: disable=wrong-import-order
 # pylint: disable=attribute-defined-outside-init
 # pylint: disable=no-self-use
+import json
+import re
 from copy import deepcopy
 from unittest import mock
 
 import pytest
+from confluent_kafka import KafkaException, TopicPartition
 
 from logprep.factory import Factory
 from logprep.abc.input import CriticalInputError
+from logprep.factory_error import InvalidConfigurationError
 from tests.unit.connector.base import BaseInputTestCase
 from tests.unit.connector.test_confluent_kafka_common import CommonConfluentKafkaTestCase
 
@@ -135,3 +139,138 @@ class TestConfluentKafkaInput(BaseInputTestCase, CommonConfluentKafkaTestCase):
         mock_record.value.return_value = '{"element":"in list"}'.encode("utf8")
         result = self.object._get_raw_event(0.001)
         assert result
+
+    @mock.patch("logprep.connector.confluent_kafka.input.Consumer")
+    def test_get_raw_event_sets_current_partition_and_record(self, _):
+        mock_record = mock.MagicMock()
+        mock_record.error.return_value = None
+        mock_record.partition.return_value = 3
+        self.object._consumer.poll = mock.MagicMock(return_value=mock_record)
+        self.object._get_raw_event(0.001)
+        assert self.object.current_partition == 3
+        assert self.object.current_record is mock_record
+        assert self.object._last_valid_records == {3: mock_record}
+
+    @mock.patch("logprep.connector.confluent_kafka.input.Consumer")
+    def test_get_raw_event_does_not_store_record_if_records_are_acknowledged(self, _):
+        mock_record = mock.MagicMock()
+        mock_record.error.return_value = None
+        mock_record.partition.return_value = 3
+        self.object._consumer.poll = mock.MagicMock(return_value=mock_record)
+        self.object.acknowledge_records = True
+        self.object._get_raw_event(0.001)
+        assert not self.object._last_valid_records
+        self.object.acknowledge(mock_record)
+        assert self.object._last_valid_records == {3: mock_record}
+
+    @mock.patch("logprep.connector.confluent_kafka.input.Consumer")
+    def test_consumer_subscribes_with_rebalance_callbacks(self, _):
+        self.object._consumer.subscribe.assert_called_with(
+            ["test_input_raw"],
+            on_assign=self.object._assign_callback,
+            on_revoke=self.object._revoke_callback,
+        )
+
+    @staticmethod
+    def _record(partition, offset):
+        record = mock.MagicMock()
+        record.partition.return_value = partition
+        record.offset.return_value = offset
+        return record
+
+    def test_revoke_callback_flushes_output_and_commits_offsets_of_revoked_partitions(self):
+        consumer = mock.MagicMock()
+        self.object.flush_callback = mock.MagicMock()
+        self.object._last_valid_records = {0: self._record(0, 41), 1: self._record(1, 7)}
+        self.object._revoke_callback(consumer, [TopicPartition("test_input_raw", 0)])
+        self.object.flush_callback.assert_called()
+        consumer.commit.assert_called_with(
+            offsets=[TopicPartition("test_input_raw", 0, 42)], asynchronous=False
+        )
+        assert list(self.object._last_valid_records) == [1]
+
+    def test_revoke_callback_does_not_commit_without_records(self):
+        consumer = mock.MagicMock()
+        self.object._revoke_callback(consumer, [TopicPartition("test_input_raw", 0)])
+        consumer.commit.assert_not_called()
+
+    def test_revoke_callback_logs_warning_if_commit_fails(self):
+        consumer = mock.MagicMock()
+        consumer.commit.side_effect = KafkaException("commit failed")
+        self.object._logger = mock.MagicMock()
+        self.object._last_valid_records = {0: self._record(0, 41)}
+        self.object._revoke_callback(consumer, [TopicPartition("test_input_raw", 0)])
+        warning = self.object._logger.warning.call_args[0][0]
+        assert "Could not commit offsets of revoked partitions" in warning
+
+    def test_assign_callback_logs_assigned_partitions(self):
+        self.object._logger = mock.MagicMock()
+        self.object._assign_callback(mock.MagicMock(), [TopicPartition("test_input_raw", 3)])
+        assert "[3]" in self.object._logger.info.call_args[0][0]
+
+    def _create_prefiltered_input(self, prefilter):
+        config = deepcopy(self.CONFIG)
+        config["prefilter"] = prefilter
+        kafka_input = Factory.create({"test": config}, logger=self.logger)
+        kafka_input._consumer.poll = mock.MagicMock()
+        return kafka_input
+
+    @staticmethod
+    def _record_with_value(value: bytes):
+        record = mock.MagicMock()
+        record.error.return_value = None
+        record.partition.return_value = 0
+        record.offset.return_value = 0
+        record.value.return_value = value
+        return record
+
+    @mock.patch("logprep.connector.confluent_kafka.input.Consumer")
+    def test_get_next_drops_prefiltered_messages_without_parsing_them(self, _):
+        kafka_input = self._create_prefiltered_input(
+            {"contains": ['"channel":"Security"'], "regex": ['"event_id": ?(4103|4104)[,}]']}
+        )
+        values = [
+            b'{"winlog":{"channel":"Security"},"event_id":1}',
+            b'{"winlog":{"channel":"System"},"event_id": 4104}',
+            b'{"winlog":{"channel":"System"},"event_id":41040}',
+        ]
+        kafka_input._consumer.poll.side_effect = [self._record_with_value(v) for v in values]
+        with mock.patch("json.loads", wraps=json.loads) as mock_loads:
+            assert kafka_input.get_next(1) == (None, None)
+            assert kafka_input.get_next(1) == (None, None)
+            mock_loads.assert_not_called()
+            event, _ = kafka_input.get_next(1)
+        assert event == {"winlog": {"channel": "System"}, "event_id": 41040}
+        assert kafka_input.metrics.number_of_prefiltered_events == 2
+
+    @mock.patch("logprep.connector.confluent_kafka.input.Consumer")
+    def test_get_next_passes_prefiltered_messages_to_callback_if_target_is_set(self, _):
+        kafka_input = self._create_prefiltered_input(
+            {"contains": ['"channel":"Security"'], "target": "prefiltered_topic"}
+        )
+        kafka_input.prefilter_callback = mock.MagicMock()
+        kafka_input._consumer.poll.return_value = self._record_with_value(b'{"channel":"Security"}')
+        assert kafka_input.get_next(1) == (None, None)
+        kafka_input.prefilter_callback.assert_called_with(
+            ([{"channel": "Security"}], "prefiltered_topic")
+        )
+
+    @mock.patch("logprep.connector.confluent_kafka.input.Consumer")
+    def test_get_next_does_not_prefilter_without_conditions(self, _):
+        kafka_input = self._create_prefiltered_input({})
+        kafka_input._consumer.poll.return_value = self._record_with_value(b'{"channel":"Security"}')
+        event, _ = kafka_input.get_next(1)
+        assert event == {"channel": "Security"}
+        assert kafka_input.metrics.number_of_prefiltered_events == 0
+
+    def test_prefilter_with_invalid_regex_raises(self):
+        config = deepcopy(self.CONFIG)
+        config["prefilter"] = {"regex": ["(unclosed"]}
+        with pytest.raises(re.error):
+            Factory.create({"test": config}, logger=self.logger)
+
+    def test_prefilter_with_unknown_key_raises(self):
+        config = deepcopy(self.CONFIG)
+        config["prefilter"] = {"unknown": []}
+        with pytest.raises(InvalidConfigurationError, match=r"following keys are unknown"):
+            Factory.create({"test": config}, logger=self.logger)
@@ -129,3 +129,16 @@ class TestConfluentKafkaOutput(BaseOutputTestCase, CommonConfluentKafkaTestCase)
         self.object.input_connector = mock.MagicMock()
         self.object.store({"message": "my event message"})
         self.object.input_connector.batch_finished_callback.assert_called()
+
+    @mock.patch("logprep.connector.confluent_kafka.output.Producer")
+    def test_flush_calls_producer_flush(self, _):
+        kafka_producer = self.object._producer
+        self.object.flush()
+        kafka_producer.flush.assert_called_with(self.object._config.flush_timeout)
+
+    @mock.patch("logprep.connector.confluent_kafka.output.Producer")
+    def test_fill_level_is_share_of_maximum_backlog_waiting_for_delivery(self, _):
+        kafka_producer = self.object._producer
+        kafka_producer.__len__.return_value = self.object._config.maximum_backlog // 4
+        assert self.object.fill_level == 0.25
+        kafka_producer.poll.assert_called_with(0)
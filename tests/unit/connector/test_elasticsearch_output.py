@@ -27,7 +27,7 @@ class NotJsonSerializableMock:
 
 
 def mock_bulk(
-    _, documents: list, max_retries: int = 0, chunk_size: int = 500
+    _, documents: list, max_retries: int = 0, chunk_size: int = 500, max_chunk_bytes: int = 0
 ):  # pylint: disable=unused-argument
     for document in documents:
         try:
@@ -226,3 +226,370 @@ class TestElasticsearchOutput(BaseOutputTestCase):
     def test_handle_serialization_error_raises_fatal_output_error(self):
         with pytest.raises(FatalOutputError):
             self.object._handle_serialization_error(mock.MagicMock())
+
+    def test_split_backlog_returns_consecutive_chunks(self):
+        chunks = self.object._split_backlog(list(range(10)), 4)
+        assert chunks == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_write_to_search_context_sends_chunks_in_parallel(self, fake_bulk):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"message_backlog_size": 4, "thread_count": 2})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        for index in range(4):
+            es_output._write_to_search_context({"_index": "foo", "count": index})
+        assert fake_bulk.call_count == 2
+        sent_documents = [call[0][1] for call in fake_bulk.call_args_list]
+        assert sorted(document["count"] for chunk in sent_documents for document in chunk) == [
+            0,
+            1,
+            2,
+            3,
+        ]
+        assert all(call[1]["chunk_size"] == 2 for call in fake_bulk.call_args_list)
+        es_output.shut_down()
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_write_to_search_context_tracks_metrics_per_bulk_worker(self, _):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"message_backlog_size": 4, "thread_count": 2})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        for _ in range(4):
+            es_output._write_to_search_context({"_index": "foo"})
+        for worker_metrics in es_output.metrics.bulk_workers:
+            assert worker_metrics.number_of_bulk_requests == 1
+            assert worker_metrics.mean_bulk_request_time > 0
+        exposed_metrics = es_output.metrics.expose()
+        assert any(
+            "logprep_connector_bulk_worker_mean_bulk_request_time" in key and "worker:1" in key
+            for key in exposed_metrics
+        )
+        es_output.shut_down()
+
+    @mock.patch(
+        "logprep.connector.elasticsearch.output.helpers.bulk",
+        side_effect=elasticsearch.ConnectionError("N/A", "connection refused", None),
+    )
+    def test_parallel_bulk_raises_fatal_output_error_after_all_workers_finished(self, fake_bulk):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"message_backlog_size": 4, "thread_count": 4})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output.input_connector = mock.MagicMock()
+        for _ in range(3):
+            es_output._write_to_search_context({"_index": "foo"})
+        with pytest.raises(FatalOutputError):
+            es_output._write_to_search_context({"_index": "foo"})
+        assert fake_bulk.call_count == 4
+        es_output.input_connector.batch_finished_callback.assert_not_called()
+        es_output.shut_down()
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_handle_bulk_index_error_counts_rejected_documents(self, _):
+        mock_bulk_index_error = mock.MagicMock()
+        mock_bulk_index_error.errors = [
+            {
+                "index": {
+                    "data": {"my": "document"},
+                    "status": 429,
+                    "error": {"type": "es_rejected_execution_exception", "reason": "queue full"},
+                }
+            },
+            {
+                "index": {
+                    "data": {"my": "document"},
+                    "status": 400,
+                    "error": {"type": "myerrortype", "reason": "myreason"},
+                }
+            },
+        ]
+        self.object._handle_bulk_index_error(mock_bulk_index_error)
+        assert self.object.metrics.number_of_rejected_documents == 1
+
+    @mock.patch("logprep.connector.elasticsearch.output.elasticsearch.Elasticsearch")
+    def test_search_context_uses_configured_connection_pool_size(self, fake_elasticsearch):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"connection_pool_size": 8})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        _ = es_output._search_context
+        assert fake_elasticsearch.call_args[1]["maxsize"] == 8
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_handle_bulk_index_error_moves_rejected_documents_into_retry_queue(self, fake_bulk):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"retry_queue_size": 10})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output._add_to_retry_queue = mock.MagicMock()
+        mock_bulk_index_error = mock.MagicMock()
+        mock_bulk_index_error.errors = [
+            {
+                "create": {
+                    "_index": "my_index",
+                    "data": {"my": "document"},
+                    "status": 429,
+                    "error": {"type": "es_rejected_execution_exception", "reason": "queue full"},
+                }
+            }
+        ]
+        es_output._handle_bulk_index_error(mock_bulk_index_error)
+        es_output._add_to_retry_queue.assert_called_with(
+            [{"my": "document", "_index": "my_index", "_op_type": "create"}]
+        )
+        fake_bulk.assert_not_called()
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_send_bulk_does_not_retry_inline_if_retry_queue_is_enabled(self, fake_bulk):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"retry_queue_size": 10, "max_retries": 5})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output._write_to_search_context({"_index": "foo"})
+        assert fake_bulk.call_args[1]["max_retries"] == 0
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_retry_pending_documents_sends_and_clears_retry_queue(self, fake_bulk):
+        self.object._retry_queue.extend([{"_index": "foo", "count": 1}])
+        assert self.object._retry_pending_documents()
+        fake_bulk.assert_called()
+        assert fake_bulk.call_args[0][1] == [{"_index": "foo", "count": 1}]
+        assert not self.object._retry_queue
+        assert self.object.metrics.number_of_retried_documents == 1
+
+    @mock.patch(
+        "logprep.connector.elasticsearch.output.helpers.bulk",
+        side_effect=elasticsearch.ConnectionError("N/A", "connection refused", None),
+    )
+    def test_retry_pending_documents_requeues_documents_on_connection_error(self, _):
+        self.object._retry_queue.extend([{"_index": "foo", "count": 1}])
+        assert not self.object._retry_pending_documents()
+        assert list(self.object._retry_queue) == [{"_index": "foo", "count": 1}]
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_shut_down_sends_documents_of_retry_queue(self, fake_bulk):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"retry_queue_size": 10})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output._add_to_retry_queue([{"_index": "foo"}])
+        es_output.shut_down()
+        assert not es_output._retry_thread.is_alive()
+        fake_bulk.assert_called()
+        assert not es_output._retry_queue
+
+    def test_wait_for_free_retry_queue_returns_if_retry_queue_has_space(self):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"retry_queue_size": 2})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output._retry_queue.append({"_index": "foo"})
+        es_output._wait_for_free_retry_queue()
+
+    def test_split_by_bulk_size_splits_documents_by_estimated_size(self):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"min_bulk_bytes": 120, "max_bulk_bytes": 1000})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        documents = [{"_index": "foo", "message": "x" * 20}] * 10
+        bulks = es_output._split_by_bulk_size(documents)
+        assert len(bulks) == 5
+        assert sum(len(bulk) for bulk in bulks) == 10
+
+    def test_split_by_bulk_size_does_not_split_if_bulk_size_is_not_adaptive(self):
+        documents = [{"_index": "foo", "message": "x" * 20}] * 10
+        assert self.object._split_by_bulk_size(documents) == [documents]
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_bulk_adapts_bulk_size_to_request_time(self, _):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"min_bulk_bytes": 100, "max_bulk_bytes": 1000})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output._bulk(0, [{"_index": "foo"}])
+        assert es_output._bulk_bytes == 125
+        es_output._config.target_bulk_request_time = 1e-12
+        es_output._bulk_bytes = 1000
+        es_output._bulk(0, [{"_index": "foo"}])
+        assert es_output._bulk_bytes == 500
+
+    @pytest.mark.parametrize(
+        "date_formats, expected_time_unit",
+        [
+            (["YYYY-MM-DD"], "day"),
+            (["YYYY.MM"], "day"),
+            (["YYYY-MM-DD", "HH"], "hour"),
+            (["YYYY-MM-DD HH:mm"], "minute"),
+            (["X"], "second"),
+            (["YYYY-MM-DD[mm]"], "day"),
+            (["HH:mm:ss.SSS"], None),
+        ],
+    )
+    def test_smallest_time_unit(self, date_formats, expected_time_unit):
+        assert self.object._smallest_time_unit(date_formats) == expected_time_unit
+
+    def test_add_dates_caches_rendered_index_until_end_of_day(self):
+        document = {"_index": "my_index-%{YYYY-MM-DD}"}
+        self.object._add_dates(document)
+        index, expires_at = self.object._index_cache["my_index-%{YYYY-MM-DD}"]
+        assert document["_index"] == index == f"my_index-{arrow.now().format('YYYY-MM-DD')}"
+        assert expires_at == arrow.now().ceil("day").shift(microseconds=1).timestamp()
+
+    def test_add_dates_uses_cached_index(self):
+        self.object._index_cache["my_index-%{YYYY-MM-DD}"] = ("cached_index", float("inf"))
+        document = {"_index": "my_index-%{YYYY-MM-DD}"}
+        self.object._add_dates(document)
+        assert document["_index"] == "cached_index"
+
+    def test_add_dates_renders_index_again_if_cached_index_expired(self):
+        self.object._index_cache["my_index-%{YYYY}"] = ("my_index-1999", 0.0)
+        document = {"_index": "my_index-%{YYYY}"}
+        self.object._add_dates(document)
+        assert document["_index"] == f"my_index-{arrow.now().format('YYYY')}"
+
+    def test_add_dates_does_not_change_index_without_date_pattern(self):
+        document = {"_index": "my_index"}
+        self.object._add_dates(document)
+        assert document["_index"] == "my_index"
+        assert self.object._index_cache["my_index"] == ("my_index", float("inf"))
+
+    def test_add_dates_replaces_multiple_date_patterns(self):
+        document = {"_index": "my_index-%{YYYY}-%{MM}"}
+        self.object._add_dates(document)
+        assert document["_index"] == f"my_index-{arrow.now().format('YYYY')}-" + arrow.now().format(
+            "MM"
+        )
+
+    def test_serialize_bulk_action_returns_action_and_source_lines(self):
+        serialized = self.object._serialize_bulk_action(
+            {"_index": "my_index", "_op_type": "create", "field": "content"}
+        )
+        assert serialized == b'{"create":{"_index":"my_index"}}\n{"field":"content"}\n'
+
+    def test_serialize_bulk_action_omits_source_for_delete(self):
+        serialized = self.object._serialize_bulk_action(
+            {"_index": "my_index", "_op_type": "delete", "_id": "1"}
+        )
+        assert serialized == b'{"delete":{"_id":"1","_index":"my_index"}}\n'
+
+    def test_write_to_search_context_sends_serialized_backlog_if_size_is_exceeded(self):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"message_backlog_bytes": 60})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output.input_connector = mock.MagicMock()
+        es_output._search_context.bulk = mock.MagicMock(return_value={"errors": False})
+        es_output._write_to_search_context({"_index": "my_index", "field": "content"})
+        es_output._search_context.bulk.assert_not_called()
+        es_output._write_to_search_context({"_index": "my_index", "field": "content"})
+        expected_body = b'{"index":{"_index":"my_index"}}\n{"field":"content"}\n' * 2
+        es_output._search_context.bulk.assert_called_with(body=expected_body)
+        es_output.input_connector.batch_finished_callback.assert_called()
+        assert not es_output._serialized_backlog
+        assert es_output._serialized_backlog_bytes == 0
+
+    def test_write_to_search_context_replaces_not_serializable_document(self):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"message_backlog_bytes": 10000})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output._write_to_search_context(
+            {"_index": "my_index", "invalid": NotJsonSerializableMock()}
+        )
+        action, source = es_output._serialized_backlog[0].splitlines()
+        assert json.loads(action) == {"index": {"_index": "default_index"}}
+        assert "NotJsonSerializableMock" in json.loads(source)["message"]
+
+    def test_send_serialized_bulk_raises_bulk_index_error_with_failed_documents(self):
+        serialized_documents = [
+            b'{"index":{"_index":"my_index"}}\n{"field":"ok"}\n',
+            b'{"index":{"_index":"my_index"}}\n{"field":"failed"}\n',
+        ]
+        self.object._search_context.bulk = mock.MagicMock(
+            return_value={
+                "errors": True,
+                "items": [
+                    {"index": {"_index": "my_index", "status": 201}},
+                    {
+                        "index": {
+                            "_index": "my_index",
+                            "status": 400,
+                            "error": {"type": "myerrortype", "reason": "myreason"},
+                        }
+                    },
+                ],
+            }
+        )
+        with pytest.raises(elasticsearch.helpers.BulkIndexError) as error:
+            self.object._send_serialized_bulk(serialized_documents)
+        assert error.value.errors == [
+            {
+                "index": {
+                    "_index": "my_index",
+                    "status": 400,
+                    "error": {"type": "myerrortype", "reason": "myreason"},
+                    "data": {"field": "failed"},
+                }
+            }
+        ]
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_write_serialized_backlog_sends_failed_documents_to_error_index(self, fake_bulk):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"message_backlog_bytes": 1})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output._search_context.bulk = mock.MagicMock(
+            return_value={
+                "errors": True,
+                "items": [
+                    {
+                        "index": {
+                            "_index": "my_index",
+                            "status": 400,
+                            "error": {"type": "myerrortype", "reason": "myreason"},
+                        }
+                    }
+                ],
+            }
+        )
+        es_output._write_to_search_context({"_index": "my_index", "field": "failed"})
+        error_document = fake_bulk.call_args[0][1][0]
+        assert error_document["reason"] == "myerrortype: myreason"
+        assert error_document["message"] == json.dumps({"field": "failed"})
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_flush_sends_partial_backlog_and_calls_batch_finished_callback(self, fake_bulk):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"message_backlog_size": 4})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output.input_connector = mock.MagicMock()
+        es_output._write_to_search_context({"_index": "my_index", "order": 0})
+        es_output._write_to_search_context({"_index": "my_index", "order": 1})
+        fake_bulk.assert_not_called()
+        es_output.flush()
+        assert fake_bulk.call_args[0][1] == [
+            {"_index": "my_index", "order": 0},
+            {"_index": "my_index", "order": 1},
+        ]
+        es_output.input_connector.batch_finished_callback.assert_called()
+        assert es_output._processed_cnt == 0
+
+    def test_fill_level_is_share_of_retry_queue_size(self):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"retry_queue_size": 10})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        assert es_output.fill_level == 0.0
+        es_output._retry_queue.extend([{"_index": "my_index"}] * 3)
+        assert es_output.fill_level == 0.3
+
+    def test_fill_level_is_zero_without_retry_queue(self):
+        self.object._retry_queue.append({"_index": "my_index"})
+        assert self.object.fill_level == 0.0
+
+    @mock.patch("logprep.connector.elasticsearch.output.helpers.bulk")
+    def test_flush_does_not_send_empty_backlog(self, fake_bulk):
+        self.object.flush()
+        fake_bulk.assert_not_called()
+
+    def test_flush_sends_serialized_backlog(self):
+        es_config = deepcopy(self.CONFIG)
+        es_config.update({"message_backlog_bytes": 10000})
+        es_output = Factory.create({"elasticsearch": es_config}, self.logger)
+        es_output._search_context.bulk = mock.MagicMock(return_value={"errors": False})
+        es_output._write_to_search_context({"_index": "my_index", "field": "content"})
+        es_output.flush()
+        es_output._search_context.bulk.assert_called_with(
+            body=b'{"index":{"_index":"my_index"}}\n{"field":"content"}\n'
+        )
+        assert not es_output._serialized_backlog
+        assert es_output._serialized_backlog_bytes == 0
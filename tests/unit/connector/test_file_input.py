@@ -0,0 +1,210 @@
+# pylint: disable=missing-docstring
+# pylint: disable=attribute-defined-outside-init
+# pylint: disable=protected-access
+import json
+import os
+from unittest import mock
+
+import pytest
+
+from logprep.abc.input import CriticalInputError
+from logprep.connector.file.input import TailedFile
+from logprep.factory import Factory
+from tests.unit.connector.base import BaseInputTestCase
+
+
+class TestFileInput(BaseInputTestCase):
+    timeout = 0.01
+
+    CONFIG = {"type": "file_input", "paths": ["/does/not/matter/*.jsonl"]}
+
+    def _create_input(self, tmp_path, **config):
+        config = {
+            "type": "file_input",
+            "paths": [str(tmp_path / "*.jsonl")],
+            "discover_interval": 0,
+            "checkpoint_interval": 0,
+            **config,
+        }
+        file_input = Factory.create({"test file input": config}, self.logger)
+        file_input.setup()
+        return file_input
+
+    @staticmethod
+    def _append(path, *documents):
+        with open(path, "a", encoding="utf8") as file:
+            for document in documents:
+                file.write(f"{json.dumps(document)}\n")
+
+    def _read_all(self, file_input):
+        events = []
+        while True:
+            event, _ = file_input.get_next(self.timeout)
+            if event is None:
+                return events
+            events.append(event)
+
+    def test_describe_contains_paths(self):
+        assert self.object.describe().endswith("File Input: /does/not/matter/*.jsonl")
+
+    def test_get_next_reads_lines_of_all_matching_files(self, tmp_path):
+        self._append(tmp_path / "a.jsonl", {"file": "a", "order": 0}, {"file": "a", "order": 1})
+        self._append(tmp_path / "b.jsonl", {"file": "b", "order": 0})
+        self._append(tmp_path / "c.txt", {"file": "c", "order": 0})
+        file_input = self._create_input(tmp_path)
+        assert self._read_all(file_input) == [
+            {"file": "a", "order": 0},
+            {"file": "a", "order": 1},
+            {"file": "b", "order": 0},
+        ]
+
+    def test_get_next_returns_raw_line_and_offset(self, tmp_path):
+        self._append(tmp_path / "a.jsonl", {"order": 0})
+        file_input = self._create_input(tmp_path)
+        assert file_input._get_event(self.timeout) == ({"order": 0}, b'{"order": 0}')
+        assert file_input.current_offset == 13
+
+    def test_get_next_returns_none_and_waits_for_timeout_if_no_new_lines(self, tmp_path):
+        file_input = self._create_input(tmp_path)
+        with mock.patch("time.sleep") as mock_sleep:
+            assert file_input.get_next(self.timeout) == (None, None)
+        mock_sleep.assert_called_with(self.timeout)
+
+    def test_get_next_raises_critical_input_error_for_invalid_json(self, tmp_path):
+        (tmp_path / "a.jsonl").write_text("no json\n", encoding="utf8")
+        file_input = self._create_input(tmp_path)
+        with pytest.raises(CriticalInputError, match=r"not a valid json"):
+            file_input.get_next(self.timeout)
+
+    def test_get_next_raises_critical_input_error_if_not_a_dict(self, tmp_path):
+        (tmp_path / "a.jsonl").write_text("[1, 2]\n", encoding="utf8")
+        file_input = self._create_input(tmp_path)
+        with pytest.raises(CriticalInputError, match=r"could not be parsed as dict"):
+            file_input.get_next(self.timeout)
+
+    def test_get_next_tails_appended_lines_and_new_files(self, tmp_path):
+        self._append(tmp_path / "a.jsonl", {"order": 0})
+        file_input = self._create_input(tmp_path)
+        assert self._read_all(file_input) == [{"order": 0}]
+        self._append(tmp_path / "a.jsonl", {"order": 1})
+        self._append(tmp_path / "b.jsonl", {"order": 2})
+        assert self._read_all(file_input) == [{"order": 1}, {"order": 2}]
+
+    def test_get_next_waits_for_incomplete_line(self, tmp_path):
+        (tmp_path / "a.jsonl").write_text('{"order": 0}\n{"ord', encoding="utf8")
+        file_input = self._create_input(tmp_path)
+        assert self._read_all(file_input) == [{"order": 0}]
+        with open(tmp_path / "a.jsonl", "a", encoding="utf8") as file:
+            file.write('er": 1}\n')
+        assert self._read_all(file_input) == [{"order": 1}]
+
+    def test_get_next_splits_lines_across_blocks(self, tmp_path):
+        documents = [{"order": order} for order in range(10)]
+        self._append(tmp_path / "a.jsonl", *documents)
+        file_input = self._create_input(tmp_path, read_block_size=5)
+        assert self._read_all(file_input) == documents
+
+    def test_get_next_reopens_rotated_file(self, tmp_path):
+        self._append(tmp_path / "a.jsonl", {"order": 0})
+        file_input = self._create_input(tmp_path)
+        assert self._read_all(file_input) == [{"order": 0}]
+        self._append(tmp_path / "a.jsonl", {"order": 1})
+        os.rename(tmp_path / "a.jsonl", tmp_path / "a.jsonl.1")
+        self._append(tmp_path / "a.jsonl", {"order": 2})
+        assert self._read_all(file_input) == [{"order": 1}, {"order": 2}]
+
+    def test_get_next_does_not_read_rotated_file_again_if_it_matches(self, tmp_path):
+        self._append(tmp_path / "a.jsonl", {"order": 0})
+        file_input = self._create_input(tmp_path)
+        assert self._read_all(file_input) == [{"order": 0}]
+        os.rename(tmp_path / "a.jsonl", tmp_path / "b.jsonl")
+        self._append(tmp_path / "a.jsonl", {"order": 1})
+        assert self._read_all(file_input) == [{"order": 1}]
+
+    def test_get_next_returns_incomplete_last_line_of_rotated_file(self, tmp_path):
+        (tmp_path / "a.jsonl").write_text('{"order": 0}', encoding="utf8")
+        file_input = self._create_input(tmp_path)
+        assert self._read_all(file_input) == []
+        os.rename(tmp_path / "a.jsonl", tmp_path / "b.jsonl")
+        self._append(tmp_path / "a.jsonl", {"order": 1})
+        assert self._read_all(file_input) == [{"order": 0}, {"order": 1}]
+        assert self._read_all(file_input) == []
+
+    def test_get_next_reads_truncated_file_from_beginning(self, tmp_path):
+        self._append(tmp_path / "a.jsonl", {"order": 0}, {"order": 1})
+        file_input = self._create_input(tmp_path)
+        assert self._read_all(file_input) == [{"order": 0}, {"order": 1}]
+        with open(tmp_path / "a.jsonl", "w", encoding="utf8") as file:
+            file.write('{"order": 2}\n')
+        assert self._read_all(file_input) == [{"order": 2}]
+
+    def test_setup_starts_at_end_of_existing_files(self, tmp_path):
+        self._append(tmp_path / "a.jsonl", {"order": 0})
+        file_input = self._create_input(tmp_path, start="end")
+        assert self._read_all(file_input) == []
+        self._append(tmp_path / "a.jsonl", {"order": 1})
+        self._append(tmp_path / "b.jsonl", {"order": 2})
+        assert self._read_all(file_input) == [{"order": 1}, {"order": 2}]
+
+    def test_batch_finished_callback_writes_checkpoint_of_returned_documents(self, tmp_path):
+        checkpoint_path = tmp_path / "checkpoints.json"
+        self._append(tmp_path / "a.jsonl", {"order": 0}, {"order": 1})
+        file_input = self._create_input(tmp_path, checkpoint_path=str(checkpoint_path))
+        file_input.get_next(self.timeout)
+        assert not checkpoint_path.exists()
+        file_input.batch_finished_callback()
+        checkpoints = json.loads(checkpoint_path.read_text(encoding="utf8"))
+        assert checkpoints == {
+            str(tmp_path / "a.jsonl"): {
+                "inode": os.stat(tmp_path / "a.jsonl").st_ino,
+                "offset": 13,
+            }
+        }
+
+    def test_batch_finished_callback_respects_checkpoint_interval(self, tmp_path):
+        checkpoint_path = tmp_path / "checkpoints.json"
+        self._append(tmp_path / "a.jsonl", {"order": 0}, {"order": 1})
+        file_input = self._create_input(
+            tmp_path, checkpoint_path=str(checkpoint_path), checkpoint_interval=60
+        )
+        file_input.get_next(self.timeout)
+        file_input.batch_finished_callback()
+        file_input.get_next(self.timeout)
+        file_input.batch_finished_callback()
+        checkpoints = json.loads(checkpoint_path.read_text(encoding="utf8"))
+        assert checkpoints[str(tmp_path / "a.jsonl")]["offset"] == 13
+        file_input.shut_down()
+        checkpoints = json.loads(checkpoint_path.read_text(encoding="utf8"))
+        assert checkpoints[str(tmp_path / "a.jsonl")]["offset"] == 26
+
+    def test_restart_continues_after_checkpoint(self, tmp_path):
+        checkpoint_path = str(tmp_path / "checkpoints.json")
+        self._append(tmp_path / "a.jsonl", {"order": 0}, {"order": 1}, {"order": 2})
+        file_input = self._create_input(tmp_path, checkpoint_path=checkpoint_path)
+        file_input.get_next(self.timeout)
+        file_input.batch_finished_callback()
+        file_input.get_next(self.timeout)
+        file_input.shut_down()
+        file_input = self._create_input(tmp_path, checkpoint_path=checkpoint_path)
+        assert self._read_all(file_input) == [{"order": 1}, {"order": 2}]
+
+    def test_restart_ignores_checkpoint_of_replaced_file(self, tmp_path):
+        checkpoint_path = str(tmp_path / "checkpoints.json")
+        self._append(tmp_path / "a.jsonl", {"order": 0})
+        file_input = self._create_input(tmp_path, checkpoint_path=checkpoint_path)
+        file_input.get_next(self.timeout)
+        file_input.batch_finished_callback()
+        file_input.shut_down()
+        os.rename(tmp_path / "a.jsonl", tmp_path / "a.jsonl.1")
+        self._append(tmp_path / "a.jsonl", {"order": 1})
+        file_input = self._create_input(tmp_path, checkpoint_path=checkpoint_path)
+        assert self._read_all(file_input) == [{"order": 1}]
+
+    def test_tailed_file_reads_lines_with_offsets(self, tmp_path):
+        (tmp_path / "a.jsonl").write_bytes(b"first\n\nsecond\nthi")
+        tailed_file = TailedFile(str(tmp_path / "a.jsonl"))
+        assert tailed_file.read_lines(100) == [(b"first", 6), (b"second", 14)]
+        assert tailed_file.read_lines(100) == []
+        assert tailed_file.read_remainder() == [(b"thi", 17)]
+        assert tailed_file.read_remainder() == []
+        tailed_file.close()
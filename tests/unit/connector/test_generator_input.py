@@ -0,0 +1,156 @@
+# pylint: disable=missing-docstring
+# pylint: disable=attribute-defined-outside-init
+# pylint: disable=protected-access
+import ipaddress
+import json
+from copy import deepcopy
+from unittest import mock
+
+import pytest
+
+from logprep.abc.input import SourceDisconnectedError
+from logprep.factory import Factory
+from logprep.factory_error import InvalidConfigurationError
+from tests.unit.connector.base import BaseInputTestCase
+
+
+class TestGeneratorInput(BaseInputTestCase):
+    timeout = 0.01
+
+    CONFIG = {
+        "type": "generator_input",
+        "templates": ["tests/testdata/input_logdata/generator_templates.jsonl"],
+        "placeholders": {
+            "source_ip": {"type": "ip", "network": "192.168.0.0/24"},
+            "host": {"type": "hostname", "prefix": "ws-", "count": 10, "domain": "example.com"},
+            "event_id": {"type": "choice", "values": [4624, 4625], "weights": [9, 1]},
+            "user": {"type": "integer", "min": 1, "max": 3},
+            "timestamp": {"type": "timestamp"},
+        },
+        "pool_size": 100,
+        "seed": 42,
+    }
+
+    def _create_input(self, **config):
+        config = {**deepcopy(self.CONFIG), **config}
+        generator_input = Factory.create({"test generator input": config}, self.logger)
+        generator_input.setup()
+        return generator_input
+
+    def _read(self, generator_input, count):
+        return [generator_input.get_next(self.timeout)[0] for _ in range(count)]
+
+    def test_describe_contains_templates(self):
+        assert self.object.describe().endswith(
+            "Generator Input: tests/testdata/input_logdata/generator_templates.jsonl"
+        )
+
+    def test_get_next_replaces_placeholders(self):
+        generator_input = self._create_input()
+        for event in self._read(generator_input, 100):
+            assert "${" not in json.dumps(event)
+            if "winlog" in event:
+                address = event["winlog"]["event_data"]["IpAddress"]
+                assert ipaddress.ip_address(address) in ipaddress.ip_network("192.168.0.0/24")
+                assert event["winlog"]["event_id"] in (4624, 4625)
+                assert event["host"]["name"].startswith("ws-")
+                assert event["host"]["name"].endswith(".example.com")
+            else:
+                assert event["message"].startswith("login of ")
+                assert event["tags"][1] == "generated"
+
+    def test_get_next_keeps_type_of_values_of_single_placeholders(self):
+        generator_input = self._create_input()
+        event_ids = [
+            event["winlog"]["event_id"]
+            for event in self._read(generator_input, 100)
+            if "winlog" in event
+        ]
+        assert event_ids
+        assert all(isinstance(event_id, int) for event_id in event_ids)
+
+    def test_get_next_draws_choices_by_weight(self):
+        generator_input = self._create_input(pool_size=2000)
+        event_ids = [
+            event["winlog"]["event_id"]
+            for event in self._read(generator_input, 2000)
+            if "winlog" in event
+        ]
+        assert event_ids.count(4624) > 5 * event_ids.count(4625)
+
+    def test_get_next_inserts_current_timestamp(self):
+        generator_input = self._create_input()
+        generator_input._clock = mock.MagicMock()
+        generator_input._clock.now.return_value = "2022-10-19T12:00:00"
+        event, raw_event = generator_input._get_event(self.timeout)
+        assert event["@timestamp"] == "2022-10-19T12:00:00"
+        assert b'"@timestamp":"2022-10-19T12:00:00"' in raw_event
+
+    def test_get_next_generates_same_documents_with_same_seed(self):
+        first_documents = self._read(self._create_input(), 50)
+        second_documents = self._read(self._create_input(), 50)
+        other_documents = self._read(self._create_input(seed=7), 50)
+        for document in first_documents + second_documents + other_documents:
+            del document["@timestamp"]
+        assert first_documents == second_documents
+        assert first_documents != other_documents
+
+    def test_get_next_returns_pool_documents_in_turn(self):
+        generator_input = self._create_input(pool_size=3)
+        documents = self._read(generator_input, 6)
+        assert documents[:3] == documents[3:]
+
+    def test_get_next_returns_new_dict_for_every_document(self):
+        generator_input = self._create_input(pool_size=1)
+        first_event, second_event = self._read(generator_input, 2)
+        first_event["added"] = "field"
+        assert "added" not in second_event
+
+    def test_get_next_raises_source_disconnected_error_after_count(self):
+        generator_input = self._create_input(count=3)
+        self._read(generator_input, 3)
+        with pytest.raises(SourceDisconnectedError):
+            generator_input.get_next(self.timeout)
+
+    @mock.patch("time.sleep")
+    def test_get_next_does_not_wait_without_rate(self, mock_sleep):
+        generator_input = self._create_input()
+        self._read(generator_input, 10)
+        mock_sleep.assert_not_called()
+
+    @mock.patch("time.sleep")
+    @mock.patch("time.time", return_value=100.0)
+    def test_get_next_waits_for_next_document_with_rate(self, _, mock_sleep):
+        generator_input = self._create_input(rate=200)
+        generator_input.get_next(self.timeout)
+        mock_sleep.assert_not_called()
+        event, _ = generator_input.get_next(self.timeout)
+        assert event is not None
+        mock_sleep.assert_called_with(pytest.approx(0.005))
+
+    @mock.patch("time.sleep")
+    @mock.patch("time.time", return_value=100.0)
+    def test_get_next_returns_none_if_next_document_is_not_due_within_timeout(self, _, mock_sleep):
+        generator_input = self._create_input(rate=10)
+        generator_input.get_next(self.timeout)
+        assert generator_input.get_next(self.timeout) == (None, None)
+        mock_sleep.assert_called_with(self.timeout)
+
+    @pytest.mark.parametrize(
+        "placeholder",
+        [
+            {"type": "unknown"},
+            {"network": "10.0.0.0/8"},
+            {"type": "ip", "network": "no network"},
+            {"type": "ip", "unknown": "option"},
+            {"type": "choice", "values": []},
+            {"type": "choice", "values": [1, 2], "weights": [1]},
+            {"type": "integer", "min": 5},
+            {"type": "integer", "min": 5, "max": 1},
+        ],
+    )
+    def test_invalid_placeholders_raise_invalid_configuration_error(self, placeholder):
+        config = deepcopy(self.CONFIG)
+        config["placeholders"] = {"invalid": placeholder}
+        with pytest.raises(InvalidConfigurationError):
+            Factory.create({"test generator input": config}, self.logger)
@@ -1,10 +1,12 @@
 # pylint: disable=missing-docstring
 # pylint: disable=attribute-defined-outside-init
 # pylint: disable=protected-access
+import gzip
+import json
 from unittest import mock
 
 import pytest
-from logprep.abc.input import CriticalInputError
+from logprep.abc.input import CriticalInputError, SourceDisconnectedError
 from tests.unit.connector.base import BaseInputTestCase
 
 
@@ -17,7 +19,7 @@ class TestJsonInput(BaseInputTestCase):
 
     CONFIG = {"type": "json_input", "documents_path": "/does/not/matter"}
 
-    parse_function = "logprep.connector.json.input.parse_json"
+    parse_function = "logprep.connector.json.input.iterate_json"
 
     @mock.patch(parse_function)
     def test_documents_returns(self, mock_parse):
@@ -27,14 +29,14 @@ class TestJsonInput(BaseInputTestCase):
 
     @mock.patch(parse_function)
     def test_get_next_returns_document(self, mock_parse):
-        mock_parse.return_value = [{"message": "test_message"}]
+        mock_parse.return_value = enumerate([{"message": "test_message"}])
         expected = {"message": "test_message"}
         document, _ = self.object.get_next(self.timeout)
         assert document == expected
 
     @mock.patch(parse_function)
     def test_get_next_returns_multiple_documents(self, mock_parse):
-        mock_parse.return_value = [{"order": 0}, {"order": 1}]
+        mock_parse.return_value = enumerate([{"order": 0}, {"order": 1}])
         event, _ = self.object.get_next(self.timeout)
         assert {"order": 0} == event
         event, _ = self.object.get_next(self.timeout)
@@ -42,14 +44,54 @@ class TestJsonInput(BaseInputTestCase):
 
     @mock.patch(parse_function)
     def test_raises_exception_if_not_a_dict(self, mock_parse):
-        mock_parse.return_value = ["no dict"]
+        mock_parse.return_value = enumerate(["no dict"])
         with pytest.raises(CriticalInputError, match=r"not a dict"):
             _, _ = self.object.get_next(self.timeout)
 
     @mock.patch(parse_function)
     def test_raises_exception_if_one_element_is_not_a_dict(self, mock_parse):
-        mock_parse.return_value = [{"order": 0}, "not a dict", {"order": 1}]
+        mock_parse.return_value = enumerate([{"order": 0}, "not a dict", {"order": 1}])
         with pytest.raises(CriticalInputError, match=r"not a dict"):
             _, _ = self.object.get_next(self.timeout)
             _, _ = self.object.get_next(self.timeout)
             _, _ = self.object.get_next(self.timeout)
+
+    def test_get_next_reads_documents_lazily_from_file(self, tmp_path):
+        documents_path = tmp_path / "documents.json"
+        documents_path.write_text('[{"order": 0}, {"order": 1}, broken', encoding="utf8")
+        self.object._config.documents_path = str(documents_path)
+        event, _ = self.object.get_next(self.timeout)
+        assert event == {"order": 0}
+        assert self.object.current_offset == len('[{"order": 0}')
+        event, _ = self.object.get_next(self.timeout)
+        assert event == {"order": 1}
+        with pytest.raises(json.JSONDecodeError):
+            _, _ = self.object.get_next(self.timeout)
+
+    def test_get_next_reads_single_document_from_file(self, tmp_path):
+        documents_path = tmp_path / "documents.json"
+        documents_path.write_text('{"order": 0}', encoding="utf8")
+        self.object._config.documents_path = str(documents_path)
+        event, _ = self.object.get_next(self.timeout)
+        assert event == {"order": 0}
+        with pytest.raises(SourceDisconnectedError):
+            _, _ = self.object.get_next(self.timeout)
+
+    def test_get_next_reads_gzip_compressed_file(self, tmp_path):
+        documents_path = tmp_path / "documents.json.gz"
+        with gzip.open(documents_path, "wt", encoding="utf8") as file:
+            json.dump([{"order": 0}, {"order": 1}], file)
+        self.object._config.documents_path = str(documents_path)
+        assert [self.object.get_next(self.timeout)[0] for _ in range(2)] == [
+            {"order": 0},
+            {"order": 1},
+        ]
+
+    def test_shut_down_closes_file(self, tmp_path):
+        documents_path = tmp_path / "documents.json"
+        documents_path.write_text('[{"order": 0}, {"order": 1}]', encoding="utf8")
+        self.object._config.documents_path = str(documents_path)
+        _, _ = self.object.get_next(self.timeout)
+        self.object.shut_down()
+        with pytest.raises(SourceDisconnectedError):
+            _, _ = self.object.get_next(self.timeout)
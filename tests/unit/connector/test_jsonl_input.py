@@ -1,10 +1,12 @@
 # pylint: disable=missing-docstring
 # pylint: disable=attribute-defined-outside-init
 # pylint: disable=protected-access
+import gzip
+import json
 from unittest import mock
 
 import pytest
-from logprep.abc.input import CriticalInputError
+from logprep.abc.input import CriticalInputError, SourceDisconnectedError
 from tests.unit.connector.base import BaseInputTestCase
 
 
@@ -13,7 +15,7 @@ class TestJsonlInput(BaseInputTestCase):
 
     CONFIG = {"type": "jsonl_input", "documents_path": "/does/not/matter"}
 
-    parse_function = "logprep.connector.jsonl.input.parse_jsonl"
+    parse_function = "logprep.connector.jsonl.input.iterate_jsonl"
 
     @mock.patch(parse_function)
     def test_documents_returns(self, mock_parse):
@@ -23,27 +25,64 @@ class TestJsonlInput(BaseInputTestCase):
 
     @mock.patch(parse_function)
     def test_get_next_returns_document(self, mock_parse):
-        mock_parse.return_value = [{"message": "test_message"}]
+        mock_parse.return_value = enumerate([{"message": "test_message"}])
         expected = {"message": "test_message"}
         document, _ = self.object.get_next(self.timeout)
         assert document == expected
 
     @mock.patch(parse_function)
     def test_get_next_returns_multiple_documents(self, mock_parse):
-        mock_parse.return_value = [{"order": 0}, {"order": 1}]
+        mock_parse.return_value = enumerate([{"order": 0}, {"order": 1}])
         assert ({"order": 0}, None) == self.object.get_next(self.timeout)
         assert ({"order": 1}, None) == self.object.get_next(self.timeout)
 
     @mock.patch(parse_function)
     def test_raises_exception_if_not_a_dict(self, mock_parse):
-        mock_parse.return_value = ["no dict"]
+        mock_parse.return_value = enumerate(["no dict"])
         with pytest.raises(CriticalInputError, match=r"not a dict"):
             _ = self.object.get_next(self.timeout)
 
     @mock.patch(parse_function)
     def test_raises_exception_if_one_element_is_not_a_dict(self, mock_parse):
-        mock_parse.return_value = [{"order": 0}, "not a dict", {"order": 1}]
+        mock_parse.return_value = enumerate([{"order": 0}, "not a dict", {"order": 1}])
         with pytest.raises(CriticalInputError, match=r"not a dict"):
             _ = self.object.get_next(self.timeout)
             _ = self.object.get_next(self.timeout)
             _ = self.object.get_next(self.timeout)
+
+    def test_get_next_reads_documents_lazily_from_file(self, tmp_path):
+        documents_path = tmp_path / "documents.jsonl"
+        documents_path.write_text('{"order": 0}\n\n{"order": 1}\nbroken\n', encoding="utf8")
+        self.object._config.documents_path = str(documents_path)
+        assert self.object.get_next(self.timeout)[0] == {"order": 0}
+        assert self.object.current_offset == 13
+        assert self.object.get_next(self.timeout)[0] == {"order": 1}
+        assert self.object.current_offset == 27
+        with pytest.raises(json.JSONDecodeError):
+            _ = self.object.get_next(self.timeout)
+
+    def test_get_next_raises_source_disconnected_error_at_end_of_file(self, tmp_path):
+        documents_path = tmp_path / "documents.jsonl"
+        documents_path.write_text('{"order": 0}\n', encoding="utf8")
+        self.object._config.documents_path = str(documents_path)
+        _ = self.object.get_next(self.timeout)
+        with pytest.raises(SourceDisconnectedError):
+            _ = self.object.get_next(self.timeout)
+
+    def test_get_next_reads_gzip_compressed_file(self, tmp_path):
+        documents_path = tmp_path / "documents.jsonl.gz"
+        with gzip.open(documents_path, "wt", encoding="utf8") as file:
+            file.write('{"order": 0}\n{"order": 1}\n')
+        self.object._config.documents_path = str(documents_path)
+        assert self.object.get_next(self.timeout)[0] == {"order": 0}
+        assert self.object.get_next(self.timeout)[0] == {"order": 1}
+        assert self.object.current_offset == 26
+
+    def test_get_next_reads_zstd_compressed_file(self, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        documents_path = tmp_path / "documents.jsonl.zst"
+        with zstandard.open(documents_path, "wt", encoding="utf8") as file:
+            file.write('{"order": 0}\n{"order": 1}\n')
+        self.object._config.documents_path = str(documents_path)
+        assert self.object.get_next(self.timeout)[0] == {"order": 0}
+        assert self.object.get_next(self.timeout)[0] == {"order": 1}
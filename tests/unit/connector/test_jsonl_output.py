@@ -1,8 +1,15 @@
 # pylint: disable=missing-docstring
 # pylint: disable=attribute-defined-outside-init
 # pylint: disable=protected-access
+import gzip
+import json
 from unittest import mock
-from logprep.connector.jsonl.output import JsonlOutput
+
+import pytest
+
+from logprep.abc.output import FatalOutputError
+from logprep.connector.jsonl import output
+from logprep.factory import Factory
 from tests.unit.connector.base import BaseOutputTestCase
 
 
@@ -85,8 +92,17 @@ class TestJsonlOutputOutput(BaseOutputTestCase):
 
     @mock.patch("builtins.open")
     def test_write_json_writes_to_file(self, mock_open):
-        JsonlOutput._write_json("the/file/path", self.document)
-        mock_open.assert_called_with("the/file/path", "a+", encoding="utf8")
+        self.object._write_json("the/file/path", self.document)
+        mock_open.assert_called_with("the/file/path", "ab", buffering=8192)
+        mock_open.return_value.write.assert_called_with(b'{"message": "test message"}\n')
+
+    @mock.patch("builtins.open")
+    def test_write_json_keeps_file_open(self, mock_open):
+        self.object._write_json("the/file/path", self.document)
+        self.object._write_json("the/file/path", self.document)
+        assert mock_open.call_count == 1
+        assert mock_open.return_value.write.call_count == 2
+        mock_open.return_value.close.assert_not_called()
 
     @mock.patch("builtins.open")
     def test_setup_creates_single_file_if_only_output_file(self, mock_open):
@@ -114,3 +130,96 @@ class TestJsonlOutputOutput(BaseOutputTestCase):
     ):  # pylint: disable=arguments-differ
         self.object.input_connector = mock.MagicMock()
         self.object.store({"message": "my event message"})
+
+    def _create_output(self, tmp_path, **config):
+        config = {"type": "jsonl_output", "output_file": str(tmp_path / "output.jsonl"), **config}
+        jsonl_output = Factory.create({"test_jsonl_output": config}, self.logger)
+        jsonl_output.setup()
+        return jsonl_output
+
+    def test_shut_down_flushes_and_closes_files(self, tmp_path):
+        jsonl_output = self._create_output(tmp_path, flush_interval=60)
+        jsonl_output.store(self.document)
+        assert (tmp_path / "output.jsonl").read_text(encoding="utf8") == ""
+        jsonl_output.shut_down()
+        assert (tmp_path / "output.jsonl").read_text(encoding="utf8") == (
+            '{"message": "test message"}\n'
+        )
+        assert not jsonl_output._files
+
+    def test_write_flushes_after_flush_interval(self, tmp_path):
+        jsonl_output = self._create_output(tmp_path, flush_interval=0)
+        jsonl_output.store(self.document)
+        assert (tmp_path / "output.jsonl").read_text(encoding="utf8") == (
+            '{"message": "test message"}\n'
+        )
+        jsonl_output.shut_down()
+
+    def test_store_appends_to_existing_file(self, tmp_path):
+        (tmp_path / "output.jsonl").write_text('{"existing": "line"}\n', encoding="utf8")
+        jsonl_output = self._create_output(tmp_path)
+        jsonl_output.store(self.document)
+        jsonl_output.shut_down()
+        assert (tmp_path / "output.jsonl").read_text(encoding="utf8").splitlines() == [
+            '{"existing": "line"}',
+            '{"message": "test message"}',
+        ]
+
+    def test_store_writes_gzip_compressed_file(self, tmp_path):
+        jsonl_output = self._create_output(tmp_path, compression="gzip")
+        for order in range(3):
+            jsonl_output.store({"order": order})
+        jsonl_output.shut_down()
+        with gzip.open(tmp_path / "output.jsonl", "rt", encoding="utf8") as file:
+            assert [json.loads(line) for line in file] == [{"order": order} for order in range(3)]
+
+    def test_setup_raises_fatal_output_error_for_zstd_without_zstandard(self, tmp_path):
+        with mock.patch.object(output, "zstandard", None):
+            with pytest.raises(FatalOutputError, match=r"zstandard"):
+                self._create_output(tmp_path, compression="zstd")
+
+    def test_rotates_file_by_size(self, tmp_path):
+        jsonl_output = self._create_output(tmp_path, rotate_bytes=20)
+        for order in range(3):
+            jsonl_output.store({"order": order})
+        jsonl_output.shut_down()
+        rotated_files = sorted(tmp_path.glob("output.jsonl.*"))
+        assert len(rotated_files) == 1
+        assert rotated_files[0].read_text(encoding="utf8").splitlines() == [
+            '{"order": 0}',
+            '{"order": 1}',
+        ]
+        assert (tmp_path / "output.jsonl").read_text(encoding="utf8") == '{"order": 2}\n'
+
+    def test_rotates_file_by_time(self, tmp_path):
+        with mock.patch("time.time", return_value=0.0):
+            jsonl_output = self._create_output(tmp_path, rotate_interval=10)
+            jsonl_output.store({"order": 0})
+        with mock.patch("time.time", return_value=11.0):
+            jsonl_output.store({"order": 1})
+        jsonl_output.shut_down()
+        rotated_files = list(tmp_path.glob("output.jsonl.*"))
+        assert len(rotated_files) == 1
+        assert rotated_files[0].read_text(encoding="utf8") == '{"order": 0}\n'
+        assert (tmp_path / "output.jsonl").read_text(encoding="utf8") == '{"order": 1}\n'
+
+    def test_store_does_not_keep_events_if_disabled(self, tmp_path):
+        jsonl_output = self._create_output(
+            tmp_path, output_file_error=str(tmp_path / "error.jsonl"), store_events_in_memory=False
+        )
+        jsonl_output.store(self.document)
+        jsonl_output.store_custom(self.document, target="whatever")
+        jsonl_output.store_failed("my error message", self.document, self.document)
+        jsonl_output.shut_down()
+        assert not jsonl_output.events
+        assert not jsonl_output.failed_events
+        assert (tmp_path / "error.jsonl").read_text(encoding="utf8")
+
+    def test_flush_writes_buffered_lines(self, tmp_path):
+        jsonl_output = self._create_output(tmp_path, flush_interval=60)
+        jsonl_output.store(self.document)
+        jsonl_output.flush()
+        assert (tmp_path / "output.jsonl").read_text(encoding="utf8") == (
+            '{"message": "test message"}\n'
+        )
+        jsonl_output.shut_down()
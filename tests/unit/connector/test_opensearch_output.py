@@ -27,7 +27,7 @@ class NotJsonSerializableMock:
 
 
 def mock_bulk(
-    _, documents: list, max_retries: int = 0, chunk_size: int = 500
+    _, documents: list, max_retries: int = 0, chunk_size: int = 500, max_chunk_bytes: int = 0
 ):  # pylint: disable=unused-argument
     for document in documents:
         try:
@@ -248,3 +248,45 @@ class TestOpenSearchOutput(BaseOutputTestCase):
     def test_handle_serialization_error_raises_fatal_output_error(self):
         with pytest.raises(FatalOutputError):
             self.object._handle_serialization_error(mock.MagicMock())
+
+    @mock.patch("logprep.connector.opensearch.output.opensearch.helpers.bulk")
+    def test_write_to_search_context_sends_chunks_in_parallel(self, fake_bulk):
+        os_config = deepcopy(self.CONFIG)
+        os_config.update({"message_backlog_size": 4, "thread_count": 2})
+        os_output = Factory.create({"opensearch": os_config}, self.logger)
+        for index in range(4):
+            os_output._write_to_search_context({"_index": "foo", "count": index})
+        assert fake_bulk.call_count == 2
+        sent_documents = [call[0][1] for call in fake_bulk.call_args_list]
+        assert sorted(document["count"] for chunk in sent_documents for document in chunk) == [
+            0,
+            1,
+            2,
+            3,
+        ]
+        for worker_metrics in os_output.metrics.bulk_workers:
+            assert worker_metrics.number_of_bulk_requests == 1
+        os_output.shut_down()
+
+    @mock.patch(
+        "logprep.connector.opensearch.output.opensearch.helpers.bulk",
+        side_effect=opensearchpy.ConnectionError("N/A", "connection refused", None),
+    )
+    def test_parallel_bulk_raises_fatal_output_error_after_all_workers_finished(self, fake_bulk):
+        os_config = deepcopy(self.CONFIG)
+        os_config.update({"message_backlog_size": 4, "thread_count": 4})
+        os_output = Factory.create({"opensearch": os_config}, self.logger)
+        for _ in range(3):
+            os_output._write_to_search_context({"_index": "foo"})
+        with pytest.raises(FatalOutputError):
+            os_output._write_to_search_context({"_index": "foo"})
+        assert fake_bulk.call_count == 4
+        os_output.shut_down()
+
+    @mock.patch("logprep.connector.opensearch.output.opensearch.OpenSearch")
+    def test_search_context_uses_configured_connection_pool_size(self, fake_opensearch):
+        os_config = deepcopy(self.CONFIG)
+        os_config.update({"connection_pool_size": 8})
+        os_output = Factory.create({"opensearch": os_config}, self.logger)
+        _ = os_output._search_context
+        assert fake_opensearch.call_args[1]["maxsize"] == 8
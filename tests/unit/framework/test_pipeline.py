@@ -1,6 +1,7 @@
 # pylint: disable=missing-docstring
 # pylint: disable=protected-access
 # pylint: disable=attribute-defined-outside-init
+import json
 import re
 from copy import deepcopy
 from logging import DEBUG, WARNING, getLogger
@@ -154,7 +155,7 @@ class TestPipeline(ConfigurationForTests):
         assert len(self.pipeline._output.events) == 2
 
     def test_empty_documents_are_not_stored_in_the_output(self, _):
-        self.pipeline._process_event = lambda x: x.clear()
+        self.pipeline._process_event = lambda event, _: event.clear()
         self.pipeline._setup()
         self.pipeline._input.get_next.return_value = ({"message": "test"}, None)
         self.pipeline._output.store = mock.MagicMock()
@@ -315,6 +316,7 @@ class TestPipeline(ConfigurationForTests):
     ):
         self.pipeline._setup()
         self.pipeline._input.get_next.return_value = ({"message": "test"}, None)
+        self.pipeline._input.current_raw_event = None
         self.pipeline._pipeline[1].process.side_effect = Exception
         self.pipeline._retrieve_and_process_data()
         self.pipeline._input.get_next.return_value = ({"message": "test"}, None)
@@ -540,6 +542,193 @@ class TestPipeline(ConfigurationForTests):
             "This is non critical", {"some": "event"}, None
         )
 
+    def test_process_event_stores_raw_event_as_received_document_on_critical_error(self, _):
+        self.pipeline._setup()
+        self.pipeline._pipeline[1].process.side_effect = Exception
+        self.pipeline._input.get_next.return_value = ({"message": "test", "added": "field"}, None)
+        self.pipeline._input.current_raw_event = b'{"message": "test"}'
+        self.pipeline._retrieve_and_process_data()
+        assert self.pipeline._output.store_failed.call_args[0][1] == {"message": "test"}
+
+    @mock.patch("logprep.framework.pipeline.json.dumps")
+    def test_process_event_does_not_serialize_event_with_raw_event(self, mock_dumps, _):
+        self.pipeline._setup()
+        self.pipeline._input.get_next.return_value = ({"message": "test"}, None)
+        self.pipeline._input.current_raw_event = b'{"message": "test"}'
+        self.pipeline._retrieve_and_process_data()
+        mock_dumps.assert_not_called()
+
+    def test_retrieve_and_process_data_does_not_check_fill_level_by_default(self, _):
+        self.pipeline._setup()
+        fill_level = mock.PropertyMock(return_value=1.0)
+        type(self.pipeline._output).fill_level = fill_level
+        self.pipeline._input.get_next.return_value = ({"some": "event"}, None)
+        self.pipeline._retrieve_and_process_data()
+        fill_level.assert_not_called()
+        self.pipeline._input.get_next.assert_called()
+
+    @mock.patch("logprep.framework.pipeline.sleep")
+    def test_retrieve_and_process_data_reads_input_below_high_water_mark(self, mock_sleep, _):
+        self.pipeline._output_high_water_mark = 0.8
+        self.pipeline._setup()
+        type(self.pipeline._output).fill_level = mock.PropertyMock(return_value=0.7)
+        self.pipeline._input.get_next.return_value = ({"some": "event"}, None)
+        self.pipeline._retrieve_and_process_data()
+        mock_sleep.assert_not_called()
+        self.pipeline._input.get_next.assert_called()
+        assert self.pipeline.metrics.throttled_time == 0
+
+    @mock.patch("logprep.framework.pipeline.time", side_effect=[10.0, 12.5])
+    @mock.patch("logprep.framework.pipeline.sleep")
+    def test_waits_for_low_water_mark_if_output_is_saturated(self, mock_sleep, _, __):
+        self.pipeline._output_high_water_mark = 0.8
+        self.pipeline._output_low_water_mark = 0.5
+        self.pipeline._setup()
+        self.pipeline._enable_iteration()
+        type(self.pipeline._output).fill_level = mock.PropertyMock(side_effect=[0.9, 0.7, 0.6, 0.5])
+        self.pipeline._wait_for_saturated_output()
+        assert mock_sleep.call_count == 2
+        mock_sleep.assert_called_with(self.logprep_config["timeout"])
+        assert self.pipeline.metrics.throttled_time == 2.5
+
+    @mock.patch("logprep.framework.pipeline.sleep")
+    def test_waiting_for_saturated_output_ends_if_pipeline_is_stopped(self, mock_sleep, _):
+        self.pipeline._output_high_water_mark = 0.8
+        self.pipeline._setup()
+        self.pipeline._enable_iteration()
+        type(self.pipeline._output).fill_level = mock.PropertyMock(return_value=1.0)
+        mock_sleep.side_effect = lambda _: self.pipeline.stop()
+        self.pipeline._wait_for_saturated_output()
+        mock_sleep.assert_called_once()
+
+    def test_low_water_mark_is_half_of_high_water_mark_by_default(self, _):
+        config = deepcopy(self.logprep_config)
+        config["output_high_water_mark"] = 0.9
+        pipeline = Pipeline(
+            pipeline_index=1,
+            config=config,
+            counter=self.counter,
+            log_handler=self.log_handler,
+            lock=self.lock,
+            shared_dict=self.shared_dict,
+            metric_targets=self.metric_targets,
+        )
+        assert pipeline._output_low_water_mark == 0.45
+
+
+@mock.patch("logprep.connector.confluent_kafka.input.Consumer")
+class TestPipelineWithPartitionWorkers(ConfigurationForTests):
+    def setup_method(self):
+        config = deepcopy(self.logprep_config)
+        config.update(
+            {
+                "partition_workers": 2,
+                "pipeline": [],
+                "input": {
+                    "kafka": {
+                        "type": "confluentkafka_input",
+                        "bootstrapservers": ["testserver:9092"],
+                        "topic": "test_input_raw",
+                        "group": "test_consumergroup",
+                    }
+                },
+            }
+        )
+        self.pipeline = Pipeline(
+            pipeline_index=1,
+            config=config,
+            counter=self.counter,
+            log_handler=self.log_handler,
+            lock=self.lock,
+            shared_dict=self.shared_dict,
+            metric_targets=self.metric_targets,
+        )
+
+    @staticmethod
+    def _record(partition, offset):
+        record = mock.MagicMock()
+        record.error.return_value = None
+        record.partition.return_value = partition
+        record.offset.return_value = offset
+        record.value.return_value = json.dumps({"partition": partition, "offset": offset}).encode()
+        return record
+
+    def test_setup_starts_and_shut_down_stops_partition_workers(self, _):
+        self.pipeline._setup()
+        workers = list(self.pipeline._partition_workers)
+        assert len(workers) == 2
+        assert all(worker.is_alive() for worker in workers)
+        assert self.pipeline._input.acknowledge_records
+        self.pipeline._shut_down()
+        assert not any(worker.is_alive() for worker in workers)
+        assert not self.pipeline._partition_queues
+
+    def test_setup_does_not_start_partition_workers_by_default(self, _):
+        del self.pipeline._logprep_config["partition_workers"]
+        self.pipeline._setup()
+        assert not self.pipeline._partition_workers
+        assert not self.pipeline._input.acknowledge_records
+
+    def test_events_of_a_partition_are_stored_in_order(self, mock_consumer):
+        records = [
+            self._record(partition, offset) for offset in range(20) for partition in range(3)
+        ]
+        mock_consumer.return_value.poll.side_effect = records
+        self.pipeline._setup()
+        for _ in records:
+            self.pipeline._retrieve_and_process_data()
+        self.pipeline._stop_partition_workers()
+        events = self.pipeline._output.events
+        assert len(events) == len(records)
+        for partition in range(3):
+            offsets = [event["offset"] for event in events if event["partition"] == partition]
+            assert offsets == list(range(20))
+
+    def test_offsets_are_stored_for_processed_records(self, mock_consumer):
+        records = [self._record(partition, offset) for offset in range(5) for partition in range(3)]
+        mock_consumer.return_value.poll.side_effect = records
+        self.pipeline._setup()
+        for _ in records:
+            self.pipeline._retrieve_and_process_data()
+        self.pipeline._stop_partition_workers()
+        assert self.pipeline._input._last_valid_records == {
+            partition: records[-3 + partition] for partition in range(3)
+        }
+        mock_consumer.return_value.store_offsets.assert_called()
+
+    def test_setup_sets_flush_callback_of_input(self, _):
+        self.pipeline._setup()
+        assert self.pipeline._input.flush_callback == self.pipeline._flush_output
+        self.pipeline._shut_down()
+
+    def test_setup_sets_prefilter_callback_of_input(self, _):
+        self.pipeline._setup()
+        assert self.pipeline._input.prefilter_callback == self.pipeline._store_extra_data
+        self.pipeline._shut_down()
+
+    def test_flush_output_waits_for_partition_workers(self, mock_consumer):
+        records = [self._record(partition, offset) for offset in range(5) for partition in range(3)]
+        mock_consumer.return_value.poll.side_effect = records
+        self.pipeline._setup()
+        self.pipeline._output.flush = mock.MagicMock()
+        for _ in records:
+            self.pipeline._retrieve_and_process_data()
+        self.pipeline._flush_output()
+        assert len(self.pipeline._output.events) == len(records)
+        self.pipeline._output.flush.assert_called()
+        self.pipeline._shut_down()
+
+    def test_fatal_output_error_of_worker_is_raised_by_pipeline(self, mock_consumer):
+        mock_consumer.return_value.poll.side_effect = [self._record(0, 0), self._record(0, 1)]
+        self.pipeline._setup()
+        self.pipeline._output.store = mock.MagicMock(side_effect=FatalOutputError("failed"))
+        self.pipeline._retrieve_and_process_data()
+        self.pipeline._partition_queues[0].put(None)
+        self.pipeline._partition_workers[0].join()
+        with raises(FatalOutputError, match=r"failed"):
+            self.pipeline._retrieve_and_process_data()
+        self.pipeline._shut_down()
+
 
 class TestMultiprocessingPipeline(ConfigurationForTests):
     def setup_class(self):
@@ -5,7 +5,12 @@ from typing import List
 import numpy as np
 from attr import define
 
-from logprep.metrics.metric import Metric, calculate_new_average, get_settable_metrics
+from logprep.metrics.metric import (
+    HistogramMetric,
+    Metric,
+    calculate_new_average,
+    get_settable_metrics,
+)
 
 
 @define(kw_only=True)
@@ -118,3 +123,27 @@ class TestMetric:
             "calculated_metric": 0,
         }
         assert metrics == expected_metrics
+
+
+class TestHistogramMetric:
+    def test_expose_returns_cumulative_buckets_count_and_sum(self):
+        histogram = HistogramMetric(
+            labels={"type": "test"}, prefix="logprep_latency_", buckets=(0.1, 1.0)
+        )
+        for sample in [0.05, 0.5, 0.7, 2.0]:
+            histogram.observe(sample)
+        assert histogram.expose() == {
+            "logprep_latency_count;type:test": 4.0,
+            "logprep_latency_sum;type:test": 3.25,
+            "logprep_latency_bucket;type:test,le:0.1": 1.0,
+            "logprep_latency_bucket;type:test,le:1.0": 3.0,
+            "logprep_latency_bucket;type:test,le:+Inf": 4.0,
+        }
+
+    def test_reset_statistics_clears_buckets(self):
+        histogram = HistogramMetric(labels={"type": "test"}, buckets=(0.1,))
+        histogram.observe(0.05)
+        histogram.reset_statistics()
+        assert histogram.count == 0
+        assert histogram.sum == 0.0
+        assert histogram.expose()["logprep_bucket;type:test,le:+Inf"] == 0.0
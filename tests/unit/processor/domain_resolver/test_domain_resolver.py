@@ -1,5 +1,8 @@
 # pylint: disable=missing-docstring
 # pylint: disable=protected-access
+import socket
+import threading
+import time
 from copy import deepcopy
 from os.path import exists
 from pathlib import Path
@@ -10,6 +13,7 @@ from requests import Response
 
 from logprep.processor.base.exceptions import ProcessingWarning
 from logprep.factory import Factory
+from logprep.util.cache import ResolutionCache
 from tests.unit.processor.base import BaseProcessorTestCase
 
 REL_TLD_LIST_PATH = "tests/testdata/external/public_suffix_list.dat"
@@ -243,3 +247,155 @@ sth.ac.at
         # Rules have same effect, but are equal and thus one is ignored
         self.object.process(document)
         assert document == expected
+
+    @mock.patch("socket.gethostbyname", return_value="1.2.3.4")
+    def test_cache_snapshot_is_loaded_after_restart(self, mock_gethostbyname, tmp_path):
+        config = deepcopy(self.CONFIG)
+        config["cache_snapshot_path"] = str(tmp_path / "domains.snapshot")
+        domain_resolver = Factory.create({"resolver": deepcopy(config)}, self.logger)
+        domain_resolver.setup()
+        domain_resolver.process({"client_2": "google.de"})
+        domain_resolver.shut_down()
+        domain_resolver = Factory.create({"resolver": deepcopy(config)}, self.logger)
+        domain_resolver.setup()
+        document = {"client_2": "google.de"}
+        domain_resolver.process(document)
+        assert document == {"client_2": "google.de", "resolved_ip": "1.2.3.4"}
+        mock_gethostbyname.assert_called_once()
+        assert domain_resolver.metrics.resolved_cached == 1
+
+    @mock.patch("socket.gethostbyname", return_value="1.2.3.4")
+    def test_cache_snapshot_is_saved_periodically(self, _, tmp_path):
+        config = deepcopy(self.CONFIG)
+        config["cache_snapshot_path"] = str(tmp_path / "domains.snapshot")
+        config["cache_snapshot_interval"] = 60
+        domain_resolver = Factory.create({"resolver": config}, self.logger)
+        domain_resolver.setup()
+        domain_resolver.process({"client_2": "google.de"})
+        assert not exists(tmp_path / "domains.snapshot")
+        domain_resolver._cache_saved_at -= 60
+        domain_resolver.process({"client_2": "google.de"})
+        assert exists(tmp_path / "domains.snapshot")
+
+    @mock.patch("socket.gethostbyname", return_value="1.2.3.4")
+    def test_cache_metrics_are_exposed(self, _):
+        self.object.process({"client_2": "google.de"})
+        self.object.process({"client_2": "google.de"})
+        exposed_metrics = self.object.metrics.expose()
+        assert [value for key, value in exposed_metrics.items() if "cache_hits" in key] == [1.0]
+        assert [value for key, value in exposed_metrics.items() if "cache_misses" in key] == [1.0]
+
+    def test_prefetch_resolves_domains_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def resolve_when_all_lookups_started(domain):
+            barrier.wait()
+            return f"10.0.0.{domain[7]}"
+
+        events = [{"client_2": f"domain-{index}.de"} for index in range(3)]
+        with mock.patch(
+            "socket.gethostbyname", side_effect=resolve_when_all_lookups_started
+        ) as mock_gethostbyname:
+            self.object.prefetch(events)
+            for event in events:
+                self.object.process(event)
+        assert [event["resolved_ip"] for event in events] == [
+            f"10.0.0.{index}" for index in range(3)
+        ]
+        assert mock_gethostbyname.call_count == 3
+
+    @mock.patch("socket.gethostbyname", return_value="1.2.3.4")
+    def test_prefetch_does_not_resolve_cached_domains(self, mock_gethostbyname):
+        self.object.process({"client_2": "google.de"})
+        self.object.prefetch([{"client_2": "google.de"}, {"client_2": "google.de"}])
+        mock_gethostbyname.assert_called_once()
+        assert not self.object._pending_lookups
+
+    def test_slow_lookup_does_not_block_other_lookups(self):
+        release = threading.Event()
+
+        def resolve(domain):
+            if domain == "slow.de":
+                release.wait(5)
+            return "1.2.3.4"
+
+        with mock.patch("socket.gethostbyname", side_effect=resolve):
+            slow_document = {"client_2": "slow.de"}
+            self.object.process(slow_document)
+            document = {"client_2": "google.de"}
+            self.object.process(document)
+            release.set()
+        assert "resolved_ip" not in slow_document
+        assert document["resolved_ip"] == "1.2.3.4"
+        assert self.object.metrics.timeouts == 1
+
+    @mock.patch("socket.gethostbyname", side_effect=socket.gaierror("unknown"))
+    def test_failed_resolution_is_cached_for_negative_caching_seconds(self, mock_gethostbyname):
+        config = deepcopy(self.CONFIG)
+        config["negative_caching_seconds"] = 0.05
+        domain_resolver = Factory.create({"resolver": config}, self.logger)
+        for _ in range(2):
+            document = {"client_2": "unknown.de"}
+            domain_resolver.process(document)
+            assert document == {"client_2": "unknown.de"}
+        mock_gethostbyname.assert_called_once()
+        time.sleep(0.06)  # nosemgrep
+        domain_resolver.process({"client_2": "unknown.de"})
+        assert mock_gethostbyname.call_count == 2
+
+    def test_lookup_that_exceeds_timeout_replaces_negative_cache_entry(self):
+        release = threading.Event()
+
+        def resolve(_):
+            release.wait(5)
+            return "1.2.3.4"
+
+        with mock.patch("socket.gethostbyname", side_effect=resolve) as mock_gethostbyname:
+            document = {"client_2": "slow.de"}
+            self.object.process(document)
+            assert "resolved_ip" not in document
+            release.set()
+            while self.object._pending_lookups:
+                time.sleep(0.001)  # nosemgrep
+            document = {"client_2": "slow.de"}
+            self.object.process(document)
+        assert document["resolved_ip"] == "1.2.3.4"
+        mock_gethostbyname.assert_called_once()
+
+    def test_expired_address_is_used_while_domain_is_resolved_again(self):
+        config = deepcopy(self.CONFIG)
+        config["stale_caching_seconds"] = 60
+        domain_resolver = Factory.create({"resolver": config}, self.logger)
+        domain_resolver._cache._max_milliseconds = 0
+        with mock.patch("socket.gethostbyname", side_effect=["1.1.1.1", "2.2.2.2"]):
+            document = {"client_2": "google.de"}
+            domain_resolver.process(document)
+            assert document["resolved_ip"] == "1.1.1.1"
+            time.sleep(0.002)  # nosemgrep
+            document = {"client_2": "google.de"}
+            domain_resolver.process(document)
+            assert document["resolved_ip"] == "1.1.1.1"
+            while domain_resolver._pending_lookups:
+                time.sleep(0.001)  # nosemgrep
+        assert domain_resolver._cache.lookup(
+            domain_resolver._hasher.hash_str("google.de", salt=config["hash_salt"])
+        ) == (ResolutionCache.STALE, "2.2.2.2")
+
+    @mock.patch("socket.gethostbyname", return_value="1.2.3.4")
+    def test_lookup_latency_is_observed(self, _):
+        self.object.process({"client_2": "google.de"})
+        self.object.process({"client_2": "google.com"})
+        exposed_metrics = self.object.metrics.expose()
+        counts = [value for key, value in exposed_metrics.items() if "lookup_seconds_count" in key]
+        assert counts == [2.0]
+        assert any("lookup_seconds_bucket" in key and "le:+Inf" in key for key in exposed_metrics)
+
+    @mock.patch("logging.Logger.warning")
+    def test_invalid_cache_snapshot_is_logged_and_ignored(self, mock_warning, tmp_path):
+        (tmp_path / "domains.snapshot").write_bytes(b"no snapshot")
+        config = deepcopy(self.CONFIG)
+        config["cache_snapshot_path"] = str(tmp_path / "domains.snapshot")
+        domain_resolver = Factory.create({"resolver": config}, self.logger)
+        domain_resolver.setup()
+        assert not domain_resolver._cache
+        assert "Could not load cache snapshot" in mock_warning.call_args[0][0]
@@ -1,3 +1,4 @@
+import base64
 import re
 from unittest import mock
 
@@ -5,6 +6,9 @@ import pytest
 
 pytest.importorskip("logprep.processor.pseudonymizer")
 
+from Crypto.Cipher import AES, PKCS1_OAEP
+from Crypto.PublicKey import RSA
+
 from logprep.processor.pseudonymizer.encrypter import DualPKCS1HybridEncrypter
 
 MOCK_PUBKEY_1024 = (
@@ -74,3 +78,64 @@ class TestDualPKCS1HybridEncrypter:
         output = encrypter.encrypt("foo")
         assert len(output) == (256 + 8 + len("foo")) * 4 / 3
         assert re.match(BASE64_REGEX, str(output))
+
+
+class TestDualPKCS1HybridEncrypterWithSessionKeyReuse:
+    def setup_class(self):
+        self.key_analyst = RSA.generate(1024)
+        self.key_depseudo = RSA.generate(2048)
+
+    def _get_encrypter(self, tmp_path, **kwargs):
+        (tmp_path / "analyst.pem").write_bytes(self.key_analyst.public_key().export_key())
+        (tmp_path / "depseudo.pem").write_bytes(self.key_depseudo.public_key().export_key())
+        encrypter = DualPKCS1HybridEncrypter(**kwargs)
+        encrypter.load_public_keys(str(tmp_path / "analyst.pem"), str(tmp_path / "depseudo.pem"))
+        return encrypter
+
+    def _decrypt(self, encrypted: str):
+        encrypted_bytes = base64.b64decode(encrypted)
+        enc_session_key, nonce, ciphertext = (
+            encrypted_bytes[:256],
+            encrypted_bytes[256:264],
+            encrypted_bytes[264:],
+        )
+        enc_session_key = PKCS1_OAEP.new(self.key_depseudo).decrypt(enc_session_key)
+        session_key = PKCS1_OAEP.new(self.key_analyst).decrypt(enc_session_key)
+        plaintext = AES.new(session_key, AES.MODE_CTR, nonce=nonce).decrypt(ciphertext)
+        return plaintext.decode("utf-8"), enc_session_key, nonce
+
+    def test_encrypted_values_can_be_decrypted(self, tmp_path):
+        encrypter = self._get_encrypter(tmp_path, max_session_key_values=3)
+        values = [f"value {index}" for index in range(7)]
+        assert [self._decrypt(encrypter.encrypt(value))[0] for value in values] == values
+
+    def test_session_key_is_reused_for_max_values_with_new_nonces(self, tmp_path):
+        encrypter = self._get_encrypter(tmp_path, max_session_key_values=3)
+        with mock.patch.object(
+            encrypter, "_new_session_key", wraps=encrypter._new_session_key
+        ) as mock_new_session_key:
+            encrypted = [encrypter.encrypt("foo") for _ in range(6)]
+        assert mock_new_session_key.call_count == 2
+        session_keys = {base64.b64decode(value)[:256] for value in encrypted}
+        assert len(session_keys) == 2
+        nonces = [base64.b64decode(value)[256:264] for value in encrypted]
+        assert len(set(nonces[:3])) == 3
+        assert len(set(nonces[3:])) == 3
+
+    def test_session_key_is_not_reused_by_default(self, tmp_path):
+        encrypter = self._get_encrypter(tmp_path)
+        encrypted = [encrypter.encrypt("foo") for _ in range(3)]
+        assert len({base64.b64decode(value)[:256] for value in encrypted}) == 3
+
+    @mock.patch("logprep.processor.pseudonymizer.encrypter.time.time")
+    def test_session_key_is_renewed_after_max_age(self, mock_time, tmp_path):
+        encrypter = self._get_encrypter(
+            tmp_path, max_session_key_values=100, max_session_key_age=10
+        )
+        mock_time.return_value = 100.0
+        first, second = encrypter.encrypt("foo"), encrypter.encrypt("foo")
+        mock_time.return_value = 110.0
+        third = encrypter.encrypt("foo")
+        assert base64.b64decode(first)[:256] == base64.b64decode(second)[:256]
+        assert base64.b64decode(second)[:256] != base64.b64decode(third)[:256]
+        assert self._decrypt(third)[0] == "foo"
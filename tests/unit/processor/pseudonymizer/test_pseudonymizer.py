@@ -1,14 +1,17 @@
 # pylint: disable=missing-docstring
 # pylint: disable=protected-access
 import datetime
+import re
 import time
 from copy import deepcopy
 from pathlib import Path
+from unittest import mock
 
 import pytest
 from logprep.processor.base.exceptions import InvalidRuleDefinitionError
 from logprep.factory import Factory
 from logprep.processor.pseudonymizer.rule import PseudonymizerRule
+from logprep.util.cache import SharedMemoryCache
 from tests.unit.processor.base import BaseProcessorTestCase
 
 CAP_GROUP_REGEX_MAPPING = "tests/testdata/unit/pseudonymizer/pseudonymizer_regex_mapping.yml"
@@ -623,6 +626,93 @@ class TestPseudonymizer(BaseProcessorTestCase):
 
         assert event["pseudo_this"] == pseudonymized
 
+    def test_encrypter_reuses_session_key_for_configured_values(self):
+        config = deepcopy(self.CONFIG)
+        config.update({"max_session_key_values": 2, "max_session_key_age": 30})
+        pseudonymizer = Factory.create({"pseudonymizer": config}, self.logger)
+        assert pseudonymizer._encrypter._max_session_key_values == 2
+        assert pseudonymizer._encrypter._max_session_key_age == 30.0
+        first, second, third = (pseudonymizer._encrypter.encrypt("foo") for _ in range(3))
+        assert first[:340] == second[:340]
+        assert second[:340] != third[:340]
+
+    def test_pseudonymizers_with_shared_cache_store_pseudonym_once(self, tmp_path):
+        config = deepcopy(self.CONFIG)
+        config["shared_cache_path"] = str(tmp_path / "pseudonyms.cache")
+        first, second = (
+            Factory.create({"pseudonymizer": deepcopy(config)}, self.logger) for _ in range(2)
+        )
+        assert isinstance(first._cache, SharedMemoryCache)
+        first_pseudonyms, second_pseudonyms = [], []
+        first._pseudonymize_value("Pseudonymize me!", first_pseudonyms)
+        second._pseudonymize_value("Pseudonymize me!", second_pseudonyms)
+        assert len(first_pseudonyms) == 1
+        assert not second_pseudonyms
+        first.shut_down()
+        second.shut_down()
+
+    def test_cache_snapshot_is_loaded_after_restart(self, tmp_path):
+        config = deepcopy(self.CONFIG)
+        config["cache_snapshot_path"] = str(tmp_path / "pseudonyms.snapshot")
+        pseudonymizer = Factory.create({"pseudonymizer": deepcopy(config)}, self.logger)
+        pseudonyms = []
+        pseudonymizer._pseudonymize_value("Pseudonymize me!", pseudonyms)
+        assert pseudonyms
+        pseudonymizer.shut_down()
+        pseudonymizer = Factory.create({"pseudonymizer": deepcopy(config)}, self.logger)
+        pseudonyms = []
+        pseudonymizer._pseudonymize_value("Pseudonymize me!", pseudonyms)
+        assert not pseudonyms
+
+    def test_cache_snapshot_is_saved_periodically(self, tmp_path):
+        config = deepcopy(self.CONFIG)
+        config["cache_snapshot_path"] = str(tmp_path / "pseudonyms.snapshot")
+        config["cache_snapshot_interval"] = 60
+        pseudonymizer = Factory.create({"pseudonymizer": config}, self.logger)
+        pseudonymizer.process({"foo": "bar"})
+        assert not (tmp_path / "pseudonyms.snapshot").exists()
+        pseudonymizer._cache_saved_at -= 60
+        pseudonymizer.process({"foo": "bar"})
+        assert (tmp_path / "pseudonyms.snapshot").exists()
+
+    def test_regex_keywords_are_replaced_by_compiled_patterns(self):
+        self._load_specific_rule(
+            {"filter": "event_id: 1234", "pseudonymize": {"something": "RE_WHOLE_FIELD"}}
+        )
+        for rule in self.object._specific_rules:
+            for pattern in rule.pseudonyms.values():
+                assert isinstance(pattern, re.Pattern)
+
+    def test_hashes_of_values_are_memoized(self):
+        with mock.patch.object(
+            self.object._hasher, "hash_str", wraps=self.object._hasher.hash_str
+        ) as mock_hash_str:
+            for _ in range(3):
+                self.object._pseudonymize_value("Pseudonymize me!", [])
+        mock_hash_str.assert_called_once()
+
+    def test_hashes_of_values_are_not_memoized_if_disabled(self):
+        config = deepcopy(self.CONFIG)
+        config["max_memoized_values"] = 0
+        pseudonymizer = Factory.create({"pseudonymizer": config}, self.logger)
+        with mock.patch.object(
+            pseudonymizer._hasher, "hash_str", wraps=pseudonymizer._hasher.hash_str
+        ) as mock_hash_str:
+            for _ in range(3):
+                pseudonymizer._pseudonymize_value("Pseudonymize me!", [])
+        assert mock_hash_str.call_count == 3
+
+    def test_parts_of_urls_are_memoized(self):
+        with mock.patch.object(
+            self.object, "_parse_url_parts", wraps=self.object._parse_url_parts
+        ) as mock_parse_url_parts:
+            self.object.setup()
+            for _ in range(3):
+                assert self.object._get_field_with_pseudonymized_urls(
+                    "https://www.test.de", []
+                ).endswith(".test.de")
+        mock_parse_url_parts.assert_called_once()
+
     def _pseudo_source_by_pattern(self, source_field, regex_pattern):
         event = {"filter_this": "does_not_matter", "pseudo_this": source_field}
         rule = {
@@ -1,12 +1,14 @@
 # pylint: disable=missing-docstring
 # pylint: disable=protected-access
 import datetime
+import multiprocessing
+import os
 import time
 from collections import OrderedDict
 
 import pytest
 
-from logprep.util.cache import Cache
+from logprep.util.cache import Cache, CompactCache, ResolutionCache, SharedMemoryCache
 
 
 @pytest.fixture(name="cache")
@@ -47,3 +49,290 @@ class TestCache:
             assert cache.requires_storing(i)
             assert len(cache) == min(i + 1, cache._max_items)
         assert set(cache.keys()) == set(range(extra_items, cache._max_items + extra_items))
+
+    def test_load_restores_saved_items_in_order(self, cache, tmp_path):
+        for item in ["foo", "bar", "baz"]:
+            cache.requires_storing(item)
+        cache.requires_storing("foo")
+        cache.save(str(tmp_path / "snapshot"))
+        loaded_cache = Cache(max_items=3, max_timedelta=datetime.timedelta(days=1))
+        assert loaded_cache.load(str(tmp_path / "snapshot")) == {}
+        assert list(loaded_cache) == ["bar", "baz", "foo"]
+        for item, last_stored in loaded_cache.items():
+            assert abs(last_stored - cache[item]) < datetime.timedelta(seconds=1)
+        assert not loaded_cache.requires_storing("foo")
+
+    def test_load_skips_expired_items(self, tmp_path):
+        cache = Cache(max_items=3, max_timedelta=datetime.timedelta(days=1))
+        cache.requires_storing("old")
+        cache["old"] = datetime.datetime.now() - datetime.timedelta(days=2)
+        cache.requires_storing("new")
+        cache.save(str(tmp_path / "snapshot"))
+        loaded_cache = Cache(max_items=3, max_timedelta=datetime.timedelta(days=1))
+        loaded_cache.load(str(tmp_path / "snapshot"))
+        assert list(loaded_cache) == ["new"]
+
+    def test_load_keeps_most_recently_used_items_up_to_max_items(self, tmp_path):
+        cache = Cache(max_items=10)
+        for item in range(10):
+            cache.requires_storing(item)
+        cache.save(str(tmp_path / "snapshot"))
+        loaded_cache = Cache(max_items=3)
+        loaded_cache.load(str(tmp_path / "snapshot"))
+        assert list(loaded_cache) == ["7", "8", "9"]
+
+    def test_load_returns_saved_values(self, cache, tmp_path):
+        for item in ["foo", "bar", "baz"]:
+            cache.requires_storing(item)
+        cache.save(str(tmp_path / "snapshot"), values={"foo": "1.2.3.4", "bar": None, "baz": ""})
+        loaded_cache = Cache(max_items=3)
+        values = loaded_cache.load(str(tmp_path / "snapshot"))
+        assert values == {"foo": "1.2.3.4", "baz": ""}
+
+    def test_load_handles_non_ascii_items(self, cache, tmp_path):
+        cache.requires_storing("ümlaut")
+        cache.requires_storing("日本")
+        cache.save(str(tmp_path / "snapshot"), values={"日本": "ß"})
+        loaded_cache = Cache(max_items=3)
+        assert loaded_cache.load(str(tmp_path / "snapshot")) == {"日本": "ß"}
+        assert list(loaded_cache) == ["ümlaut", "日本"]
+
+    @pytest.mark.parametrize("content", [b"", b"no snapshot", Cache.SNAPSHOT_MAGIC + b"0" * 40])
+    def test_load_raises_value_error_for_invalid_snapshot(self, cache, tmp_path, content):
+        (tmp_path / "snapshot").write_bytes(content)
+        with pytest.raises(ValueError, match=r"is not a cache snapshot"):
+            cache.load(str(tmp_path / "snapshot"))
+
+
+@pytest.fixture(name="shared_cache_path")
+def shared_cache_path_fixture(tmp_path):
+    return str(tmp_path / "shared.cache")
+
+
+def _requires_storing_in_process(path, items, results):
+    cache = SharedMemoryCache(path, max_items=16, max_timedelta=datetime.timedelta(days=1))
+    results.put([cache.requires_storing(item) for item in items])
+    cache.close()
+
+
+class TestCompactCache:
+    @staticmethod
+    def _items_in_same_window(cache, count):
+        def first_slot(item):
+            return (cache._digest(item) >> 1) % cache._table_size
+
+        items = (item for item in range(1000000) if first_slot(item) == first_slot(0))
+        return [item for _, item in zip(range(count), items)]
+
+    def test_new_cache_is_empty(self):
+        cache = CompactCache(max_items=16)
+        assert not cache
+        assert "foo" not in cache
+
+    def test_requires_storing_nonzero_deltatime(self):
+        cache = CompactCache(max_items=16, max_timedelta=datetime.timedelta(milliseconds=100))
+        for _ in range(3):
+            assert cache.requires_storing("foo")
+            assert not cache.requires_storing("foo")
+            time.sleep(0.11)  # nosemgrep
+        assert len(cache) == 1
+
+    def test_requires_storing_zero_deltatime(self):
+        cache = CompactCache(max_items=16, max_timedelta=datetime.timedelta(days=0))
+        for _ in range(10):
+            assert cache.requires_storing("foo")
+            time.sleep(0.002)  # nosemgrep
+
+    def test_keeps_about_max_items(self):
+        cache = CompactCache(max_items=1000)
+        for item in range(1000):
+            assert cache.requires_storing(item)
+        assert len(cache) + cache.metrics.evictions == 1000
+        assert cache.metrics.evictions < 10
+        assert sum(item in cache for item in range(1000)) == len(cache)
+
+    def test_size_of_tables_is_bounded(self):
+        cache = CompactCache(max_items=16)
+        for item in range(1000):
+            cache.requires_storing(item)
+        assert len(cache) <= 2 * 16 + CompactCache.WINDOW_SIZE
+        assert len(cache._digests) == 2 * 16 + CompactCache.WINDOW_SIZE
+
+    def test_replaces_item_that_was_not_used_again(self):
+        cache = CompactCache(max_items=1000)
+        items = self._items_in_same_window(cache, CompactCache.WINDOW_SIZE + 1)
+        for item in items[:-1]:
+            assert cache.requires_storing(item)
+        assert not cache.requires_storing(items[0])
+        assert cache.requires_storing(items[-1])
+        assert cache.metrics.evictions == 1
+        assert items[1] not in cache
+        for item in [items[0], *items[2:]]:
+            assert item in cache
+
+    def test_counts_hits_misses_and_evictions(self):
+        cache = CompactCache(max_items=16, metric_labels={"processor": "test"})
+        cache.requires_storing("foo")
+        cache.requires_storing("foo")
+        cache.requires_storing("bar")
+        assert cache.metrics.expose() == {
+            "logprep_cache_hits;processor:test": 1.0,
+            "logprep_cache_misses;processor:test": 2.0,
+            "logprep_cache_evictions;processor:test": 0.0,
+        }
+
+    def test_load_restores_saved_items_and_values(self, tmp_path):
+        cache = CompactCache(max_items=16)
+        for item in ["foo", "bar", "bäz"]:
+            cache.requires_storing(item)
+        cache.save(str(tmp_path / "snapshot"), values={"foo": "1.2.3.4", "bäz": "ü", "qux": "x"})
+        loaded_cache = CompactCache(max_items=16)
+        assert loaded_cache.load(str(tmp_path / "snapshot")) == {"foo": "1.2.3.4", "bäz": "ü"}
+        assert len(loaded_cache) == 3
+        for item in ["foo", "bar", "bäz"]:
+            assert not loaded_cache.requires_storing(item)
+
+    def test_load_skips_expired_items(self, tmp_path):
+        cache = CompactCache(max_items=16)
+        cache.requires_storing("foo")
+        cache.save(str(tmp_path / "snapshot"), values={"foo": "1.2.3.4"})
+        time.sleep(0.01)  # nosemgrep
+        loaded_cache = CompactCache(max_items=16, max_timedelta=datetime.timedelta(milliseconds=5))
+        assert loaded_cache.load(str(tmp_path / "snapshot")) == {}
+        assert loaded_cache.requires_storing("foo")
+
+    @pytest.mark.parametrize("content", [b"", b"no snapshot", b"LPCOMPC1" + bytes(40)])
+    def test_load_raises_value_error_for_invalid_snapshot(self, tmp_path, content):
+        (tmp_path / "snapshot").write_bytes(content)
+        with pytest.raises(ValueError, match="is not a cache snapshot"):
+            CompactCache(max_items=16).load(str(tmp_path / "snapshot"))
+
+    def test_load_raises_value_error_for_snapshot_of_other_size(self, tmp_path):
+        CompactCache(max_items=16).save(str(tmp_path / "snapshot"))
+        with pytest.raises(ValueError, match="another size"):
+            CompactCache(max_items=32).load(str(tmp_path / "snapshot"))
+
+
+class TestResolutionCache:
+    @pytest.fixture(name="resolution_cache")
+    def resolution_cache_fixture(self):
+        return ResolutionCache(
+            max_items=16,
+            max_timedelta=datetime.timedelta(milliseconds=20),
+            max_negative_timedelta=datetime.timedelta(milliseconds=10),
+            max_stale_timedelta=datetime.timedelta(milliseconds=20),
+        )
+
+    def test_lookup_returns_miss_for_unknown_item(self, resolution_cache):
+        assert resolution_cache.lookup("foo") == (ResolutionCache.MISS, None)
+        assert resolution_cache.requires_storing("foo")
+
+    def test_lookup_returns_stored_address(self, resolution_cache):
+        resolution_cache.store("foo", "1.2.3.4")
+        resolution_cache.store("bar", "0.0.0.0")
+        assert resolution_cache.lookup("foo") == (ResolutionCache.FRESH, "1.2.3.4")
+        assert resolution_cache.lookup("bar") == (ResolutionCache.FRESH, "0.0.0.0")
+        assert "foo" in resolution_cache
+        assert len(resolution_cache) == 2
+
+    def test_expired_address_is_stale_before_it_is_missed(self, resolution_cache):
+        resolution_cache.store("foo", "1.2.3.4")
+        time.sleep(0.025)  # nosemgrep
+        assert resolution_cache.lookup("foo") == (ResolutionCache.STALE, "1.2.3.4")
+        assert "foo" not in resolution_cache
+        time.sleep(0.02)  # nosemgrep
+        assert resolution_cache.lookup("foo") == (ResolutionCache.MISS, None)
+
+    def test_failed_resolution_expires_after_negative_timedelta(self, resolution_cache):
+        resolution_cache.store("foo", None)
+        assert resolution_cache.lookup("foo") == (ResolutionCache.FRESH, None)
+        time.sleep(0.015)  # nosemgrep
+        assert resolution_cache.lookup("foo") == (ResolutionCache.MISS, None)
+
+    def test_store_replaces_address(self, resolution_cache):
+        resolution_cache.store("foo", None)
+        resolution_cache.store("foo", "1.2.3.4")
+        assert resolution_cache.lookup("foo") == (ResolutionCache.FRESH, "1.2.3.4")
+        assert len(resolution_cache) == 1
+
+    def test_store_raises_os_error_for_invalid_address(self, resolution_cache):
+        with pytest.raises(OSError):
+            resolution_cache.store("foo", "no address")
+
+    def test_load_restores_addresses(self, resolution_cache, tmp_path):
+        resolution_cache.store("foo", "1.2.3.4")
+        resolution_cache.save(str(tmp_path / "snapshot"))
+        loaded_cache = ResolutionCache(max_items=16)
+        loaded_cache.load(str(tmp_path / "snapshot"))
+        assert loaded_cache.lookup("foo") == (ResolutionCache.FRESH, "1.2.3.4")
+
+    def test_load_raises_value_error_for_snapshot_of_compact_cache(self, tmp_path):
+        CompactCache(max_items=16).save(str(tmp_path / "snapshot"))
+        with pytest.raises(ValueError, match="is not a cache snapshot"):
+            ResolutionCache(max_items=16).load(str(tmp_path / "snapshot"))
+
+
+class TestSharedMemoryCache:
+    def test_creates_file_of_fixed_size(self, shared_cache_path):
+        SharedMemoryCache(shared_cache_path, max_items=20).close()
+        assert os.path.getsize(shared_cache_path) == 3 * SharedMemoryCache.BUCKET_SIZE * 24
+
+    def test_requires_storing_nonzero_deltatime(self, shared_cache_path):
+        cache = SharedMemoryCache(
+            shared_cache_path, max_items=16, max_timedelta=datetime.timedelta(milliseconds=100)
+        )
+        for _ in range(3):
+            assert cache.requires_storing("foo")
+            assert not cache.requires_storing("foo")
+            time.sleep(0.11)  # nosemgrep
+
+    def test_requires_storing_zero_deltatime(self, shared_cache_path):
+        cache = SharedMemoryCache(
+            shared_cache_path, max_items=16, max_timedelta=datetime.timedelta(days=0)
+        )
+        for _ in range(10):
+            assert cache.requires_storing("foo")
+
+    def test_max_items(self, shared_cache_path):
+        cache = SharedMemoryCache(shared_cache_path, max_items=16)
+        for item in range(1000):
+            assert cache.requires_storing(item)
+        assert len(cache) == 16
+
+    def test_replaces_item_stored_longest_ago(self, shared_cache_path):
+        cache = SharedMemoryCache(shared_cache_path, max_items=SharedMemoryCache.BUCKET_SIZE)
+        items = list(range(SharedMemoryCache.BUCKET_SIZE + 1))
+        for item in items:
+            cache.requires_storing(item)
+            time.sleep(0.002)  # nosemgrep
+        assert cache.requires_storing(items[0])
+        for item in items[2:]:
+            assert not cache.requires_storing(item)
+
+    def test_is_shared_by_caches_with_same_path(self, shared_cache_path):
+        first_cache = SharedMemoryCache(shared_cache_path, max_items=16)
+        second_cache = SharedMemoryCache(shared_cache_path, max_items=16)
+        assert first_cache.requires_storing("foo")
+        assert not second_cache.requires_storing("foo")
+        assert second_cache.requires_storing("bar")
+        assert not first_cache.requires_storing("bar")
+
+    def test_is_shared_by_processes(self, shared_cache_path):
+        cache = SharedMemoryCache(shared_cache_path, max_items=16)
+        assert cache.requires_storing("foo")
+        results = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_requires_storing_in_process,
+            args=(shared_cache_path, ["foo", "bar"], results),
+        )
+        process.start()
+        assert results.get(timeout=10) == [False, True]
+        process.join()
+        assert not cache.requires_storing("bar")
+
+    def test_keeps_items_after_reopening(self, shared_cache_path):
+        cache = SharedMemoryCache(shared_cache_path, max_items=16)
+        cache.requires_storing("foo")
+        cache.close()
+        cache = SharedMemoryCache(shared_cache_path, max_items=16)
+        assert not cache.requires_storing("foo")
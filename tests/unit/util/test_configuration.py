@@ -77,6 +77,30 @@ class TestConfiguration:
                 "process_count", i, "Process count must be an integer of one or larger, not:"
             )
 
+    def test_verify_fails_on_low_partition_workers(self):
+        for i in range(0, -3, -1):
+            self.assert_fails_when_replacing_key_with_value(
+                "partition_workers",
+                i,
+                "Partition workers must be an integer of one or larger, not:",
+            )
+
+    def test_verify_fails_on_invalid_output_high_water_mark(self):
+        for value in (0, -0.5, 1.5):
+            self.assert_fails_when_replacing_key_with_value(
+                "output_high_water_mark",
+                value,
+                "Output high water mark must be a number larger than 0 and at most 1, not:",
+            )
+
+    def test_verify_fails_on_output_low_water_mark_above_high_water_mark(self):
+        self.config["output_high_water_mark"] = 0.8
+        self.assert_fails_when_replacing_key_with_value(
+            "output_low_water_mark",
+            0.9,
+            "Output low water mark must be a number between 0 and the output high water mark, not:",
+        )
+
     def test_verify_fails_on_empty_pipeline(self):
         self.assert_fails_when_replacing_key_with_value(
             "pipeline", [], '"pipeline" must contain at least one item!'
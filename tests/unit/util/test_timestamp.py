@@ -0,0 +1,43 @@
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+
+from logprep.util.timestamp import CachedIsoClock, parse_timestamp
+
+
+class TestCachedIsoClock:
+    def test_now_returns_local_iso_timestamp(self):
+        timestamp = CachedIsoClock().now()
+        parsed = datetime.fromisoformat(timestamp)
+        assert parsed.tzinfo is not None
+        assert abs(datetime.now(timezone.utc) - parsed) < timedelta(seconds=1)
+
+    def test_now_renders_timestamp_once_per_millisecond(self):
+        clock = CachedIsoClock()
+        with mock.patch("logprep.util.timestamp.time_ns", return_value=1666173600123456789):
+            first = clock.now()
+        with mock.patch("logprep.util.timestamp.time_ns", return_value=1666173600123999999):
+            assert clock.now() is first
+        with mock.patch("logprep.util.timestamp.time_ns", return_value=1666173600124000000):
+            assert clock.now() != first
+
+
+class TestParseTimestamp:
+    @pytest.mark.parametrize(
+        "timestamp, expected",
+        [
+            (
+                "2022-10-19T12:00:00.448319+02:00",
+                datetime(2022, 10, 19, 10, 0, 0, 448319, tzinfo=timezone.utc),
+            ),
+            ("2022-10-19T10:00:00Z", datetime(2022, 10, 19, 10, tzinfo=timezone.utc)),
+            ("2022-10-19 10:00:00", datetime(2022, 10, 19, 10, tzinfo=timezone.utc)),
+            ("20221019T100000+0000", datetime(2022, 10, 19, 10, tzinfo=timezone.utc)),
+            (1666173600, datetime(2022, 10, 19, 10, tzinfo=timezone.utc)),
+        ],
+    )
+    def test_parse_timestamp(self, timestamp, expected):
+        assert parse_timestamp(timestamp) == expected
@@ -1,12 +1,13 @@
 # pylint: disable=missing-docstring
 # pylint: disable=no-self-use
+import gzip
 import json
 import os
 from json import JSONDecodeError
 
 import pytest
 
-from logprep.util.json_handling import parse_json
+from logprep.util.json_handling import iterate_json, parse_json, parse_jsonl
 
 
 class TestJsonHandling:
@@ -35,3 +36,25 @@ class TestJsonHandling:
             JSONDecodeError, match=r"Expecting ',' delimiter: line 2 column 1 \(char 62\)"
         ):
             _ = parse_json(test_file_path)
+
+    def test_iterate_json_parses_list_in_small_chunks(self, tmp_path):
+        test_jsons = [{"order": order, "näme": "ü" * order} for order in range(20)]
+        test_file_path = os.path.join(tmp_path, "test.json")
+        with open(test_file_path, "w", encoding="utf8") as file:
+            json.dump(test_jsons, file, indent=2, ensure_ascii=False)
+        parsed_jsons = list(iterate_json(test_file_path, chunk_size=3))
+        assert [parsed_json for _, parsed_json in parsed_jsons] == test_jsons
+        assert parsed_jsons[-1][0] == os.path.getsize(test_file_path) - len("\n]")
+
+    def test_iterate_json_raises_json_decode_error_on_missing_delimiter(self, tmp_path):
+        test_file_path = os.path.join(tmp_path, "test.json")
+        with open(test_file_path, "w", encoding="utf8") as file:
+            file.write('[{"order": 0} {"order": 1}]')
+        with pytest.raises(JSONDecodeError, match=r"Expecting ',' delimiter"):
+            _ = list(iterate_json(test_file_path))
+
+    def test_parse_jsonl_reads_gzip_compressed_file(self, tmp_path):
+        test_file_path = os.path.join(tmp_path, "test.jsonl.gz")
+        with gzip.open(test_file_path, "wt", encoding="utf8") as file:
+            file.write('{"order": 0}\n\n{"order": 1}\n')
+        assert parse_jsonl(test_file_path) == [{"order": 0}, {"order": 1}]